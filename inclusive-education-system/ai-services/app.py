@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
@@ -6,8 +6,25 @@ import logging
 
 from services.recommendation_service import RecommendationService
 from services.chatbot_service import ChatbotService
+from services.course_catalog import CourseCatalog
+from services.progress_cache import ProgressAggregateCache
+from services.pdf_extractor import PdfExtractor, PdfExtractionError
+from services.summarization_service import SummarizationService
+from services.summary_cache import SummaryCache
+from services.summary_jobs import SummaryJobRunner
+from services.recommendation_materializer import RecommendationMaterializer
+from services.analytics_snapshot import AnalyticsExporter, AnalyticsSnapshotStore
+from services.response_cache import ResponseCache
+from services.event_ingestor import EventIngestError, EventIngestor
+from services.interest_profiles import InterestProfiles
 from database.db_connector import DatabaseConnector
-import io
+from database.query_monitor import QueryMonitor
+from database.batch_writer import BatchWriter
+from services.metrics import MetricsRegistry, ROW_BUCKETS, gauge_family
+import functools
+import hashlib
+import json
+import time
 try:
     import PyPDF2
 except Exception:
@@ -18,6 +35,7 @@ load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_BYTES', 25 * 1024 * 1024))
 CORS(app)
 
 # Configure logging
@@ -27,21 +45,217 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_USERS = int(os.getenv('BATCH_MAX_USERS', 5000))
+BATCH_MAX_LIMIT = int(os.getenv('BATCH_MAX_LIMIT', 50))
+ANALYTICS_MAX_COHORT = int(os.getenv('ANALYTICS_MAX_COHORT', 100000))
+RECS_SERVE_MATERIALIZED = os.getenv('RECS_SERVE_MATERIALIZED', 'true').lower() == 'true'
+INTEREST_PROFILES_ENABLED = os.getenv('INTEREST_PROFILES_ENABLED', 'true').lower() == 'true'
+
 # Initialize services
 db = DatabaseConnector()
-recommendation_service = RecommendationService(db)
-chatbot_service = ChatbotService(db)
+course_catalog = CourseCatalog(db)
+progress_cache = ProgressAggregateCache(db)
+# Time-decayed interests read from per-user aggregates instead of the full history
+interest_profiles = InterestProfiles(db)
+recommendation_service = RecommendationService(
+    db, course_catalog, progress_cache,
+    interest_profiles=interest_profiles if INTEREST_PROFILES_ENABLED else None
+)
+if INTEREST_PROFILES_ENABLED and float(os.getenv('INTEREST_UPDATE_INTERVAL_SECONDS', 0)) > 0:
+    interest_profiles.start(float(os.getenv('INTEREST_UPDATE_INTERVAL_SECONDS')))
+chatbot_service = ChatbotService(db, progress_cache)
+recommendation_materializer = RecommendationMaterializer(db, recommendation_service)
+# Every worker starts the loop; the MySQL named lock lets only one run at a time
+if float(os.getenv('RECS_MATERIALIZE_INTERVAL_SECONDS', 0)) > 0:
+    recommendation_materializer.start(float(os.getenv('RECS_MATERIALIZE_INTERVAL_SECONDS')))
+# Columnar copy of performance for cohort reporting; readers never touch MySQL
+analytics_store = AnalyticsSnapshotStore()
+analytics_exporter = AnalyticsExporter(db, analytics_store)
+# ETags for the polled per-user endpoints; unchanged dashboards cost one version lookup
+response_cache = ResponseCache(db, recommendation_service)
+if float(os.getenv('ANALYTICS_EXPORT_INTERVAL_SECONDS', 0)) > 0:
+    analytics_exporter.start(float(os.getenv('ANALYTICS_EXPORT_INTERVAL_SECONDS')))
+pdf_extractor = PdfExtractor()
+summarization_service = SummarizationService()
+summary_cache = SummaryCache()
+summary_version = summarization_service.cache_version
+# Jobs get their own extraction pool and limits so long documents never
+# queue in front of synchronous /summarize requests
+summary_jobs = SummaryJobRunner(
+    PdfExtractor(
+        max_workers=int(os.getenv('SUMMARY_JOB_PDF_WORKERS', 2)),
+        max_pages=int(os.getenv('SUMMARY_JOB_MAX_PAGES', 500)),
+        timeout=float(os.getenv('SUMMARY_JOB_TIMEOUT_SECONDS', 300))
+    ),
+    summarization_service,
+    summary_cache
+)
+chat_log_writer = BatchWriter(
+    db,
+    """
+        INSERT INTO chatbot_conversations (user_id, message, response, context_data)
+        VALUES (%s, %s, %s, %s)
+    """,
+    name='chatbot_conversations',
+    max_queue=int(os.getenv('CHAT_LOG_MAX_QUEUE', 10000)),
+    flush_rows=int(os.getenv('CHAT_LOG_FLUSH_ROWS', 100)),
+    flush_interval_ms=int(os.getenv('CHAT_LOG_FLUSH_INTERVAL_MS', 200)),
+    enqueue_timeout_ms=int(os.getenv('CHAT_LOG_ENQUEUE_TIMEOUT_MS', 0))
+)
+# Clickstream into behavior_events: bounded buffer, multi-row inserts, 503 when full
+event_ingestor = EventIngestor(db)
+
+# Metrics, exposed in Prometheus text format at /metrics (per gunicorn worker)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+metrics = MetricsRegistry()
+http_requests = metrics.counter('http_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status'))
+http_errors = metrics.counter('http_request_errors_total', 'HTTP responses with a 5xx status', ('route', 'method'))
+http_latency = metrics.histogram('http_request_duration_seconds', 'HTTP request latency', ('route', 'method'))
+http_in_flight = metrics.gauge('http_requests_in_flight', 'Requests currently being served', ('route',))
+db_latency = metrics.histogram('db_query_duration_seconds', 'Database statement latency', ('query',))
+db_rows = metrics.histogram('db_query_rows', 'Rows returned (SELECT) or affected per statement', ('query',), buckets=ROW_BUCKETS)
+db_errors = metrics.counter('db_query_errors_total', 'Database statements that raised', ('query',))
+
+
+def _record_query(name, query, duration, rows, error, params=None):
+    db_latency.observe(duration, name)
+    db_rows.observe(rows, name)
+    if error is not None:
+        db_errors.inc(name)
+
+
+def _collect_service_stats():
+    caches = {
+        'progress': progress_cache.get_stats(),
+        'summary': summary_cache.get_stats(),
+        'response': response_cache.get_stats(),
+        'catalog': course_catalog.get_stats()
+    }
+    yield gauge_family('cache_hit_ratio', 'Cache hit ratio since start', 'cache', caches, 'hit_ratio')
+    for cache, stats in caches.items():
+        stats['lookups'] = stats.get('hits', stats.get('memory_hits', 0) + stats.get('disk_hits', 0)) + stats['misses']
+    yield gauge_family('cache_lookups', 'Cache lookups since start', 'cache', caches, 'lookups')
+    pool = {'mysql': db.pool_stats()}
+    for field in ('size', 'idle', 'in_use', 'waits', 'timeouts'):
+        yield gauge_family(f'db_pool_{field}', f'Connection pool {field}', 'pool', pool, field)
+    writers = {'chatbot_conversations': chat_log_writer.get_stats(), 'behavior_events': event_ingestor.get_stats()}
+    for field in ('queued', 'dropped', 'failed'):
+        yield gauge_family(f'batch_writer_{field}', f'Batch writer rows {field}', 'writer', writers, field)
+
+
+if METRICS_ENABLED:
+    db.add_listener(_record_query)
+    metrics.add_collector(_collect_service_stats)
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g.request_started = time.perf_counter()
+        http_in_flight.inc(g.metrics_route)
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = g.metrics_route
+            http_latency.observe(time.perf_counter() - started, route, request.method)
+            http_requests.inc(route, request.method, str(response.status_code))
+            if response.status_code >= 500:
+                http_errors.inc(route, request.method)
+        return response
+
+    @app.teardown_request
+    def _end_request_metrics(error):
+        route = g.pop('metrics_route', None)
+        if route is not None:
+            http_in_flight.dec(route)
+
+# Slow-query log and per-request query budget; counts go out as response
+# headers so N+1 regressions show up in the browser network tab
+query_monitor = QueryMonitor(db)
+db.add_listener(query_monitor)
+
+
+@app.before_request
+def _begin_query_budget():
+    query_monitor.begin(request.url_rule.rule if request.url_rule is not None else 'unmatched')
+
+
+@app.after_request
+def _end_query_budget(response):
+    usage = query_monitor.end()
+    if usage is not None:
+        response.headers['X-DB-Queries'] = str(usage['count'])
+        response.headers['X-DB-Time-Ms'] = str(usage['time_ms'])
+    return response
+
+
+@app.teardown_request
+def _close_query_budget(error):
+    # after_request is skipped when a view raises; never leak the scope to the next request
+    query_monitor.end()
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics for this worker"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    analytics_snapshot = analytics_store.get()
     return jsonify({
         'status': 'OK',
         'service': 'AI Microservices',
-        'version': os.getenv('MODEL_VERSION', '1.0.0')
+        'version': os.getenv('MODEL_VERSION', '1.0.0'),
+        'database_pool': db.pool_stats(),
+        'chat_log': chat_log_writer.get_stats(),
+        'behavior_events': event_ingestor.get_stats(),
+        'progress_cache': progress_cache.get_stats(),
+        'course_catalog': course_catalog.get_stats(),
+        'summary_cache': summary_cache.get_stats(),
+        'recommendation_materializer': recommendation_materializer.last_run,
+        'interest_profiles': interest_profiles.last_run,
+        'analytics_snapshot': analytics_snapshot.info() if analytics_snapshot else None,
+        'query_monitor': query_monitor.get_stats(),
+        'response_cache': response_cache.get_stats()
     }), 200
 
+def _conditional(route):
+    """
+    Serve a per-user GET view with an ETag
+
+    Answers a matching If-None-Match with 304 and replays a cached body for
+    the current version; the view only runs when the user's data, the
+    catalog or the model changed since this worker last rendered it.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(user_id):
+            try:
+                etag = response_cache.etag(route, user_id)
+            except Exception as e:
+                logger.error(f"Response version lookup failed: {str(e)}")
+                return view(user_id)
+            if response_cache.not_modified_for(request.headers.get('If-None-Match'), etag):
+                response = Response(status=304)
+            else:
+                body = response_cache.get(route, user_id, etag)
+                if body is not None:
+                    response = Response(body, mimetype='application/json')
+                else:
+                    response = app.make_response(view(user_id))
+                    if response.status_code != 200:
+                        return response
+                    response_cache.put(route, user_id, etag, response.get_data())
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = ResponseCache.CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
 @app.route('/recommendations/<int:user_id>', methods=['GET'])
+@_conditional('recommendations')
 def get_recommendations(user_id):
     """
     Get personalized course recommendations for a user
@@ -55,12 +269,22 @@ def get_recommendations(user_id):
     try:
         logger.info(f"Getting recommendations for user {user_id}")
         
-        recommendations = recommendation_service.get_personalized_recommendations(user_id)
+        recommendations = None
+        if RECS_SERVE_MATERIALIZED:
+            try:
+                recommendations = recommendation_service.get_materialized_recommendations(user_id)
+            except Exception as e:
+                # e.g. table not migrated yet; the live path still works
+                logger.error(f"Materialized recommendations unavailable: {str(e)}")
+        materialized = recommendations is not None
+        if not materialized:
+            recommendations = recommendation_service.get_personalized_recommendations(user_id)
         
         return jsonify({
             'user_id': user_id,
             'recommendations': recommendations,
-            'source': 'ai_model'
+            'source': 'ai_model',
+            'materialized': materialized
         }), 200
         
     except Exception as e:
@@ -70,6 +294,58 @@ def get_recommendations(user_id):
             'message': str(e)
         }), 500
 
+@app.route('/recommendations/batch', methods=['POST'])
+def get_batch_recommendations():
+    """
+    Get personalized course recommendations for many users
+    
+    Request body:
+        - user_ids: List of user IDs
+        - limit: Optional maximum recommendations per user (default 5, capped at BATCH_MAX_LIMIT)
+        
+    Returns:
+        JSON with recommendations keyed by user ID
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids')
+        
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({'error': 'user_ids must be a non-empty list'}), 400
+        try:
+            user_ids = [int(u) for u in user_ids]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'user_ids must contain integers'}), 400
+        if len(user_ids) > BATCH_MAX_USERS:
+            return jsonify({'error': f'At most {BATCH_MAX_USERS} user_ids per request'}), 400
+        limit = data.get('limit', 5)
+        if isinstance(limit, bool):
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        limit = min(limit, BATCH_MAX_LIMIT)
+        
+        logger.info(f"Getting batch recommendations for {len(user_ids)} users")
+        
+        result = recommendation_service.get_batch_recommendations(user_ids, limit)
+        
+        return jsonify({
+            'recommendations': {str(u): recs for u, recs in result['recommendations'].items()},
+            'stats': result['stats'],
+            'source': 'ai_model'
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting batch recommendations: {str(e)}")
+        return jsonify({
+            'error': 'Failed to generate batch recommendations',
+            'message': str(e)
+        }), 500
+
 @app.route('/chatbot', methods=['POST'])
 def chatbot():
     """
@@ -97,9 +373,15 @@ def chatbot():
         
         response = chatbot_service.generate_response(user_id, message, context)
         
+        # Persist the turn in the background; the caller only logs it if we couldn't
+        logged = False
+        if user_id:
+            logged = chat_log_writer.submit((user_id, message, response, json.dumps(context or {})))
+        
         return jsonify({
             'response': response,
-            'source': 'ai_model'
+            'source': 'ai_model',
+            'logged': logged
         }), 200
         
     except Exception as e:
@@ -139,6 +421,7 @@ def analyze_performance():
         }), 500
 
 @app.route('/learning-path/<int:user_id>', methods=['GET'])
+@_conditional('learning-path')
 def learning_path(user_id):
     """Generate a dynamic learning path for a user"""
     try:
@@ -150,6 +433,7 @@ def learning_path(user_id):
         return jsonify({'error': 'Failed to generate learning path', 'message': str(e)}), 500
 
 @app.route('/full-recommendations/<int:user_id>', methods=['GET'])
+@_conditional('full-recommendations')
 def full_recommendations(user_id):
     """Return extended recommendations (lessons, readings, exercises, schedules, feedback)"""
     try:
@@ -160,6 +444,112 @@ def full_recommendations(user_id):
         logger.error(f"Full recommendations error: {str(e)}")
         return jsonify({'error': 'Failed to get full recommendations', 'message': str(e)}), 500
 
+@app.route('/events', methods=['POST'])
+def ingest_events():
+    """
+    Ingest a batch of behavior events
+
+    Accepts a JSON array (or {"events": [...]}) or NDJSON of objects with
+    user_id, event_type and optional metadata and occurred_at.
+
+    Returns:
+        202 with accepted/rejected counts, 400/413 for unusable batches,
+        503 with Retry-After when the write buffer is full
+    """
+    try:
+        result = event_ingestor.ingest(request.get_data(cache=False), request.content_type or '')
+        return jsonify(result), 202
+    except EventIngestError as e:
+        response = jsonify({'error': str(e)})
+        if e.status == 503:
+            response.headers['Retry-After'] = '1'
+        return response, e.status
+
+@app.route('/catalog/invalidate', methods=['POST'])
+def invalidate_catalog():
+    """Drop the cached course catalog so the next request reloads it"""
+    course_catalog.invalidate()
+    return jsonify({'status': 'invalidated'}), 200
+
+@app.route('/recommendations/materialize', methods=['POST'])
+def materialize_recommendations():
+    """Run one materialization pass now (incremental unless `full` is true)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = recommendation_materializer.run_once(full=bool(data.get('full')))
+        return jsonify(result), 409 if result.get('skipped') else 200
+    except Exception as e:
+        logger.error(f"Materialization error: {str(e)}")
+        return jsonify({'error': 'Failed to materialize recommendations', 'message': str(e)}), 500
+
+@app.route('/interests/update', methods=['POST'])
+def update_interest_profiles():
+    """Fold new performance into the interest profiles now (or rebuild them if `rebuild` is true)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = interest_profiles.run_once(rebuild=bool(data.get('rebuild')))
+        return jsonify(result), 409 if result.get('skipped') else 200
+    except Exception as e:
+        logger.error(f"Interest profile update error: {str(e)}")
+        return jsonify({'error': 'Failed to update interest profiles', 'message': str(e)}), 500
+
+@app.route('/analytics/users/<int:user_id>', methods=['GET'])
+def analytics_user(user_id):
+    """Progress aggregates and interests of one user from the analytics snapshot"""
+    snapshot = analytics_store.get()
+    if snapshot is None:
+        return jsonify({'error': 'Analytics snapshot not available yet'}), 503
+    stats = snapshot.user_stats(user_id)
+    if stats is None:
+        return jsonify({'error': 'No performance data for user', 'snapshot': snapshot.info()}), 404
+    return jsonify(stats), 200
+
+@app.route('/analytics/cohort', methods=['POST'])
+def analytics_cohort():
+    """
+    Aggregate report over a cohort from the analytics snapshot
+    
+    Request body:
+        - user_ids: Optional list of user IDs (every user when omitted)
+        - category: Optional category to restrict the report to
+        
+    Returns:
+        JSON with cohort totals, per-user distributions and a per-category breakdown
+    """
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get('user_ids')
+    if user_ids is not None:
+        if not isinstance(user_ids, list):
+            return jsonify({'error': 'user_ids must be a list'}), 400
+        try:
+            user_ids = [int(u) for u in user_ids]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'user_ids must contain integers'}), 400
+        if len(user_ids) > ANALYTICS_MAX_COHORT:
+            return jsonify({'error': f'At most {ANALYTICS_MAX_COHORT} user_ids per request'}), 400
+    category = data.get('category')
+    if category is not None and not isinstance(category, str):
+        return jsonify({'error': 'category must be a string'}), 400
+
+    snapshot = analytics_store.get()
+    if snapshot is None:
+        return jsonify({'error': 'Analytics snapshot not available yet'}), 503
+    try:
+        return jsonify(snapshot.cohort_stats(user_ids, category)), 200
+    except Exception as e:
+        logger.error(f"Cohort analytics error: {str(e)}")
+        return jsonify({'error': 'Failed to compute cohort analytics', 'message': str(e)}), 500
+
+@app.route('/analytics/export', methods=['POST'])
+def export_analytics():
+    """Export a fresh analytics snapshot now"""
+    try:
+        result = analytics_exporter.run_once()
+        return jsonify(result), 409 if result.get('skipped') else 200
+    except Exception as e:
+        logger.error(f"Analytics export error: {str(e)}")
+        return jsonify({'error': 'Failed to export analytics snapshot', 'message': str(e)}), 500
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
@@ -168,50 +558,118 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
+def _read_summary_source(extractor):
+    """
+    Read the text or uploaded file of a summarize request
+
+    Args:
+        extractor: PdfExtractor whose byte and page caps apply
+
+    Returns:
+        (text, pdf_path, cache_key); pdf_path is a spooled temp file the caller must remove
+    """
+    if 'text' in request.form and request.form.get('text'):
+        text = request.form.get('text')
+        return text, None, summary_cache.make_key(summary_cache.digest_text(text), summary_version)
+    if 'file' in request.files:
+        f = request.files['file']
+        filename = (f.filename or '').lower()
+        if filename.endswith('.txt'):
+            raw = f.stream.read(extractor.max_bytes + 1)
+            if len(raw) > extractor.max_bytes:
+                raise PdfExtractionError('File is too large', status=413)
+            key = summary_cache.make_key(hashlib.sha256(raw).hexdigest(), summary_version)
+            return raw.decode('utf-8', errors='ignore'), None, key
+        if filename.endswith('.pdf'):
+            if not PyPDF2:
+                raise PdfExtractionError('PDF support not installed on server', status=400)
+            # Spooled to disk (hashed on the way) so a repeat upload skips PyPDF2
+            hasher = hashlib.sha256()
+            pdf_path = extractor.spool(f.stream, hasher=hasher)
+            key = summary_cache.make_key(hasher.hexdigest(), f"{summary_version}:pdf{extractor.max_pages}")
+            return None, pdf_path, key
+    return None, None, None
+
 @app.route('/summarize', methods=['POST'])
 def summarize():
     """Summarize uploaded PDF/TXT or provided text."""
+    pdf_path = None
     try:
-        text = None
-        if 'text' in request.form and request.form.get('text'):
-            text = request.form.get('text')
-        elif 'file' in request.files:
-            f = request.files['file']
-            filename = (f.filename or '').lower()
-            if filename.endswith('.txt'):
-                text = f.read().decode('utf-8', errors='ignore')
-            elif filename.endswith('.pdf'):
-                if not PyPDF2:
-                    return jsonify({'error': 'PDF support not installed on server'}), 400
-                pdf_bytes = f.read()
-                reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-                pages = []
-                for page in reader.pages[:20]:
-                    try:
-                        pages.append(page.extract_text() or '')
-                    except Exception:
-                        continue
-                text = '\n'.join(pages)
+        text, pdf_path, key = _read_summary_source(pdf_extractor)
+
+        if key is not None:
+            cached = summary_cache.get(key)
+            if cached is not None:
+                response = jsonify(cached)
+                response.headers['X-Summary-Cache'] = 'HIT'
+                return response, 200
+
+        if pdf_path is not None:
+            text = pdf_extractor.extract(pdf_path)
         if not text:
             return jsonify({'error': 'No text or file provided'}), 400
 
-        # Naive summarization: take first N sentences and basic keywords
-        sentences = [s.strip() for s in text.replace('\n', ' ').split('.') if s.strip()]
-        summary = '. '.join(sentences[:5]) + ('.' if sentences[:5] else '')
-        # Simple mock references/examples (placeholder for NLP model)
-        references = [
-            'https://www.khanacademy.org/ (General study resource)',
-            'https://www.coursera.org/ (Courses overview)'
-        ]
-        examples = sentences[5:8]
-        return jsonify({
-            'summary': summary,
-            'references': references,
-            'examples': examples
-        }), 200
+        result = summarization_service.summarize(text)
+        if key is not None:
+            summary_cache.put(key, result)
+        response = jsonify(result)
+        response.headers['X-Summary-Cache'] = 'MISS'
+        return response, 200
+    except PdfExtractionError as e:
+        logger.error(f"Upload extraction error: {str(e)}")
+        return jsonify({'error': 'Failed to read upload', 'message': str(e)}), e.status
     except Exception as e:
         logger.error(f"Summarize error: {str(e)}")
         return jsonify({'error': 'Failed to summarize', 'message': str(e)}), 500
+    finally:
+        if pdf_path is not None:
+            try:
+                os.remove(pdf_path)
+            except OSError:
+                pass
+
+def _job_response(job):
+    """Public view of a summary job"""
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'pages_done': job['pages_done'],
+        'pages_total': job['pages_total'],
+        'result': job['result'],
+        'error': job['error'],
+        'status_url': f"/summarize/jobs/{job['job_id']}"
+    }
+
+@app.route('/summarize/jobs', methods=['POST'])
+def create_summary_job():
+    """
+    Start an asynchronous summarization job
+
+    Accepts the same input as /summarize plus an optional `user_id` that is
+    required again to read the job. Returns 202 with the job id immediately.
+    """
+    try:
+        text, pdf_path, key = _read_summary_source(summary_jobs.pdf_extractor)
+        if not text and pdf_path is None:
+            return jsonify({'error': 'No text or file provided'}), 400
+
+        job = summary_jobs.submit(key, text=text, pdf_path=pdf_path, owner=request.form.get('user_id'))
+        status = 200 if job['status'] == 'completed' else 202
+        return jsonify(_job_response(job)), status
+    except PdfExtractionError as e:
+        logger.error(f"Upload extraction error: {str(e)}")
+        return jsonify({'error': 'Failed to read upload', 'message': str(e)}), e.status
+    except Exception as e:
+        logger.error(f"Summary job error: {str(e)}")
+        return jsonify({'error': 'Failed to start summary job', 'message': str(e)}), 500
+
+@app.route('/summarize/jobs/<job_id>', methods=['GET'])
+def get_summary_job(job_id):
+    """Return status, page progress and (once completed) the result of a job"""
+    job = summary_jobs.store.get(job_id)
+    if job is None or job.get('owner') != request.args.get('user_id'):
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_response(job)), 200
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
@@ -0,0 +1,206 @@
+"""
+Async (ASGI) serving mode for the AI service
+
+The per-user read endpoints are served by async handlers: the independent
+queries of a request (performance, enrollments, progress aggregates) are
+issued concurrently through an aiomysql pool, and a request waiting on
+MySQL holds no thread, so one worker keeps many requests in flight. The
+CPU-bound part (scoring, path building) reuses the synchronous services on
+a worker thread. Every other route is the Flask app mounted as WSGI, so
+paths, payloads and status codes are the same in both modes.
+
+Run with:
+    gunicorn -k uvicorn.workers.UvicornWorker --workers 2 asgi:app
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import time
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+import app as wsgi
+from database.async_db_connector import AsyncDatabaseConnector
+from services.response_cache import ResponseCache
+from services.user_snapshot import load_snapshot_async
+
+logger = logging.getLogger(__name__)
+
+async_db = AsyncDatabaseConnector()
+if wsgi.METRICS_ENABLED:
+    async_db.add_listener(wsgi._record_query)
+async_db.add_listener(wsgi.query_monitor)
+
+
+def _json(data, status: int = 200) -> Response:
+    # Flask's JSON provider, so both modes serialize identically
+    return Response(wsgi.app.json.dumps(data), status_code=status, media_type='application/json')
+
+
+def _instrumented(route: str, method: str):
+    """Record the same HTTP metrics as the Flask hooks, under the Flask rule"""
+    def decorator(handler):
+        async def wrapper(request: Request) -> Response:
+            if not wsgi.METRICS_ENABLED:
+                return await handler(request)
+            started = time.perf_counter()
+            wsgi.http_in_flight.inc(route)
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            finally:
+                wsgi.http_in_flight.dec(route)
+                wsgi.http_latency.observe(time.perf_counter() - started, route, method)
+                wsgi.http_requests.inc(route, method, str(status))
+                if status >= 500:
+                    wsgi.http_errors.inc(route, method)
+        return wrapper
+    return decorator
+
+
+def _conditional(route: str):
+    """Async counterpart of the Flask `_conditional` decorator, sharing its cache"""
+    def decorator(handler):
+        async def wrapper(request: Request) -> Response:
+            user_id = request.path_params['user_id']
+            cache = wsgi.response_cache
+            try:
+                etag = await cache.etag_async(async_db, route, user_id)
+            except Exception as e:
+                logger.error(f"Response version lookup failed: {str(e)}")
+                return await handler(request)
+            if cache.not_modified_for(request.headers.get('if-none-match'), etag):
+                response = Response(status_code=304)
+            else:
+                body = cache.get(route, user_id, etag)
+                if body is not None:
+                    response = Response(body, media_type='application/json')
+                else:
+                    response = await handler(request)
+                    if response.status_code != 200:
+                        return response
+                    cache.put(route, user_id, etag, response.body)
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = ResponseCache.CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+
+@_instrumented('/recommendations/<int:user_id>', 'GET')
+@_conditional('recommendations')
+async def get_recommendations(request: Request) -> Response:
+    """Async GET /recommendations/<user_id>"""
+    user_id = request.path_params['user_id']
+    service = wsgi.recommendation_service
+    try:
+        recommendations = None
+        if wsgi.RECS_SERVE_MATERIALIZED:
+            try:
+                recommendations = await service.get_materialized_recommendations_async(async_db, user_id)
+            except Exception as e:
+                logger.error(f"Materialized recommendations unavailable: {str(e)}")
+        materialized = recommendations is not None
+        if not materialized:
+            snapshot = await load_snapshot_async(async_db, wsgi.db, user_id, profiles=service.interest_profiles)
+            recommendations = await run_in_threadpool(
+                service.get_personalized_recommendations, user_id, snapshot=snapshot
+            )
+        return _json({
+            'user_id': user_id,
+            'recommendations': recommendations,
+            'source': 'ai_model',
+            'materialized': materialized
+        })
+    except Exception as e:
+        logger.error(f"Error getting recommendations: {str(e)}")
+        return _json({'error': 'Failed to generate recommendations', 'message': str(e)}, 500)
+
+
+@_instrumented('/full-recommendations/<int:user_id>', 'GET')
+@_conditional('full-recommendations')
+async def full_recommendations(request: Request) -> Response:
+    """Async GET /full-recommendations/<user_id>"""
+    user_id = request.path_params['user_id']
+    service = wsgi.recommendation_service
+    try:
+        snapshot, _ = await asyncio.gather(
+            load_snapshot_async(async_db, wsgi.db, user_id, profiles=service.interest_profiles),
+            service.progress_cache.get_async(async_db, user_id)
+        )
+        data = await run_in_threadpool(service.get_full_recommendations, user_id, snapshot)
+        return _json(data)
+    except Exception as e:
+        logger.error(f"Full recommendations error: {str(e)}")
+        return _json({'error': 'Failed to get full recommendations', 'message': str(e)}, 500)
+
+
+@_instrumented('/learning-path/<int:user_id>', 'GET')
+@_conditional('learning-path')
+async def learning_path(request: Request) -> Response:
+    """Async GET /learning-path/<user_id>"""
+    user_id = request.path_params['user_id']
+    service = wsgi.recommendation_service
+    try:
+        # Only interests and completed modules are needed, not enrollments
+        snapshot = await load_snapshot_async(
+            async_db, wsgi.db, user_id, enrollments=False, profiles=service.interest_profiles
+        )
+        data = await run_in_threadpool(service.generate_learning_path, user_id, snapshot)
+        return _json(data)
+    except Exception as e:
+        logger.error(f"Learning path error: {str(e)}")
+        return _json({'error': 'Failed to generate learning path', 'message': str(e)}, 500)
+
+
+@_instrumented('/analyze-performance', 'POST')
+async def analyze_performance(request: Request) -> Response:
+    """Async POST /analyze-performance"""
+    service = wsgi.recommendation_service
+    try:
+        # A missing or invalid body fails like Flask's get_json() in the WSGI route
+        data = json.loads(await request.body())
+        user_id = data.get('user_id')
+        if not user_id:
+            return _json({'error': 'User ID is required'}, 400)
+
+        snapshot, _ = await asyncio.gather(
+            load_snapshot_async(
+                async_db, wsgi.db, user_id, enrollments=False, profiles=service.interest_profiles
+            ),
+            service.progress_cache.get_async(async_db, user_id)
+        )
+        analysis = await run_in_threadpool(service.analyze_student_performance, user_id, snapshot)
+        return _json(analysis)
+    except Exception as e:
+        logger.error(f"Performance analysis error: {str(e)}")
+        return _json({'error': 'Failed to analyze performance', 'message': str(e)}, 500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    await async_db.start()
+    try:
+        yield
+    finally:
+        await async_db.close()
+
+
+app = Starlette(
+    routes=[
+        Route('/recommendations/{user_id:int}', get_recommendations, methods=['GET']),
+        Route('/full-recommendations/{user_id:int}', full_recommendations, methods=['GET']),
+        Route('/learning-path/{user_id:int}', learning_path, methods=['GET']),
+        Route('/analyze-performance', analyze_performance, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(wsgi.app)),
+    ],
+    lifespan=lifespan
+)
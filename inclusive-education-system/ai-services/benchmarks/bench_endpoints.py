@@ -0,0 +1,249 @@
+"""
+End-to-end benchmark of the AI service endpoints at synthetic scale
+
+Builds (or reuses) a SQLite stand-in database shaped like
+database/schema.sql, wires the Flask app to it through `SQLiteConnector`
+and drives each endpoint through the test client from `--concurrency`
+threads. Latency percentiles, throughput and error counts per endpoint are
+written as JSON, together with the commit and scale, so runs can be
+compared across commits with `--compare`.
+
+Usage (from ai-services/):
+    python -m benchmarks.bench_endpoints --scale small --output results.json
+    python -m benchmarks.bench_endpoints --scale large --compare results.json
+
+Scales: small (2k users, 200 courses, 100k performance rows), medium
+(20k / 2k / 1M) and large (100k / 10k / 5M); --users, --courses and
+--performance override them. Databases are cached in --db-dir by scale
+seed and schema, since the large one takes a while to generate.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from benchmarks.bench_summarizer import make_document  # noqa: E402
+from benchmarks.sqlite_db import DEFAULT_SCHEMA, SQLiteConnector, build_database  # noqa: E402
+
+SCALES = {
+    'small': {'users': 2000, 'courses': 200, 'performance': 100000},
+    'medium': {'users': 20000, 'courses': 2000, 'performance': 1000000},
+    'large': {'users': 100000, 'courses': 10000, 'performance': 5000000},
+}
+ENDPOINTS = ('recommendations', 'full-recommendations', 'learning-path', 'analyze-performance', 'chatbot', 'summarize')
+CHAT_MESSAGES = (
+    'How am I doing in my courses?',
+    'Can you explain recursion?',
+    'I need help with math',
+    'What should I study next?',
+    'hello',
+)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_app(db_path: str, pool_size: int, work_dir: str):
+    """Import the Flask app with its DatabaseConnector replaced by the SQLite stand-in"""
+    os.environ.setdefault('RECS_MATERIALIZE_INTERVAL_SECONDS', '0')
+    os.environ.setdefault('INTEREST_UPDATE_INTERVAL_SECONDS', '0')
+    os.environ['SUMMARY_CACHE_DIR'] = os.path.join(work_dir, 'summary_cache')
+    os.environ['SUMMARY_JOBS_DIR'] = os.path.join(work_dir, 'summary_jobs')
+    import database.db_connector as db_connector
+
+    db_connector.DatabaseConnector = lambda: SQLiteConnector(db_path, pool_size)
+    import app as service
+    return service
+
+
+def make_request(client, endpoint: str, user_id: int, rng: random.Random, document=None):
+    if endpoint == 'recommendations':
+        return client.get(f'/recommendations/{user_id}')
+    if endpoint == 'full-recommendations':
+        return client.get(f'/full-recommendations/{user_id}')
+    if endpoint == 'learning-path':
+        return client.get(f'/learning-path/{user_id}')
+    if endpoint == 'analyze-performance':
+        return client.post('/analyze-performance', json={'user_id': user_id})
+    if endpoint == 'chatbot':
+        return client.post('/chatbot', json={'user_id': user_id, 'message': rng.choice(CHAT_MESSAGES)})
+    return client.post('/summarize', data={'text': document})
+
+
+def run_endpoint(service, endpoint: str, user_ids, requests: int, warmup: int, concurrency: int, seed: int):
+    # Distinct documents, so every summarize request pays for summarization rather than a cache hit
+    documents = [make_document(5, seed=seed + i) for i in range(requests + warmup)] if endpoint == 'summarize' else []
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(index: int, count: int, record: bool):
+        rng = random.Random(seed * 1000 + index)
+        client = service.app.test_client()
+        local, failed = [], 0
+        for _ in range(count):
+            document = None
+            if documents:
+                with lock:
+                    document = documents.pop()
+            started = time.perf_counter()
+            response = make_request(client, endpoint, rng.choice(user_ids), rng, document)
+            local.append(time.perf_counter() - started)
+            failed += response.status_code >= 400
+        if record:
+            with lock:
+                latencies.extend(local)
+                errors.append(failed)
+
+    def run(total: int, record: bool) -> float:
+        counts = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+        threads = [threading.Thread(target=worker, args=(i, n, record)) for i, n in enumerate(counts) if n]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    run(warmup, record=False)
+    elapsed = run(requests, record=True)
+    ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': int(sum(errors)),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p90_ms': round(float(np.percentile(ms, 90)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def compare(report: dict, baseline_path: str) -> dict:
+    """Relative change per endpoint against a previous report (negative latency change is faster)"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    changes = {'baseline_commit': baseline.get('meta', {}).get('commit')}
+    for endpoint, result in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(endpoint)
+        if not before:
+            continue
+        changes[endpoint] = {
+            field: round((result[field] - before[field]) / before[field] * 100, 1) if before[field] else None
+            for field in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end endpoint benchmark at synthetic scale')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--courses', type=int)
+    parser.add_argument('--performance', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='comma-separated subset of ' + ', '.join(ENDPOINTS))
+    parser.add_argument('--db-dir', default=os.path.join(tempfile.gettempdir(), 'ai-services-bench'))
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the database even if cached')
+    parser.add_argument('--materialize', action='store_true', help='materialize recommendations before measuring')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='previous JSON report to compare against')
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(',') if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f'unknown endpoints: {", ".join(sorted(unknown))}')
+    scale = dict(SCALES[args.scale])
+    scale.update({k: getattr(args, k) for k in ('users', 'courses', 'performance') if getattr(args, k)})
+
+    os.makedirs(args.db_dir, exist_ok=True)
+    # Keyed by schema too, so a schema change rebuilds the cached database
+    with open(DEFAULT_SCHEMA, 'rb') as f:
+        schema_digest = hashlib.sha1(f.read()).hexdigest()[:8]
+    db_path = os.path.join(
+        args.db_dir,
+        f"bench_{scale['users']}u_{scale['courses']}c_{scale['performance']}p_s{args.seed}_{schema_digest}.sqlite"
+    )
+    generated = None
+    if args.regenerate or not os.path.exists(db_path):
+        print(f'Generating {db_path} ...', file=sys.stderr)
+        generated = build_database(db_path, seed=args.seed, **scale)
+
+    logging.disable(logging.WARNING)
+    work_dir = tempfile.mkdtemp(prefix='ai-services-bench-')
+    service = load_app(db_path, pool_size=max(args.concurrency, 2), work_dir=work_dir)
+    students = [row['id'] for row in service.db.execute_query("SELECT id FROM users WHERE role = 'student'")]
+
+    # Fold the generated history into the interest profiles (a no-op once the cached database has them)
+    interest_profiles = service.interest_profiles.run_once() if service.INTEREST_PROFILES_ENABLED else None
+
+    materialized = None
+    if args.materialize:
+        materialized = service.recommendation_materializer.run_once(full=True)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'scale': scale,
+            'seed': args.seed,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'materialized': materialized,
+            'interest_profiles': interest_profiles,
+            'generated': generated,
+        },
+        'endpoints': {},
+    }
+    try:
+        for endpoint in endpoints:
+            print(f'Benchmarking {endpoint} ...', file=sys.stderr)
+            report['endpoints'][endpoint] = run_endpoint(
+                service, endpoint, students, args.requests, args.warmup, args.concurrency, args.seed
+            )
+    finally:
+        service.chat_log_writer.close()
+        service.summary_jobs.shutdown()
+        service.pdf_extractor.shutdown()
+
+    if args.compare:
+        report['compare'] = compare(report, args.compare)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+    return 0 if all(r['errors'] == 0 for r in report['endpoints'].values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
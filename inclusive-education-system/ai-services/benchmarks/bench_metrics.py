@@ -0,0 +1,112 @@
+"""
+Microbenchmark for the metrics instrumentation
+
+Measures the cost of the primitives (counter increment, histogram observe,
+query listener) and the end-to-end overhead per Flask request by timing
+GET /health through the test client with METRICS_ENABLED on and off.
+No database is needed.
+
+Usage (from ai-services/):
+    python -m benchmarks.bench_metrics [--requests 5000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.metrics import MetricsRegistry  # noqa: E402
+
+
+def per_op_ns(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def bench_primitives(n: int) -> dict:
+    registry = MetricsRegistry()
+    counter = registry.counter('bench_total', 'bench', ('route', 'method', 'status'))
+    histogram = registry.histogram('bench_seconds', 'bench', ('route', 'method'))
+    for i in range(50):
+        histogram.observe(0.01, f'/route/{i}', 'GET')
+    return {
+        'counter_inc_ns': round(per_op_ns(lambda: counter.inc('/chatbot', 'POST', '200'), n), 1),
+        'histogram_observe_ns': round(per_op_ns(lambda: histogram.observe(0.0123, '/chatbot', 'POST'), n), 1),
+        'render_50_series_us': round(per_op_ns(registry.render, 200) / 1000, 1),
+    }
+
+
+def bench_listener(n: int) -> dict:
+    from database.db_connector import DatabaseConnector
+
+    registry = MetricsRegistry()
+    latency = registry.histogram('q_seconds', 'bench', ('query',))
+    rows = registry.histogram('q_rows', 'bench', ('query',))
+    db = DatabaseConnector()
+    query = 'SELECT id FROM courses WHERE id = %s'
+    bare = per_op_ns(lambda: db._notify(None, query, (1,), time.perf_counter(), 10, None), n)
+    db.add_listener(lambda name, q, d, r, e, p: (latency.observe(d, name), rows.observe(r, name)))
+    instrumented = per_op_ns(lambda: db._notify(None, query, (1,), time.perf_counter(), 10, None), n)
+    return {'query_listener_ns': round(instrumented - bare, 1)}
+
+
+def request_child(requests: int):
+    """Runs inside a subprocess so METRICS_ENABLED is read at import time"""
+    import logging
+    logging.disable(logging.CRITICAL)
+    import app as service
+    client = service.app.test_client()
+    for _ in range(200):
+        client.get('/health')
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/health')
+    elapsed = time.perf_counter() - start
+    service.summary_jobs.shutdown()
+    print(json.dumps({'us_per_request': elapsed / requests * 1e6}))
+
+
+def bench_requests(requests: int, enabled: bool, repeat: int = 3) -> float:
+    env = dict(os.environ, METRICS_ENABLED='true' if enabled else 'false', RECS_MATERIALIZE_INTERVAL_SECONDS='0')
+    best = float('inf')
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_metrics', '--child', str(requests)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        best = min(best, json.loads(out)['us_per_request'])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Metrics instrumentation overhead')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--ops', type=int, default=200000)
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        request_child(args.child)
+        return 0
+
+    report = bench_primitives(args.ops)
+    report.update(bench_listener(args.ops))
+    off = bench_requests(args.requests, enabled=False)
+    on = bench_requests(args.requests, enabled=True)
+    report.update({
+        'request_us_metrics_off': round(off, 1),
+        'request_us_metrics_on': round(on, 1),
+        'request_overhead_us': round(on - off, 1),
+    })
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
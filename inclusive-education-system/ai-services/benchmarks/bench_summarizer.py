@@ -0,0 +1,93 @@
+"""
+Benchmark the extractive summarizer on synthetic documents
+
+Generates documents of increasing page counts (~3,000 characters per page),
+times SummarizationService.summarize() on each and checks that runtime grows
+linearly and that a 500-page document stays within the latency budget.
+
+Usage (from ai-services/):
+    python -m benchmarks.bench_summarizer [--pages 500] [--budget-ms 3000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.summarization_service import SummarizationService  # noqa: E402
+
+VOCABULARY = (
+    'algorithm variable function loop recursion array object class inheritance '
+    'database query index transaction network protocol request response server '
+    'client cache memory process thread scheduler compiler interpreter syntax '
+    'semantics module package library framework testing debugging deployment'
+).split()
+FILLER = 'the a of to and in is that for with as on by this'.split()
+CHARS_PER_PAGE = 3000
+
+
+def make_document(pages: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    target = pages * CHARS_PER_PAGE
+    while size < target:
+        words = [rng.choice(VOCABULARY if rng.random() < 0.5 else FILLER) for _ in range(rng.randint(8, 24))]
+        if rng.random() < 0.05:
+            words = ['For', 'example'] + words
+        sentence = ' '.join(words).capitalize() + '.'
+        parts.append(sentence)
+        size += len(sentence) + 1
+        if rng.random() < 0.1:
+            parts.append('\n')
+    return ' '.join(parts)
+
+
+def time_summary(service: SummarizationService, text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        service.summarize(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--budget-ms', type=float, default=3000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    service = SummarizationService()
+    results = []
+    for pages in sorted({max(1, args.pages // 8), max(1, args.pages // 4), max(1, args.pages // 2), args.pages}):
+        text = make_document(pages)
+        elapsed = time_summary(service, text, args.repeat)
+        results.append({
+            'pages': pages,
+            'chars': len(text),
+            'ms': round(elapsed, 1),
+            'us_per_kchar': round(elapsed * 1000 / (len(text) / 1000), 2),
+        })
+
+    largest = results[-1]
+    # Linear scaling: cost per character at the largest size should stay close
+    # to the cost at the smallest size
+    growth = largest['us_per_kchar'] / max(results[0]['us_per_kchar'], 1e-9)
+    report = {
+        'results': results,
+        'per_char_growth': round(growth, 2),
+        'budget_ms': args.budget_ms,
+        'within_budget': largest['ms'] <= args.budget_ms,
+        'linear': growth < 2.0,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report['within_budget'] and report['linear'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
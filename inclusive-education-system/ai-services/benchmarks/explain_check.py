@@ -0,0 +1,175 @@
+"""
+EXPLAIN check for the hot per-user and per-course queries
+
+Runs each query's plan (EXPLAIN on MySQL, EXPLAIN QUERY PLAN on the SQLite
+stand-in) for the heaviest user and course in the database and asserts
+that the composite indexes from database/schema.sql are used, that the
+listed tables are read from the index alone, and that no result is sorted
+after the fact (no filesort / temp B-tree for ORDER BY). The queries are
+the services' own statements, so a rewrite that loses an index fails here.
+
+Usage (from ai-services/):
+    python -m benchmarks.explain_check --scale medium
+    python -m benchmarks.explain_check --mysql        # DB_* settings from .env
+
+Run MySQL checks against production-like volume: on near-empty tables the
+optimizer may rightly prefer a full scan. Exits non-zero if a check fails.
+tests/test_query_plans.py runs the same checks under pytest.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_endpoints import SCALES  # noqa: E402
+from benchmarks.sqlite_db import DEFAULT_SCHEMA, SQLiteConnector, build_database  # noqa: E402
+from services.interest_profiles import InterestProfiles  # noqa: E402
+from services.progress_cache import ProgressAggregateCache  # noqa: E402
+from services.response_cache import ResponseCache  # noqa: E402
+from services.user_snapshot import UserSnapshot  # noqa: E402
+
+# Backend course page (routes/students.js): a course's modules in order
+COURSE_MODULES_QUERY = """
+    SELECT id, title, module_order, duration_minutes
+    FROM modules
+    WHERE course_id = %s
+    ORDER BY module_order ASC
+"""
+
+# Category browse: published courses of one category
+PUBLISHED_CATEGORY_QUERY = """
+    SELECT id, category
+    FROM courses
+    WHERE is_published = TRUE AND category = %s
+"""
+
+# (name, query, params, {table alias: (table, expected index)}, aliases read from the index alone)
+CHECKS = [
+    ('user_performance', UserSnapshot.PERFORMANCE_QUERY, lambda s: (s['user'],),
+     {'p': ('performance', 'idx_user_timestamp')}, ('p',)),
+    ('user_performance_summary', UserSnapshot.PERFORMANCE_SUMMARY_QUERY, lambda s: (s['user'],),
+     {'p': ('performance', 'idx_user_timestamp')}, ('p',)),
+    ('user_completed_modules', UserSnapshot.COMPLETED_MODULES_QUERY, lambda s: (s['user'],),
+     {'performance': ('performance', 'idx_user_timestamp')}, ('performance',)),
+    ('progress_version', ProgressAggregateCache.VERSION_QUERY, lambda s: (s['user'],),
+     {'performance': ('performance', 'idx_user_id')}, ('performance',)),
+    ('progress_aggregate', ProgressAggregateCache.AGGREGATE_QUERY, lambda s: (s['user'],),
+     {'performance': ('performance', 'idx_user_timestamp')}, ('performance',)),
+    ('response_version', ResponseCache.VERSION_QUERY, lambda s: (s['user'], s['user'], s['user'], 86400),
+     {'performance': ('performance', 'idx_user_id')}, ('performance',)),
+    # The unfolded tail seeks (user_id, id) in idx_user_id instead of reading the whole history
+    ('user_interests', InterestProfiles.INTERESTS_QUERY, lambda s: (s['user'], s['user'], s['user']),
+     {'p': ('performance', 'idx_user_id')}, ()),
+    ('course_modules', COURSE_MODULES_QUERY, lambda s: (s['course'],),
+     {'modules': ('modules', 'idx_course_order')}, ()),
+    ('published_category_courses', PUBLISHED_CATEGORY_QUERY, lambda s: (s['category'],),
+     {'courses': ('courses', 'idx_published_category')}, ('courses',)),
+]
+
+SAMPLE_QUERIES = {
+    'user': "SELECT user_id as value FROM performance GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1",
+    'course': "SELECT course_id as value FROM modules GROUP BY course_id ORDER BY COUNT(*) DESC LIMIT 1",
+    'category': (
+        "SELECT category as value FROM courses WHERE is_published = TRUE "
+        "GROUP BY category ORDER BY COUNT(*) DESC LIMIT 1"
+    ),
+}
+
+_SQLITE_ACCESS_RE = re.compile(r'^(?:SEARCH|SCAN) (\w+)(?: USING (COVERING )?INDEX (\w+))?')
+
+
+def mysql_plan(db, query, params):
+    """{alias: (index, covering)} and whether anything is filesorted, from MySQL EXPLAIN"""
+    access, sorted_after = {}, False
+    for row in db.execute_query('EXPLAIN ' + query, params):
+        extra = [part.strip() for part in (row.get('Extra') or '').split(';')]
+        sorted_after = sorted_after or 'Using filesort' in extra
+        if row.get('table') and not row['table'].startswith('<'):
+            access[row['table']] = (row.get('key'), 'Using index' in extra)
+    return access, sorted_after
+
+
+def sqlite_plan(db, query, params):
+    """{alias: (index, covering)} and whether anything is sorted, from SQLite EXPLAIN QUERY PLAN"""
+    access, sorted_after = {}, False
+    for row in db.execute_query('EXPLAIN QUERY PLAN ' + query, params):
+        detail = row['detail']
+        sorted_after = sorted_after or detail.startswith('USE TEMP B-TREE FOR') and 'ORDER BY' in detail
+        match = _SQLITE_ACCESS_RE.match(detail)
+        if match:
+            access[match.group(1)] = (match.group(3), bool(match.group(2)))
+    return access, sorted_after
+
+
+def sample_values(db) -> dict:
+    """The heaviest user and course and the largest published category"""
+    return {key: db.execute_query(query)[0]['value'] for key, query in SAMPLE_QUERIES.items()}
+
+
+def plan_problems(db, sqlite: bool, check, samples) -> list:
+    """Ways one CHECKS entry's plan falls short; empty when it uses its indexes as expected"""
+    name, query, params, indexes, covering = check
+    access, sorted_after = (sqlite_plan if sqlite else mysql_plan)(db, query, params(samples))
+    problems = []
+    for alias, (table, index) in indexes.items():
+        expected = f'{table}_{index}' if sqlite else index
+        used, covered = access.get(alias, (None, False))
+        if used != expected:
+            problems.append(f'{alias} uses {used or "no index"}, expected {expected}')
+        elif alias in covering and not covered:
+            problems.append(f'{alias} reads table rows, expected {expected} to cover the query')
+    if sorted_after:
+        problems.append('result is sorted after the fact (filesort)')
+    return problems
+
+
+def run_checks(db, sqlite: bool):
+    samples = sample_values(db)
+    failures = 0
+    for check in CHECKS:
+        problems = plan_problems(db, sqlite, check, samples)
+        failures += bool(problems)
+        print(f"{'FAIL' if problems else 'ok  '} {check[0]}" + ''.join(f'\n     - {p}' for p in problems))
+    print(f'{len(CHECKS) - failures}/{len(CHECKS)} checks passed (samples: {samples})')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Assert index use of the hot queries with EXPLAIN')
+    parser.add_argument('--mysql', action='store_true', help='check the MySQL database from DB_* settings')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db-dir', default=os.path.join(tempfile.gettempdir(), 'ai-services-bench'))
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.mysql:
+        from dotenv import load_dotenv
+        from database.db_connector import DatabaseConnector
+
+        load_dotenv()
+        return 1 if run_checks(DatabaseConnector(), sqlite=False) else 0
+
+    # Same cache key as bench_endpoints, so both reuse one generated database
+    scale = SCALES[args.scale]
+    with open(DEFAULT_SCHEMA, 'rb') as f:
+        schema_digest = hashlib.sha1(f.read()).hexdigest()[:8]
+    os.makedirs(args.db_dir, exist_ok=True)
+    db_path = os.path.join(
+        args.db_dir,
+        f"bench_{scale['users']}u_{scale['courses']}c_{scale['performance']}p_s{args.seed}_{schema_digest}.sqlite"
+    )
+    if not os.path.exists(db_path):
+        print(f'Generating {db_path} ...', file=sys.stderr)
+        build_database(db_path, seed=args.seed, **scale)
+    return 1 if run_checks(SQLiteConnector(db_path, 2), sqlite=True) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
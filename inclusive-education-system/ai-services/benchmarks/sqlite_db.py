@@ -0,0 +1,336 @@
+"""
+Local SQLite stand-in for the MySQL database, used by the benchmarks
+
+`build_database()` translates `database/schema.sql` to SQLite and fills it
+with synthetic data at a configurable scale; `SQLiteConnector` is a
+`DatabaseConnector` whose pooled connections run the services' MySQL
+statements against that file. The statements are rewritten on the fly
+(`%s` placeholders, `INSERT IGNORE`, `NOW() - INTERVAL n SECOND`, `UNIX_TIMESTAMP()`,
+`ON DUPLICATE KEY UPDATE`, `GET_LOCK`), so the services, query listeners and pool are exercised
+unchanged. Absolute numbers are not MySQL numbers; the point is comparing
+runs of the same scale across commits.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
+from pymysql.cursors import DictCursorMixin
+from pymysql.err import OperationalError
+
+from database.db_connector import ConnectionPool, DatabaseConnector
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCHEMA = os.path.join(os.path.dirname(ROOT), 'database', 'schema.sql')
+
+CATEGORIES = (
+    'Computer Science', 'Web Development', 'Mathematics', 'Data Science', 'Languages',
+    'Physics', 'Biology', 'History', 'Art', 'Music', 'Business', 'Accessibility'
+)
+CHUNK_ROWS = 200000
+
+_INDEX_RE = re.compile(r'^INDEX\s+(\w+)\s*\((.+)\)$', re.IGNORECASE)
+_UNIQUE_KEY_RE = re.compile(r'^UNIQUE\s+KEY\s+\w+\s*(\(.+\))$', re.IGNORECASE)
+_ENUM_RE = re.compile(r'\bENUM\s*\([^)]*\)', re.IGNORECASE)
+_INTERVAL_RE = re.compile(r'(\w+\(\)|[\w.]+|\?)\s*-\s*INTERVAL\s+(\?|\d+)\s+SECOND', re.IGNORECASE)
+_VALUES_REF_RE = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_UNIX_TIMESTAMP_RE = re.compile(r'\bUNIX_TIMESTAMP\(([\w.]+)\)', re.IGNORECASE)
+_translated = {}
+
+
+def translate_schema(sql: str) -> List[str]:
+    """
+    Translate the MySQL DDL in schema.sql to SQLite statements
+
+    Only CREATE TABLE statements are kept (seed INSERTs are replaced by
+    synthetic data). Inline `INDEX` definitions become separate
+    `CREATE INDEX` statements, returned after all tables.
+    """
+    tables, indexes = [], []
+    sql = re.sub(r'--[^\n]*', '', sql)
+    for statement in sql.split(';'):
+        lines = [line.strip() for line in statement.splitlines() if line.strip()]
+        if not lines or not lines[0].upper().startswith('CREATE TABLE'):
+            continue
+        table = re.match(r'CREATE TABLE\s+(?:IF NOT EXISTS\s+)?(\w+)', lines[0], re.IGNORECASE).group(1)
+        columns = []
+        for line in lines[1:]:
+            line = line.rstrip(',')
+            if line.startswith(')'):
+                break
+            index = _INDEX_RE.match(line)
+            if index:
+                indexes.append(f'CREATE INDEX IF NOT EXISTS {table}_{index.group(1)} ON {table} ({index.group(2)})')
+                continue
+            unique = _UNIQUE_KEY_RE.match(line)
+            if unique:
+                columns.append(f'UNIQUE {unique.group(1)}')
+                continue
+            line = re.sub(r'\bINT\s+AUTO_INCREMENT\s+PRIMARY KEY\b', 'INTEGER PRIMARY KEY', line, flags=re.IGNORECASE)
+            line = _ENUM_RE.sub('TEXT', line)
+            line = re.sub(r'\s+ON UPDATE CURRENT_TIMESTAMP', '', line, flags=re.IGNORECASE)
+            columns.append(line)
+        tables.append(f'CREATE TABLE IF NOT EXISTS {table} (\n    ' + ',\n    '.join(columns) + '\n)')
+    return tables + indexes
+
+
+def translate_query(query: str) -> str:
+    """Rewrite a MySQL statement used by the services into SQLite syntax"""
+    translated = _translated.get(query)
+    if translated is None:
+        translated = query.replace('%s', '?')
+        translated = re.sub(r'^(\s*)INSERT IGNORE', r'\1INSERT OR IGNORE', translated, flags=re.IGNORECASE)
+        translated = _INTERVAL_RE.sub(r"datetime(\1, '-' || \2 || ' seconds')", translated)
+        translated = _UNIX_TIMESTAMP_RE.sub(r"CAST(strftime('%s', \1) AS INTEGER)", translated)
+        if 'ON DUPLICATE KEY UPDATE' in translated.upper():
+            translated = re.sub(r'ON DUPLICATE KEY UPDATE', 'ON CONFLICT DO UPDATE SET', translated, flags=re.IGNORECASE)
+            translated = _VALUES_REF_RE.sub(r'excluded.\1', translated)
+        if len(_translated) < 10000:
+            _translated[query] = translated
+    return translated
+
+
+def _now() -> str:
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class _Cursor:
+    """DB-API cursor that translates MySQL statements and returns dict rows"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, query, params=None):
+        try:
+            self._cursor.execute(translate_query(query), tuple(params) if params is not None else ())
+        except sqlite3.Error as e:
+            # Surface as a PyMySQL error so the services' error handling applies
+            raise OperationalError(str(e)) from e
+
+    def executemany(self, query, rows):
+        try:
+            self._cursor.executemany(translate_query(query), [tuple(row) for row in rows])
+        except sqlite3.Error as e:
+            raise OperationalError(str(e)) from e
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def close(self):
+        self._cursor.close()
+
+
+class _Connection:
+    """The subset of a PyMySQL connection used by DatabaseConnector and ConnectionPool"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+        self.open = True  # ConnectionPool only reuses connections that report open
+
+    def cursor(self, cursor_class=None):
+        cursor = self._connection.cursor()
+        if cursor_class is not None and not issubclass(cursor_class, DictCursorMixin):
+            cursor.row_factory = None  # SSCursor / Cursor: plain tuples
+        return _Cursor(cursor)
+
+    def begin(self):
+        self._connection.execute('BEGIN')
+
+    def commit(self):
+        # Autocommit like the MySQL connections; only an explicit begin() opens a transaction
+        if self._connection.in_transaction:
+            self._connection.commit()
+
+    def rollback(self):
+        if self._connection.in_transaction:
+            self._connection.rollback()
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.open = False
+        self._connection.close()
+
+
+class SQLiteConnector(DatabaseConnector):
+    """DatabaseConnector backed by a local SQLite file"""
+
+    def __init__(self, path: str, pool_size: int = 8):
+        self.path = path
+        self.pool = ConnectionPool(
+            self.connect,
+            min_size=1,
+            max_size=pool_size,
+            timeout=30,
+            recycle=10 ** 9,
+            idle_timeout=10 ** 9,
+            ping_interval=10 ** 9
+        )
+        self._listeners = []
+        self.stream_chunk_rows = 1000
+        self.bulk_insert_rows = 1000
+        self._transaction = threading.local()
+
+    def connect(self):
+        """Open a new SQLite connection with the MySQL functions the services use"""
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        connection.row_factory = _dict_row
+        connection.create_function('NOW', 0, _now)
+        connection.create_function('GET_LOCK', 2, lambda name, timeout: 1)
+        connection.create_function('RELEASE_LOCK', 1, lambda name: 1)
+        return _Connection(connection)
+
+
+def _insert(connection: sqlite3.Connection, query: str, columns: Iterable[List]):
+    connection.executemany(query, zip(*columns))
+
+
+def _timestamps(rng, size: int, now: int, days: int = 365) -> List[int]:
+    return (now - rng.integers(0, days * 86400, size=size)).tolist()
+
+
+def build_database(path: str, users: int, courses: int, performance: int,
+                   modules_per_course: int = 5, enrollments_per_user: int = 5,
+                   seed: int = 42, schema_path: str = DEFAULT_SCHEMA) -> Dict:
+    """
+    Create a SQLite database with schema.sql's tables and synthetic data
+
+    Args:
+        path: Database file to write (replaced atomically when complete)
+        users: Number of users (about 95% students)
+        courses: Number of courses, each with `modules_per_course` modules
+        performance: Number of `performance` rows, drawn from users' enrolled courses
+        modules_per_course: Modules per course
+        enrollments_per_user: Mean enrollments per user (Poisson, popularity-skewed)
+        seed: Random seed; the same arguments always produce the same data
+        schema_path: MySQL schema to translate
+
+    Returns:
+        Row counts per table and the generation time
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    now = int(time.time())
+    building = f'{path}.building'
+    if os.path.exists(building):
+        os.remove(building)
+    with open(schema_path, encoding='utf-8') as f:
+        statements = translate_schema(f.read())
+    tables = [s for s in statements if s.startswith('CREATE TABLE')]
+    indexes = [s for s in statements if s.startswith('CREATE INDEX')]
+
+    connection = sqlite3.connect(building, isolation_level=None)
+    connection.execute('PRAGMA journal_mode = OFF')
+    connection.execute('PRAGMA synchronous = OFF')
+    for statement in tables:
+        connection.execute(statement)
+    connection.execute('BEGIN')
+
+    ids = np.arange(1, users + 1)
+    roles = rng.choice(['student', 'peer_mentor', 'admin'], size=users, p=[0.95, 0.04, 0.01])
+    _insert(connection, 'INSERT INTO users (id, name, email, password_hash, role) VALUES (?, ?, ?, ?, ?)', [
+        ids.tolist(), [f'User {i}' for i in ids], [f'user{i}@bench.local' for i in ids], ['x'] * users, roles.tolist()
+    ])
+
+    course_ids = np.arange(1, courses + 1)
+    _insert(connection, """
+        INSERT INTO courses (id, title, description, category, difficulty_level, estimated_hours, created_by, is_published)
+        VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+    """, [
+        course_ids.tolist(),
+        [f'Course {i}' for i in course_ids],
+        [f'Synthetic course {i}' for i in course_ids],
+        rng.choice(CATEGORIES, size=courses).tolist(),
+        rng.choice(['beginner', 'intermediate', 'advanced'], size=courses).tolist(),
+        rng.integers(5, 60, size=courses).tolist(),
+        (rng.random(courses) < 0.95).astype(int).tolist(),
+    ])
+
+    # Module ids are contiguous per course: (course_id - 1) * modules_per_course + order
+    module_count = courses * modules_per_course
+    module_ids = np.arange(1, module_count + 1)
+    orders = (module_ids - 1) % modules_per_course + 1
+    _insert(connection, """
+        INSERT INTO modules (id, course_id, title, module_order, duration_minutes) VALUES (?, ?, ?, ?, ?)
+    """, [
+        module_ids.tolist(),
+        ((module_ids - 1) // modules_per_course + 1).tolist(),
+        [f'Module {i}' for i in module_ids],
+        orders.tolist(),
+        rng.integers(15, 90, size=module_count).tolist(),
+    ])
+    chained = module_ids[(orders > 1) & (rng.random(module_count) < 0.3)]
+    _insert(connection, 'INSERT INTO module_prerequisites (module_id, prerequisite_module_id) VALUES (?, ?)',
+            [chained.tolist(), (chained - 1).tolist()])
+
+    # Popularity-skewed enrollments, deduplicated per (user, course)
+    per_user = np.minimum(rng.poisson(enrollments_per_user, size=users), courses)
+    weights = 1.0 / np.arange(1, courses + 1) ** 0.8
+    enrolled_users = np.repeat(ids, per_user)
+    enrolled_courses = rng.choice(course_ids, size=len(enrolled_users), p=weights / weights.sum())
+    pairs = np.unique(enrolled_users.astype(np.int64) * (courses + 1) + enrolled_courses)
+    enrolled_users, enrolled_courses = pairs // (courses + 1), pairs % (courses + 1)
+    n_enrollments = len(pairs)
+    _insert(connection, """
+        INSERT INTO course_enrollments (user_id, course_id, enrolled_at, progress_percentage, status)
+        VALUES (?, ?, datetime(?, 'unixepoch'), ?, ?)
+    """, [
+        enrolled_users.tolist(),
+        enrolled_courses.tolist(),
+        _timestamps(rng, n_enrollments, now),
+        np.round(rng.uniform(0, 100, size=n_enrollments), 2).tolist(),
+        rng.choice(['active', 'completed', 'dropped'], size=n_enrollments, p=[0.7, 0.2, 0.1]).tolist(),
+    ])
+
+    # Performance rows belong to modules of courses the user is enrolled in
+    written = 0
+    while written < performance and n_enrollments:
+        size = min(CHUNK_ROWS, performance - written)
+        picks = rng.integers(0, n_enrollments, size=size)
+        scores = np.round(rng.uniform(0, 100, size=size), 2)
+        scores[rng.random(size) < 0.1] = 0
+        _insert(connection, """
+            INSERT INTO performance (user_id, module_id, score, completion_status, time_spent_minutes, timestamp)
+            VALUES (?, ?, ?, ?, ?, datetime(?, 'unixepoch'))
+        """, [
+            enrolled_users[picks].tolist(),
+            ((enrolled_courses[picks] - 1) * modules_per_course + rng.integers(1, modules_per_course + 1, size=size)).tolist(),
+            scores.tolist(),
+            rng.choice(['not_started', 'in_progress', 'completed'], size=size, p=[0.1, 0.4, 0.5]).tolist(),
+            rng.integers(0, 120, size=size).tolist(),
+            _timestamps(rng, size, now),
+        ])
+        written += size
+
+    connection.execute('COMMIT')
+    for statement in indexes:
+        connection.execute(statement)
+    connection.execute('ANALYZE')
+    connection.execute('PRAGMA journal_mode = WAL')
+    connection.close()
+    os.replace(building, path)
+
+    return {
+        'users': users,
+        'courses': courses,
+        'modules': module_count,
+        'module_prerequisites': len(chained),
+        'course_enrollments': n_enrollments,
+        'performance': written,
+        'generate_seconds': round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import time
+
+import aiomysql
+from pymysql import MySQLError as Error
+
+from database.db_connector import SESSION_INIT_COMMAND, PoolTimeoutError, QueryBudgetExceeded, query_name
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseConnector:
+    """
+    asyncio database connector for MySQL, used by the ASGI serving mode
+
+    Wraps an aiomysql pool with the same connection settings, statement
+    naming and listener hooks as `DatabaseConnector`, so metrics and the
+    slow-query log see async statements too. Independent statements of one
+    request can run concurrently, each on its own pooled connection.
+    """
+
+    def __init__(self):
+        self.host = os.getenv('DB_HOST', 'localhost')
+        self.port = int(os.getenv('DB_PORT', 3306))
+        self.user = os.getenv('DB_USER', 'root')
+        self.password = os.getenv('DB_PASSWORD', '')
+        self.database = os.getenv('DB_NAME', 'inclusive_education')
+        self.min_size = int(os.getenv('DB_ASYNC_POOL_MIN_SIZE', 1))
+        self.max_size = int(os.getenv('DB_ASYNC_POOL_MAX_SIZE', 20))
+        self.timeout = float(os.getenv('DB_POOL_TIMEOUT', 5))
+        self.recycle = int(os.getenv('DB_POOL_RECYCLE', 3600))
+        self.pool = None
+        self._listeners = []
+        self._stats = {'checkouts': 0, 'timeouts': 0}
+
+    async def start(self):
+        """Create the connection pool; must run inside the serving event loop"""
+        if self.pool is not None:
+            return
+        self.pool = await aiomysql.create_pool(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            db=self.database,
+            minsize=self.min_size,
+            maxsize=self.max_size,
+            pool_recycle=self.recycle,
+            cursorclass=aiomysql.DictCursor,
+            autocommit=True,
+            init_command=SESSION_INIT_COMMAND
+        )
+        logger.info(f"✅ Async database pool ready (max {self.max_size} connections)")
+
+    async def close(self):
+        """Close all pooled connections"""
+        if self.pool is None:
+            return
+        self.pool.close()
+        await self.pool.wait_closed()
+        self.pool = None
+        logger.info("Async database connection pool closed")
+
+    def pool_stats(self):
+        """Return connection pool statistics"""
+        stats = dict(self._stats)
+        if self.pool is not None:
+            stats.update({
+                'size': self.pool.size,
+                'idle': self.pool.freesize,
+                'in_use': self.pool.size - self.pool.freesize,
+                'min_size': self.pool.minsize,
+                'max_size': self.pool.maxsize,
+            })
+        return stats
+
+    def add_listener(self, listener):
+        """Register a callback run after every statement (see DatabaseConnector.add_listener)"""
+        self._listeners.append(listener)
+
+    def _notify(self, name, query, params, started, rows, error):
+        if not self._listeners:
+            return
+        duration = time.perf_counter() - started
+        name = name or query_name(query)
+        for listener in self._listeners:
+            try:
+                listener(name, query, duration, rows, error, params)
+            except QueryBudgetExceeded:
+                raise
+            except Exception as e:
+                logger.error(f"Query listener error: {e}")
+
+    async def _acquire(self):
+        if self.pool is None:
+            await self.start()
+        try:
+            connection = await asyncio.wait_for(self.pool.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            raise PoolTimeoutError(
+                f'No database connection available after {self.timeout}s (pool size {self.max_size})'
+            )
+        self._stats['checkouts'] += 1
+        return connection
+
+    async def execute_query(self, query, params=None, name=None):
+        """Execute a SELECT query and return results"""
+        started = time.perf_counter()
+        rows = None
+        error = None
+        try:
+            connection = await self._acquire()
+            try:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(query, params)
+                    rows = await cursor.fetchall()
+                    return rows
+            finally:
+                self.pool.release(connection)
+        except Error as e:
+            error = e
+            logger.error(f"Query execution error: {e}")
+            raise
+        finally:
+            self._notify(name, query, params, started, len(rows) if rows is not None else 0, error)
@@ -0,0 +1,197 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+import pymysql
+
+from database.db_connector import PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True for failures every row would hit alike (no server, no pooled connection)"""
+    if isinstance(error, (pymysql.err.InterfaceError, PoolTimeoutError)):
+        return True
+    # 2000-2999 are client-side connection errors (CR_*), e.g. 2003 can't connect, 2013 lost connection
+    code = error.args[0] if isinstance(error, pymysql.err.OperationalError) and error.args else None
+    return isinstance(code, int) and 2000 <= code < 3000
+
+
+class BatchWriter:
+    """
+    Background writer that batches rows into multi-row INSERTs
+
+    Producers call `submit()` (or `submit_many()` for a whole batch) which
+    only appends to a bounded in-process buffer of at most `max_queue` rows.
+    A daemon thread drains it and writes rows with `execute_many`, or the
+    `write` callable if one is given, every `flush_rows` rows or
+    `flush_interval_ms` milliseconds, whichever comes first. When the buffer
+    is full, submitting waits at most `enqueue_timeout_ms` and then drops
+    the rows, so callers never block on the database. A chunk that fails is
+    retried row by row, so only the offending rows are lost. Pending rows
+    are flushed on shutdown.
+    """
+
+    def __init__(
+        self,
+        db_connector,
+        query: str,
+        name: str = 'batch_writer',
+        max_queue: int = 10000,
+        flush_rows: int = 100,
+        flush_interval_ms: int = 200,
+        enqueue_timeout_ms: int = 0,
+        write: Optional[Callable[[List], object]] = None
+    ):
+        self.db = db_connector
+        self.query = query
+        self.name = name
+        self.max_queue = max_queue
+        self._write = write
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.enqueue_timeout = enqueue_timeout_ms / 1000.0
+        self._rows = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'dropped': 0,
+            'flushed': 0,
+            'failed': 0,
+            'batches': 0,
+        }
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self._stats[key] += n
+
+    def start(self):
+        """Start the background flush thread (idempotent)"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, row) -> bool:
+        """Queue a row for writing; returns False if it was dropped"""
+        return self.submit_many([row])
+
+    def submit_many(self, rows: List) -> bool:
+        """Queue rows for writing, all or none; returns False if they were dropped"""
+        self.start()
+        count = len(rows)
+        with self._lock:
+            deadline = None
+            while len(self._rows) + count > self.max_queue:
+                if deadline is None:
+                    deadline = time.monotonic() + self.enqueue_timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or count > self.max_queue:
+                    self._count('dropped', count)
+                    return False
+                self._not_full.wait(remaining)
+            self._rows.extend(rows)
+            self._not_empty.notify()
+        self._count('enqueued', count)
+        return True
+
+    def _take(self, limit: int) -> List:
+        """Pop up to `limit` rows; caller holds the lock"""
+        batch = [self._rows.popleft() for _ in range(min(limit, len(self._rows)))]
+        if batch:
+            self._not_full.notify_all()
+        return batch
+
+    def _collect(self):
+        """Wait for the first row, then gather until the batch is full or the interval ends"""
+        with self._lock:
+            if not self._rows:
+                self._not_empty.wait(self.flush_interval)
+                if not self._rows:
+                    return []
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._rows) < self.flush_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+            return self._take(self.flush_rows)
+
+    def _drain(self):
+        with self._lock:
+            return self._take(len(self._rows))
+
+    def _flush(self, rows):
+        if not rows:
+            return
+        for start in range(0, len(rows), self.flush_rows):
+            chunk = rows[start:start + self.flush_rows]
+            try:
+                if self._write is not None:
+                    self._write(chunk)
+                else:
+                    self.db.execute_many(self.query, chunk)
+                self._count('flushed', len(chunk))
+                self._count('batches')
+            except Exception as e:
+                logger.error(f"{self.name}: failed to write {len(chunk)} rows: {e}")
+                if len(chunk) == 1 or _is_connection_error(e):
+                    self._count('failed', len(chunk))
+                else:
+                    # One bad row must not cost the rest of the chunk
+                    self._flush_rows(chunk)
+
+    def _flush_rows(self, rows):
+        """Write rows one at a time, counting each failure separately"""
+        for index, row in enumerate(rows):
+            try:
+                if self._write is not None:
+                    self._write([row])
+                else:
+                    self.db.execute_many(self.query, [row])
+                self._count('flushed')
+            except Exception as e:
+                logger.error(f"{self.name}: failed to write row: {e}")
+                if _is_connection_error(e):
+                    self._count('failed', len(rows) - index)
+                    return
+                self._count('failed')
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._flush(self._collect())
+        self._flush(self._drain())
+
+    def close(self, timeout: float = 5.0):
+        """Stop the writer and flush everything still queued"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout)
+        self._thread = None
+        # Rows submitted after the thread exited are flushed here
+        self._flush(self._drain())
+        logger.info(f"{self.name}: closed ({self.get_stats()})")
+
+    def get_stats(self):
+        """Counters for enqueued, dropped, flushed and failed rows"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queued'] = len(self._rows)
+        return stats
@@ -1,92 +1,577 @@
 import pymysql
 from pymysql import MySQLError as Error
-from pymysql.cursors import DictCursor
+from pymysql.cursors import DictCursor, SSCursor, SSDictCursor
+from contextlib import contextmanager
+from collections import deque
 import os
+import re
+import threading
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+_TABLE_RE = re.compile(r'\b(?:from|into|update|join)\s+`?(\w+)', re.IGNORECASE)
+_IDENTIFIER_RE = re.compile(r'^\w+$')
+_query_names = {}
+
+
+def query_name(query):
+    """Label for a query without an explicit name, e.g. 'select_performance'"""
+    name = _query_names.get(query)
+    if name is None:
+        words = query.split(None, 1)
+        verb = words[0].lower() if words else 'query'
+        table = _TABLE_RE.search(query)
+        name = f"{verb}_{table.group(1).lower()}" if table else verb
+        if len(_query_names) < 10000:
+            _query_names[query] = name
+    return name
+
+
+# TIMESTAMP values are read and written as UTC wall-clock time, whatever the server's zone
+SESSION_INIT_COMMAND = "SET time_zone = '+00:00'"
+
+
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a request issues more queries than its budget"""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of PyMySQL connections
+
+    Connections are checked out per thread: nested checkouts on the same
+    thread reuse the connection already held instead of taking another one.
+    Idle connections are health-checked on checkout and recycled once they
+    exceed their idle timeout or maximum lifetime.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=5.0,
+                 recycle=3600, idle_timeout=300, ping_interval=30):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, created_at, returned_at)
+        self._created_at = {}
+        self._size = 0
+        self._closed = False
+        self._filled = False
+        self._local = threading.local()
+
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total_ms': 0.0,
+            'wait_time_max_ms': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+        }
+
+    def _open(self):
+        """Open a new connection; caller must already own a size slot."""
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+            self._stats['created'] += 1
+        return conn
+
+    def _close(self, conn):
+        """Close a connection and give its slot back to the pool."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+            self._size -= 1
+            self._cond.notify()
+
+    def _fill_min(self):
+        """Open connections up to min_size on first use."""
+        with self._cond:
+            if self._filled:
+                return
+            self._filled = True
+            missing = max(0, self.min_size - self._size)
+            self._size += missing
+        for _ in range(missing):
+            try:
+                conn = self._open()
+            except Error as e:
+                logger.error(f"❌ Could not pre-fill connection pool: {e}")
+                return
+            with self._cond:
+                self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+                self._cond.notify()
+
+    def _is_usable(self, conn, created_at, returned_at):
+        """Check an idle connection before handing it out."""
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            return False
+        if self.idle_timeout and now - returned_at > self.idle_timeout:
+            return False
+        if not getattr(conn, 'open', False):
+            return False
+        if self.ping_interval is not None and now - returned_at >= self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._stats['health_check_failures'] += 1
+                return False
+        return True
+
+    def acquire(self):
+        """Take a connection out of the pool, waiting up to `timeout` seconds."""
+        self._fill_min()
+        deadline = None
+        waited_from = None
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise Error('Connection pool is closed')
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                else:
+                    if deadline is None:
+                        deadline = time.monotonic() + self.timeout
+                        waited_from = time.monotonic()
+                        self._stats['waits'] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f'No database connection available after {self.timeout}s '
+                            f'(pool size {self.max_size})'
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                conn = self._open()
+            elif not self._is_usable(conn, created_at, returned_at):
+                with self._cond:
+                    self._stats['recycled'] += 1
+                self._close(conn)
+                continue
+
+            with self._cond:
+                self._stats['checkouts'] += 1
+                if waited_from is not None:
+                    waited_ms = (time.monotonic() - waited_from) * 1000
+                    self._stats['wait_time_total_ms'] += waited_ms
+                    self._stats['wait_time_max_ms'] = max(self._stats['wait_time_max_ms'], waited_ms)
+            return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if it is broken."""
+        if discard or self._closed or not getattr(conn, 'open', False):
+            self._close(conn)
+            return
+        with self._cond:
+            created_at = self._created_at.get(id(conn), time.monotonic())
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the current thread."""
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        broken = False
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self.release(conn, discard=broken)
+
+    def close_all(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _, _ in idle:
+            self._close(conn)
+
+    def get_stats(self):
+        """Snapshot of pool sizes and checkout/wait counters."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        stats['wait_time_total_ms'] = round(stats['wait_time_total_ms'], 2)
+        stats['wait_time_max_ms'] = round(stats['wait_time_max_ms'], 2)
+        return stats
+
+
 class DatabaseConnector:
     """Database connector for MySQL"""
-    
+
     def __init__(self):
         self.host = os.getenv('DB_HOST', 'localhost')
         self.port = int(os.getenv('DB_PORT', 3306))
         self.user = os.getenv('DB_USER', 'root')
         self.password = os.getenv('DB_PASSWORD', '')
         self.database = os.getenv('DB_NAME', 'inclusive_education')
-        self.connection = None
-    
+        self.pool = ConnectionPool(
+            self.connect,
+            min_size=int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+            max_size=int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', 5)),
+            recycle=int(os.getenv('DB_POOL_RECYCLE', 3600)),
+            idle_timeout=int(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+            ping_interval=int(os.getenv('DB_POOL_PING_INTERVAL', 30))
+        )
+        self._listeners = []
+        self.stream_chunk_rows = int(os.getenv('DB_STREAM_CHUNK_ROWS', 1000))
+        self.bulk_insert_rows = int(os.getenv('DB_BULK_INSERT_ROWS', 1000))
+        self._transaction = threading.local()
+
     def connect(self):
-        """Establish database connection"""
+        """Open a new database connection"""
         try:
-            if self.connection is None or not getattr(self.connection, 'open', False):
-                self.connection = pymysql.connect(
-                    host=self.host,
-                    port=self.port,
-                    user=self.user,
-                    password=self.password,
-                    database=self.database,
-                    cursorclass=DictCursor,
-                    autocommit=True
-                )
-                logger.info("✅ Database connected successfully")
-            return self.connection
+            connection = pymysql.connect(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                database=self.database,
+                cursorclass=DictCursor,
+                autocommit=True,
+                init_command=SESSION_INIT_COMMAND
+            )
+            logger.info("✅ Database connected successfully")
+            return connection
         except Error as e:
             logger.error(f"❌ Database connection error: {e}")
             raise
-    
-    def _ensure_connection(self):
-        """Ensure connection is alive; reconnect if needed."""
-        if self.connection is None or not getattr(self.connection, 'open', False):
-            self.connect()
-    
+
     def disconnect(self):
-        """Close database connection"""
-        if self.connection and getattr(self.connection, 'open', False):
-            self.connection.close()
-            logger.info("Database connection closed")
-    
-    def execute_query(self, query, params=None):
+        """Close all pooled database connections"""
+        self.pool.close_all()
+        logger.info("Database connection pool closed")
+
+    def pool_stats(self):
+        """Return connection pool statistics"""
+        return self.pool.get_stats()
+
+    def add_listener(self, listener):
+        """
+        Register a callback run after every statement
+
+        Called as listener(name, query, duration_seconds, rows, error, params),
+        where rows is the number of rows returned (SELECT) or affected, and
+        error is the exception raised or None. Listeners must be cheap and
+        must not raise, except QueryBudgetExceeded which is passed through.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, name, query, params, started, rows, error):
+        if not self._listeners:
+            return
+        duration = time.perf_counter() - started
+        name = name or query_name(query)
+        for listener in self._listeners:
+            try:
+                listener(name, query, duration, rows, error, params)
+            except QueryBudgetExceeded:
+                raise
+            except Exception as e:
+                logger.error(f"Query listener error: {e}")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run this thread's statements in the block as one transaction
+
+        The thread's pooled connection is pinned for the block, so
+        execute_update/execute_many/bulk_insert inside it share one
+        transaction that commits when the block exits and rolls back if it
+        raises. Nested blocks join the outer transaction.
+        """
+        with self.pool.connection() as connection:
+            if getattr(self._transaction, 'depth', 0):
+                self._transaction.depth += 1
+                try:
+                    yield connection
+                finally:
+                    self._transaction.depth -= 1
+                return
+            connection.begin()
+            self._transaction.depth = 1
+            try:
+                yield connection
+                connection.commit()
+            except BaseException:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+                raise
+            finally:
+                self._transaction.depth = 0
+
+    def _commit(self, connection):
+        # Statements inside transaction() are committed when the block exits
+        if getattr(self._transaction, 'depth', 0):
+            return
+        try:
+            connection.commit()
+        except Exception:
+            pass
+
+    def execute_query(self, query, params=None, name=None):
         """Execute a SELECT query and return results"""
+        started = time.perf_counter()
+        rows = None
+        error = None
         try:
-            self._ensure_connection()
-            connection = self.connection
-            cursor = connection.cursor()
-            if params is None:
-                cursor.execute(query)
-            else:
-                cursor.execute(query, params)
-            result = cursor.fetchall()
-            cursor.close()
-            return result
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    if params is None:
+                        cursor.execute(query)
+                    else:
+                        cursor.execute(query, params)
+                    rows = cursor.fetchall()
+                    return rows
+                finally:
+                    cursor.close()
         except Error as e:
+            error = e
             logger.error(f"Query execution error: {e}")
             raise
-    
-    def execute_update(self, query, params=None):
-        """Execute an INSERT/UPDATE/DELETE query"""
+        finally:
+            self._notify(name, query, params, started, len(rows) if rows is not None else 0, error)
+
+    def iter_query(self, query, params=None, name=None, chunk_size=None, as_tuples=False):
+        """
+        Stream a SELECT through an unbuffered server-side cursor
+
+        Rows are read from the socket as the caller consumes them, so memory
+        stays flat however large the result is. The stream runs on its own
+        pooled connection (not the thread's shared one), which stays checked
+        out until the iteration ends; the caller may run other statements
+        meanwhile but should consume promptly, as MySQL keeps the result open
+        until then. A stream that is abandoned early closes its connection
+        instead of draining the remaining rows.
+
+        Args:
+            query: SELECT statement
+            params: Query parameters
+            name: Statement name for listeners
+            chunk_size: Yield lists of up to this many rows instead of single rows
+            as_tuples: Yield tuples in column order instead of dicts
+
+        Yields:
+            Rows, or lists of rows when `chunk_size` is set
+        """
+        started = time.perf_counter()
+        rows = 0
+        error = None
+        finished = False
+        fetch_size = chunk_size or self.stream_chunk_rows
         try:
-            self._ensure_connection()
-            connection = self.connection
-            cursor = connection.cursor()
-            if params is None:
-                cursor.execute(query)
-            else:
-                cursor.execute(query, params)
+            connection = self.pool.acquire()
             try:
-                connection.commit()
-            except Exception:
-                pass
-            affected_rows = cursor.rowcount
-            cursor.close()
-            return affected_rows
+                cursor = connection.cursor(SSCursor if as_tuples else SSDictCursor)
+                try:
+                    if params is None:
+                        cursor.execute(query)
+                    else:
+                        cursor.execute(query, params)
+                    while True:
+                        batch = cursor.fetchmany(fetch_size)
+                        if not batch:
+                            break
+                        rows += len(batch)
+                        if chunk_size:
+                            yield list(batch)
+                        else:
+                            yield from batch
+                    finished = True
+                finally:
+                    if finished:
+                        cursor.close()
+            finally:
+                # An unfinished unbuffered result would have to be read to the end first
+                self.pool.release(connection, discard=not finished)
         except Error as e:
+            error = e
+            logger.error(f"Query execution error: {e}")
+            raise
+        finally:
+            self._notify(name, query, params, started, rows, error)
+
+    def execute_update(self, query, params=None, name=None):
+        """Execute an INSERT/UPDATE/DELETE query"""
+        started = time.perf_counter()
+        rowcount = 0
+        error = None
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    if params is None:
+                        cursor.execute(query)
+                    else:
+                        cursor.execute(query, params)
+                    self._commit(connection)
+                    rowcount = cursor.rowcount
+                    return rowcount
+                except Error:
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                    raise
+                finally:
+                    cursor.close()
+        except Error as e:
+            error = e
             logger.error(f"Update execution error: {e}")
-            if connection:
-                connection.rollback()
             raise
-    
+        finally:
+            self._notify(name, query, params, started, rowcount, error)
+
+    def execute_many(self, query, rows, name=None):
+        """Execute an INSERT for many parameter rows in one multi-row statement"""
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        rowcount = 0
+        error = None
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.executemany(query, rows)
+                    self._commit(connection)
+                    rowcount = cursor.rowcount
+                    return rowcount
+                except Error:
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                    raise
+                finally:
+                    cursor.close()
+        except Error as e:
+            error = e
+            logger.error(f"Batch execution error: {e}")
+            raise
+        finally:
+            self._notify(name, query, rows, started, rowcount, error)
+
+    def bulk_insert(self, table, columns, rows, ignore=False, name=None):
+        """
+        Insert rows with explicit multi-row INSERT statements
+
+        Rows are written `bulk_insert_rows` at a time as one
+        `INSERT ... VALUES (...), (...)` statement each, all on one pooled
+        connection. With `ignore`, rows MySQL rejects (e.g. a foreign key to
+        a deleted user) are skipped instead of failing the whole statement.
+
+        Args:
+            table: Table name
+            columns: Column names, in the order of each row's values
+            rows: Sequence of value tuples
+            ignore: Use INSERT IGNORE
+            name: Statement name for listeners
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        for identifier in (table, *columns):
+            if not _IDENTIFIER_RE.match(identifier):
+                raise ValueError(f'Invalid identifier: {identifier!r}')
+        prefix = (
+            f"INSERT {'IGNORE ' if ignore else ''}INTO `{table}` "
+            f"({', '.join(f'`{column}`' for column in columns)}) VALUES "
+        )
+        placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        started = time.perf_counter()
+        rowcount = 0
+        error = None
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    for start in range(0, len(rows), self.bulk_insert_rows):
+                        chunk = rows[start:start + self.bulk_insert_rows]
+                        cursor.execute(
+                            prefix + ', '.join([placeholder] * len(chunk)),
+                            [value for row in chunk for value in row]
+                        )
+                        rowcount += cursor.rowcount
+                    self._commit(connection)
+                    return rowcount
+                except Error:
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                    raise
+                finally:
+                    cursor.close()
+        except Error as e:
+            error = e
+            logger.error(f"Bulk insert error: {e}")
+            raise
+        finally:
+            self._notify(name or f'bulk_insert_{table}', prefix + placeholder, rows, started, rowcount, error)
+
     def __del__(self):
         """Cleanup on object destruction"""
-        self.disconnect()
+        try:
+            self.disconnect()
+        except Exception:
+            pass
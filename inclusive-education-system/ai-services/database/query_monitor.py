@@ -0,0 +1,137 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from database.db_connector import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)', re.IGNORECASE)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_normalized = {}
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace, literals and IN-lists so similar statements group together"""
+    normalized = _normalized.get(query)
+    if normalized is None:
+        normalized = ' '.join(query.split())
+        normalized = _STRING_RE.sub('?', normalized)
+        normalized = _NUMBER_RE.sub('?', normalized)
+        normalized = _IN_LIST_RE.sub('IN (...)', normalized)
+        if len(_normalized) < 10000:
+            _normalized[query] = normalized
+    return normalized
+
+
+class QueryMonitor:
+    """
+    Slow-query log and per-request query budget
+
+    Registered as a `DatabaseConnector` listener. Statements slower than
+    `slow_ms` are logged with their normalized SQL, name, row count and the
+    current request route, optionally with `EXPLAIN` output (at most once per
+    statement shape every `explain_interval` seconds). Inside a request scope
+    opened with `begin()`, every statement is counted; going over `budget`
+    logs the most repeated statements once per request (the usual sign of an
+    N+1 loop) or, in strict mode, raises `QueryBudgetExceeded`.
+    """
+
+    def __init__(
+        self,
+        db_connector,
+        slow_ms: Optional[float] = None,
+        budget: Optional[int] = None,
+        strict: Optional[bool] = None,
+        explain: Optional[bool] = None,
+        explain_interval: float = 600
+    ):
+        self.db = db_connector
+        self.slow_ms = slow_ms if slow_ms is not None else float(os.getenv('SLOW_QUERY_MS', 200))
+        self.budget = budget if budget is not None else int(os.getenv('QUERY_BUDGET_PER_REQUEST', 25))
+        self.strict = strict if strict is not None else os.getenv('QUERY_BUDGET_MODE', 'warn').lower() == 'strict'
+        self.explain = explain if explain is not None else os.getenv('SLOW_QUERY_EXPLAIN', 'false').lower() == 'true'
+        self.explain_interval = explain_interval
+        self._local = threading.local()
+        self._explained: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.slow_queries = 0
+        self.budget_violations = 0
+
+    def begin(self, route: str):
+        """Open a request scope on the current thread"""
+        self._local.route = route
+        self._local.count = 0
+        self._local.time = 0.0
+        self._local.statements = Counter()
+        self._local.warned = False
+
+    def end(self) -> Optional[Dict]:
+        """Close the request scope and return its query count and time"""
+        route = getattr(self._local, 'route', None)
+        if route is None:
+            return None
+        self._local.route = None
+        return {'count': self._local.count, 'time_ms': round(self._local.time * 1000, 2)}
+
+    def __call__(self, name, query, duration, rows, error, params=None):
+        if getattr(self._local, 'explaining', False):
+            return
+        route = getattr(self._local, 'route', None)
+
+        if duration * 1000 >= self.slow_ms:
+            self._log_slow(name, query, duration, rows, params, route)
+
+        if route is None:
+            return
+        self._local.count += 1
+        self._local.time += duration
+        self._local.statements[normalize_sql(query)] += 1
+        if self.budget and self._local.count > self.budget and not self._local.warned:
+            self._local.warned = True
+            with self._lock:
+                self.budget_violations += 1
+            repeated = '; '.join(f'{n}x {sql[:120]}' for sql, n in self._local.statements.most_common(3))
+            message = f"Query budget exceeded on {route}: {self._local.count} > {self.budget} queries (top: {repeated})"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    def _log_slow(self, name, query, duration, rows, params, route):
+        with self._lock:
+            self.slow_queries += 1
+        normalized = normalize_sql(query)
+        logger.warning(
+            f"Slow query {name} took {duration * 1000:.1f}ms, {rows} rows, "
+            f"route={route or 'background'}: {normalized[:500]}"
+        )
+        if self.explain and normalized[:6].upper() == 'SELECT':
+            now = time.monotonic()
+            with self._lock:
+                if now - self._explained.get(normalized, -self.explain_interval) < self.explain_interval:
+                    return
+                self._explained[normalized] = now
+            self._local.explaining = True
+            try:
+                plan = self.db.execute_query('EXPLAIN ' + query, params, name='explain')
+                for row in plan:
+                    logger.warning(f"  EXPLAIN {name}: {dict(row)}")
+            except Exception as e:
+                logger.warning(f"  EXPLAIN {name} failed: {e}")
+            finally:
+                self._local.explaining = False
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'slow_queries': self.slow_queries,
+                'budget_violations': self.budget_violations,
+                'slow_ms': self.slow_ms,
+                'budget': self.budget,
+                'strict': self.strict,
+            }
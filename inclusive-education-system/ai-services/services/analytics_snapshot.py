@@ -0,0 +1,444 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Row-level columns, sorted by user_id; dtypes keep 5M rows around 120 MB
+ROW_COLUMNS = {
+    'user_id': np.int32,
+    'module_id': np.int32,
+    'course_id': np.int32,
+    'category': np.int32,  # index into meta['categories']
+    'score': np.float32,
+    'completed': np.uint8,
+    'time_spent': np.int32,
+    'timestamp': np.int64,  # unix seconds
+}
+# Per-user aggregates computed at export time, aligned with `users`
+USER_COLUMNS = ('users', 'starts', 'completed_count', 'score_total', 'scored_sum', 'scored_count', 'max_score', 'min_scored')
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _percentiles(values: np.ndarray) -> Dict:
+    if not len(values):
+        return {}
+    return {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+class AnalyticsSnapshot:
+    """
+    Read-only columnar copy of `performance` joined with module categories
+
+    Columns are `.npy` files opened memory-mapped, so every gunicorn worker
+    shares the same page cache and opening a snapshot costs nothing until it
+    is read. Rows are sorted by user: a user's rows are the slice
+    `starts[i]:starts[i + 1]` of the user's position `i` in `users`, and the
+    per-user totals are precomputed, so per-user lookups are a binary search
+    and cohort reports are array indexing and `bincount`s.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.categories: List[str] = self.meta['categories']
+        self._category_codes = {c: i for i, c in enumerate(self.categories)}
+        for name in list(ROW_COLUMNS) + list(USER_COLUMNS):
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+
+    @property
+    def version(self) -> str:
+        return self.meta['version']
+
+    def info(self) -> Dict:
+        return {k: self.meta[k] for k in ('version', 'exported_at', 'rows', 'users')}
+
+    def _positions(self, user_ids) -> np.ndarray:
+        """Positions in `users` of the given user IDs that have rows"""
+        ids = np.unique(np.asarray(user_ids, dtype=np.int64))
+        positions = np.searchsorted(self.users, ids)
+        in_range = positions < len(self.users)
+        positions, ids = positions[in_range], ids[in_range]
+        return positions[self.users[positions] == ids]
+
+    def _row_indices(self, positions: np.ndarray) -> np.ndarray:
+        """Concatenated row ranges of the users at `positions`"""
+        starts = self.starts[positions]
+        lengths = self.starts[positions + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(int(lengths.sum()))
+
+    def user_stats(self, user_id: int) -> Optional[Dict]:
+        """
+        Progress aggregates and interests of one user
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Same fields as `ProgressAggregateCache.get()` plus `categories`
+            (top three by activity, most recent first on ties), or None if
+            the user has no rows in the snapshot
+        """
+        i = int(np.searchsorted(self.users, user_id))
+        if i >= len(self.users) or self.users[i] != user_id:
+            return None
+        start, end = int(self.starts[i]), int(self.starts[i + 1])
+        rows = end - start
+        scored_count = int(self.scored_count[i])
+
+        categories = self.category[start:end]
+        counts = np.bincount(categories, minlength=len(self.categories))
+        last = np.full(len(self.categories), -1, dtype=np.int64)
+        np.maximum.at(last, categories, self.timestamp[start:end])
+        ranked = np.lexsort((last, counts))[::-1]
+        top = [self.categories[c] for c in ranked[:3] if counts[c]]
+
+        return {
+            'user_id': user_id,
+            'total_modules': rows,
+            'completed': int(self.completed_count[i]),
+            'avg_score': float(self.score_total[i]) / rows,
+            'scored_average': float(self.scored_sum[i]) / scored_count if scored_count else 0,
+            'scored_count': scored_count,
+            'highest_score': float(self.max_score[i]),
+            'lowest_score': float(self.min_scored[i]),
+            'categories': top,
+            'snapshot': self.info(),
+        }
+
+    def cohort_stats(self, user_ids=None, category: Optional[str] = None) -> Dict:
+        """
+        Aggregate report over a cohort of users
+
+        Args:
+            user_ids: Users in the cohort; every user in the snapshot when None
+            category: Optional category to restrict the rows to
+
+        Returns:
+            Totals, distributions of per-user completion rate and average
+            score, and a per-category breakdown
+        """
+        positions = np.arange(len(self.users)) if user_ids is None else self._positions(user_ids)
+        report = {'snapshot': self.info()}
+        if user_ids is not None:
+            report['requested_users'] = len(set(user_ids))
+
+        if category is None:
+            rows = self._row_indices(positions) if user_ids is not None else slice(None)
+            per_user_rows = (self.starts[positions + 1] - self.starts[positions]).astype(np.float64)
+            per_user_completed = self.completed_count[positions].astype(np.float64)
+            per_user_scored = self.scored_count[positions].astype(np.float64)
+            per_user_sum = self.scored_sum[positions].astype(np.float64)
+        else:
+            code = self._category_codes.get(category)
+            if code is None:
+                positions = positions[:0]
+            rows = self._row_indices(positions)
+            rows = rows[self.category[rows] == code] if code is not None else rows
+            # Per-user totals within the category, from the selected rows
+            owners = np.searchsorted(self.users, self.user_id[rows])
+            positions, owner_index = np.unique(owners, return_inverse=True)
+            scored = (self.score[rows] > 0).astype(np.float64)
+            per_user_rows = np.bincount(owner_index, minlength=len(positions)).astype(np.float64)
+            per_user_completed = np.bincount(owner_index, weights=self.completed[rows], minlength=len(positions))
+            per_user_scored = np.bincount(owner_index, weights=scored, minlength=len(positions))
+            per_user_sum = np.bincount(owner_index, weights=self.score[rows] * scored, minlength=len(positions))
+
+        total_rows = float(per_user_rows.sum())
+        completed = float(per_user_completed.sum())
+        scored_count = float(per_user_scored.sum())
+        has_scores = per_user_scored > 0
+        report.update({
+            'users': int(len(positions)),
+            'rows': int(total_rows),
+            'completion_rate': round(completed / total_rows * 100, 2) if total_rows else 0,
+            'average_score': round(float(per_user_sum.sum()) / scored_count, 2) if scored_count else 0,
+            'user_completion_rate': _percentiles(per_user_completed / np.maximum(per_user_rows, 1) * 100),
+            'user_average_score': _percentiles(per_user_sum[has_scores] / per_user_scored[has_scores]),
+            'categories': self._category_breakdown(rows),
+        })
+        return report
+
+    def _category_breakdown(self, rows) -> List[Dict]:
+        n = len(self.categories)
+        categories = self.category[rows]
+        if not len(categories):
+            return []
+        score = self.score[rows]
+        scored = score > 0
+        counts = np.bincount(categories, minlength=n)
+        completed = np.bincount(categories, weights=self.completed[rows], minlength=n)
+        scored_count = np.bincount(categories, weights=scored, minlength=n)
+        scored_sum = np.bincount(categories, weights=score * scored, minlength=n)
+        # Distinct users per category: rows are sorted by user, so dedupe (user, category) pairs
+        pairs = np.unique(self.user_id[rows].astype(np.int64) * n + categories)
+        users = np.bincount(pairs % n, minlength=n)
+        return [
+            {
+                'category': self.categories[c],
+                'users': int(users[c]),
+                'rows': int(counts[c]),
+                'completion_rate': round(float(completed[c]) / counts[c] * 100, 2),
+                'average_score': round(float(scored_sum[c]) / scored_count[c], 2) if scored_count[c] else 0,
+            }
+            for c in np.argsort(-counts, kind='stable') if counts[c]
+        ]
+
+
+class AnalyticsSnapshotStore:
+    """
+    Current analytics snapshot of a directory, reloaded when a new export lands
+
+    Exports are written to their own version directory and published by
+    atomically replacing the `CURRENT` pointer file; readers check the
+    pointer at most every `check_interval` seconds.
+    """
+
+    def __init__(self, directory: Optional[str] = None, check_interval: Optional[float] = None):
+        self.directory = directory or os.getenv(
+            'ANALYTICS_SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'ai-analytics-snapshot')
+        )
+        self.check_interval = check_interval if check_interval is not None else float(os.getenv('ANALYTICS_CHECK_INTERVAL', 30))
+        self._snapshot: Optional[AnalyticsSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, 'CURRENT'), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def get(self) -> Optional[AnalyticsSnapshot]:
+        """Return the latest published snapshot, or None if there is none yet"""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is not None and now - self._checked_at < self.check_interval:
+                return self._snapshot
+            self._checked_at = now
+            version = self._current_version()
+            if version is None:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.version != version:
+                try:
+                    self._snapshot = AnalyticsSnapshot(os.path.join(self.directory, version))
+                    logger.info(f"Analytics snapshot {version} loaded ({self._snapshot.meta['rows']} rows)")
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Failed to load analytics snapshot {version}: {e}")
+            return self._snapshot
+
+    def publish(self, version: str):
+        """Point readers at a newly written version directory"""
+        pointer = os.path.join(self.directory, 'CURRENT')
+        tmp = f'{pointer}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(tmp, pointer)
+        self._checked_at = 0.0
+
+    def prune(self, keep: int = 2):
+        """Remove all but the newest `keep` version directories"""
+        versions = sorted(
+            d for d in os.listdir(self.directory)
+            if d.startswith('v') and os.path.isdir(os.path.join(self.directory, d))
+        )
+        current = self._current_version()
+        for version in versions[:-keep]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.directory, version), ignore_errors=True)
+
+
+class AnalyticsExporter:
+    """
+    Periodic export of `performance` into a columnar analytics snapshot
+
+    Reads the table in user-ID ranges (one indexed range query per chunk,
+    so the OLTP database never runs a full-table sort), each streamed as
+    tuple chunks through a server-side cursor so only one chunk of raw rows
+    is held at a time. Builds the columns and per-user totals with NumPy
+    and publishes the result through the store. A MySQL named lock keeps gunicorn workers from exporting at the
+    same time.
+    """
+
+    LOCK_NAME = 'ai_analytics_export'
+
+    USER_RANGE_QUERY = "SELECT MIN(user_id) as min_id, MAX(user_id) as max_id FROM performance"
+
+    EXPORT_QUERY = """
+        SELECT p.user_id, p.module_id, m.course_id, c.category, p.score,
+               p.completion_status, p.time_spent_minutes, UNIX_TIMESTAMP(p.timestamp) as ts
+        FROM performance p
+        JOIN modules m ON p.module_id = m.id
+        JOIN courses c ON m.course_id = c.id
+        WHERE p.user_id BETWEEN %s AND %s
+    """
+
+    def __init__(self, db_connector, store: AnalyticsSnapshotStore, user_chunk: Optional[int] = None):
+        self.db = db_connector
+        self.store = store
+        self.user_chunk = user_chunk or int(os.getenv('ANALYTICS_EXPORT_USER_CHUNK', 5000))
+        self.stream_chunk = int(os.getenv('ANALYTICS_EXPORT_STREAM_ROWS', 50000))
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_run: Dict = {}
+
+    def _read_columns(self) -> Dict[str, np.ndarray]:
+        categories: Dict[str, int] = {}
+        chunks = {name: [] for name in ROW_COLUMNS}
+        bounds = self.db.execute_query(self.USER_RANGE_QUERY, name='analytics_user_range')
+        if bounds and bounds[0]['min_id'] is not None:
+            min_id, max_id = int(bounds[0]['min_id']), int(bounds[0]['max_id'])
+            for low in range(min_id, max_id + 1, self.user_chunk):
+                if self._stop.is_set():
+                    raise InterruptedError('Analytics export stopped')
+                for rows in self.db.iter_query(
+                    self.EXPORT_QUERY, (low, low + self.user_chunk - 1), name='analytics_export',
+                    chunk_size=self.stream_chunk, as_tuples=True
+                ):
+                    user_id, module_id, course_id, category, score, status, time_spent, ts = zip(*rows)
+                    chunks['user_id'].append(np.array(user_id, dtype=np.int32))
+                    chunks['module_id'].append(np.array(module_id, dtype=np.int32))
+                    chunks['course_id'].append(np.array(course_id, dtype=np.int32))
+                    chunks['category'].append(np.fromiter(
+                        (categories.setdefault(c or 'General', len(categories)) for c in category), np.int32, len(rows)
+                    ))
+                    chunks['score'].append(np.fromiter((float(v or 0) for v in score), np.float32, len(rows)))
+                    chunks['completed'].append(np.fromiter((v == 'completed' for v in status), np.uint8, len(rows)))
+                    chunks['time_spent'].append(np.fromiter((v or 0 for v in time_spent), np.int32, len(rows)))
+                    chunks['timestamp'].append(np.fromiter((int(v or 0) for v in ts), np.int64, len(rows)))
+
+        columns = {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=ROW_COLUMNS[name])
+            for name, parts in chunks.items()
+        }
+        order = np.argsort(columns['user_id'], kind='stable')
+        columns = {name: values[order] for name, values in columns.items()}
+        columns['categories'] = sorted(categories, key=categories.get)
+        return columns
+
+    @staticmethod
+    def _user_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        user_id, score = columns['user_id'], columns['score'].astype(np.float64)
+        users, starts = np.unique(user_id, return_index=True)
+        bounds = np.append(starts, len(user_id)).astype(np.int64)
+        if not len(users):
+            empty = np.empty(0)
+            return {'users': users, 'starts': bounds, 'completed_count': empty, 'score_total': empty,
+                    'scored_sum': empty, 'scored_count': empty, 'max_score': empty, 'min_scored': empty}
+        scored = score > 0
+        min_scored = np.minimum.reduceat(np.where(scored, score, np.inf), starts)
+        return {
+            'users': users,
+            'starts': bounds,
+            'completed_count': np.add.reduceat(columns['completed'].astype(np.int64), starts),
+            'score_total': np.add.reduceat(score, starts),
+            'scored_sum': np.add.reduceat(np.where(scored, score, 0), starts),
+            'scored_count': np.add.reduceat(scored.astype(np.int64), starts),
+            'max_score': np.maximum.reduceat(score, starts),
+            'min_scored': np.where(np.isinf(min_scored), 0, min_scored),
+        }
+
+    def _write(self, columns: Dict[str, np.ndarray]) -> str:
+        os.makedirs(self.store.directory, exist_ok=True)
+        version = time.strftime('v%Y%m%dT%H%M%S', time.gmtime()) + f'-{os.getpid()}'
+        path = os.path.join(self.store.directory, version)
+        building = f'{path}.building'
+        os.makedirs(building)
+        categories = columns.pop('categories')
+        columns.update(self._user_columns(columns))
+        for name, values in columns.items():
+            np.save(os.path.join(building, f'{name}.npy'), values)
+        with open(os.path.join(building, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': version,
+                'exported_at': time.time(),
+                'rows': int(len(columns['user_id'])),
+                'users': int(len(columns['users'])),
+                'categories': categories,
+            }, f)
+        os.rename(building, path)
+        return version
+
+    def run_once(self) -> Dict:
+        """
+        Export and publish one snapshot
+
+        Returns:
+            Summary of the run; `skipped` is set when another export holds the lock
+        """
+        started = time.perf_counter()
+        # GET_LOCK is per session, so keep one pooled connection for the whole run
+        with self.db.pool.connection():
+            acquired = self.db.execute_query("SELECT GET_LOCK(%s, 0) AS acquired", (self.LOCK_NAME,))
+            if not acquired or not acquired[0]['acquired']:
+                return {'skipped': True}
+            try:
+                columns = self._read_columns()
+            finally:
+                self.db.execute_query("SELECT RELEASE_LOCK(%s) AS released", (self.LOCK_NAME,))
+
+        rows = len(columns['user_id'])
+        version = self._write(columns)
+        self.store.publish(version)
+        self.store.prune()
+        elapsed = time.perf_counter() - started
+        self.last_run = {
+            'version': version,
+            'rows': rows,
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'finished_at': time.time()
+        }
+        logger.info(f"Exported analytics snapshot {version} ({rows} rows) in {elapsed:.2f}s")
+        return self.last_run
+
+    def start(self, interval: float):
+        """Export every `interval` seconds on a daemon thread, starting now"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.run_once()
+                except InterruptedError:
+                    return
+                except Exception as e:
+                    logger.error(f"Analytics export error: {e}")
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name='analytics-exporter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    """Export one analytics snapshot from the command line (e.g. from cron)"""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    argparse.ArgumentParser(description='Export performance into a columnar analytics snapshot').parse_args()
+
+    from database.db_connector import DatabaseConnector
+
+    exporter = AnalyticsExporter(DatabaseConnector(), AnalyticsSnapshotStore())
+    print(exporter.run_once())
+
+
+if __name__ == '__main__':
+    main()
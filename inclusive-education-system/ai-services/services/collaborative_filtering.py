@@ -0,0 +1,248 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ItemSimilarityBuilder:
+    """
+    Offline builder for a sparse item-item (course-course) similarity model
+
+    Interactions are the distinct (user, course) pairs found in
+    `course_enrollments` and `performance`. They are read in user-id ranges,
+    turned into co-occurrence pair counts per range and merged, so memory
+    grows with the number of distinct co-occurring course pairs rather than
+    users x courses. Similarity is cosine over binary interactions and only
+    the `top_n` neighbors of each course are kept.
+    """
+
+    COURSES_QUERY = "SELECT id FROM courses ORDER BY id"
+
+    USER_RANGE_QUERY = "SELECT MIN(id) as min_id, MAX(id) as max_id FROM users"
+
+    INTERACTIONS_QUERY = """
+        SELECT user_id, course_id
+        FROM course_enrollments
+        WHERE user_id BETWEEN %s AND %s
+        UNION
+        SELECT p.user_id, m.course_id
+        FROM performance p
+        JOIN modules m ON p.module_id = m.id
+        WHERE p.user_id BETWEEN %s AND %s
+        ORDER BY user_id
+    """
+
+    def __init__(self, db_connector, top_n: int = 20, max_items_per_user: int = 200, user_chunk: int = 5000):
+        self.db = db_connector
+        self.top_n = top_n
+        self.max_items_per_user = max_items_per_user
+        self.user_chunk = user_chunk
+
+    def _iter_user_items(self, index_by_id: Dict[int, int]) -> Iterable[np.ndarray]:
+        """Yield the dense course indices each user interacted with"""
+        bounds = self.db.execute_query(self.USER_RANGE_QUERY)
+        if not bounds or bounds[0]['min_id'] is None:
+            return
+        min_id, max_id = int(bounds[0]['min_id']), int(bounds[0]['max_id'])
+
+        for low in range(min_id, max_id + 1, self.user_chunk):
+            high = low + self.user_chunk - 1
+            current_user, items = None, []
+            for user_id, course_id in self.db.iter_query(
+                self.INTERACTIONS_QUERY, (low, high, low, high), name='cf_interactions', as_tuples=True
+            ):
+                if user_id != current_user:
+                    if items:
+                        yield np.unique(items)[:self.max_items_per_user]
+                    current_user, items = user_id, []
+                idx = index_by_id.get(course_id)
+                if idx is not None:
+                    items.append(idx)
+            if items:
+                yield np.unique(items)[:self.max_items_per_user]
+
+    @staticmethod
+    def _merge(keys: np.ndarray, counts: np.ndarray):
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        return unique_keys, np.bincount(inverse, weights=counts).astype(np.float64)
+
+    def build(self) -> Dict[str, np.ndarray]:
+        """Compute the top-N neighbor lists as CSR arrays"""
+        started = time.perf_counter()
+        course_ids = np.array([row['id'] for row in self.db.execute_query(self.COURSES_QUERY)], dtype=np.int64)
+        n_items = len(course_ids)
+        index_by_id = {int(cid): i for i, cid in enumerate(course_ids)}
+
+        item_counts = np.zeros(n_items, dtype=np.float64)
+        pair_keys = np.empty(0, dtype=np.int64)
+        pair_counts = np.empty(0, dtype=np.float64)
+        pending = []
+        pending_size = 0
+        interactions = 0
+        users = 0
+
+        for items in self._iter_user_items(index_by_id):
+            users += 1
+            interactions += len(items)
+            item_counts[items] += 1
+            if len(items) < 2:
+                continue
+            a, b = np.triu_indices(len(items), 1)
+            pending.append(items[a].astype(np.int64) * n_items + items[b])
+            pending_size += len(a)
+            # Fold pending pairs into the running totals to keep memory bounded
+            if pending_size >= 5_000_000:
+                chunk = np.concatenate(pending)
+                pair_keys, pair_counts = self._merge(
+                    np.concatenate([pair_keys, chunk]),
+                    np.concatenate([pair_counts, np.ones(len(chunk))])
+                )
+                pending, pending_size = [], 0
+
+        if pending:
+            chunk = np.concatenate(pending)
+            pair_keys, pair_counts = self._merge(
+                np.concatenate([pair_keys, chunk]),
+                np.concatenate([pair_counts, np.ones(len(chunk))])
+            )
+
+        left = pair_keys // max(n_items, 1)
+        right = pair_keys % max(n_items, 1)
+        similarity = pair_counts / np.sqrt(item_counts[left] * item_counts[right])
+
+        # Both directions, then keep the best top_n per source course
+        src = np.concatenate([left, right])
+        dst = np.concatenate([right, left])
+        sim = np.concatenate([similarity, similarity])
+        order = np.lexsort((-sim, src))
+        src, dst, sim = src[order], dst[order], sim[order]
+        group_start = np.searchsorted(src, src, side='left')
+        keep = (np.arange(len(src)) - group_start) < self.top_n
+        src, dst, sim = src[keep], dst[keep], sim[keep]
+
+        indptr = np.zeros(n_items + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n_items), out=indptr[1:])
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Item similarity built: {n_items} courses, {users} users, {interactions} interactions, "
+            f"{len(dst)} neighbor links in {elapsed:.1f}s"
+        )
+        return {
+            'course_ids': course_ids,
+            'indptr': indptr,
+            'indices': dst.astype(np.int32),
+            'similarities': sim.astype(np.float32),
+            'meta': {
+                'built_at': time.time(),
+                'top_n': self.top_n,
+                'users': users,
+                'interactions': interactions,
+                'links': int(len(dst))
+            }
+        }
+
+    def build_to(self, path: str) -> str:
+        """Build the model and atomically replace the directory at `path`"""
+        model = self.build()
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in ItemSimilarityModel.ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), model[name])
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump(model['meta'], f)
+
+        old_path = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        logger.info(f"Item similarity model written to {path}")
+        return path
+
+
+class ItemSimilarityModel:
+    """
+    Read-only, memory-mapped item-item similarity model
+
+    Arrays are opened with `mmap_mode='r'`, so every gunicorn worker shares
+    the same page-cache copy instead of loading its own.
+    """
+
+    ARRAYS = ('course_ids', 'indptr', 'indices', 'similarities')
+
+    def __init__(self, path: str):
+        self.path = path
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+        meta_path = os.path.join(path, 'meta.json')
+        self.meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        self.index_by_id = {int(cid): i for i, cid in enumerate(self.course_ids)}
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> Optional['ItemSimilarityModel']:
+        """Load the model if it exists, otherwise return None"""
+        if not path or not os.path.exists(os.path.join(path, 'indptr.npy')):
+            return None
+        try:
+            model = cls(path)
+            logger.info(f"Item similarity model loaded from {path} ({model.meta.get('links', '?')} links)")
+            return model
+        except Exception as e:
+            logger.error(f"Failed to load item similarity model from {path}: {e}")
+            return None
+
+    def neighbor_scores(self, seed_course_ids: Iterable[int], target_index: np.ndarray, size: int) -> np.ndarray:
+        """
+        Sum neighbor similarities of the seed courses into a dense vector
+
+        Args:
+            seed_course_ids: Courses the user already interacted with
+            target_index: Maps model item index to output position (-1 to drop)
+            size: Length of the output vector
+
+        Returns:
+            Scores normalized to [0, 1]
+        """
+        rows = [self.index_by_id[c] for c in seed_course_ids if c in self.index_by_id]
+        if not rows:
+            return np.zeros(size)
+        neighbors = np.concatenate([self.indices[self.indptr[r]:self.indptr[r + 1]] for r in rows])
+        weights = np.concatenate([self.similarities[self.indptr[r]:self.indptr[r + 1]] for r in rows])
+        positions = target_index[neighbors]
+        valid = positions >= 0
+        scores = np.bincount(positions[valid], weights=weights[valid], minlength=size)
+        top = scores.max() if len(scores) else 0
+        return scores / top if top > 0 else scores
+
+
+def main():
+    from dotenv import load_dotenv
+    from database.db_connector import DatabaseConnector
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Build the item-item collaborative filtering model')
+    parser.add_argument('--output', default=os.getenv('CF_MODEL_PATH', 'models/item_similarity'))
+    parser.add_argument('--top-n', type=int, default=int(os.getenv('CF_TOP_N', 20)))
+    parser.add_argument('--max-items-per-user', type=int, default=200)
+    args = parser.parse_args()
+
+    db = DatabaseConnector()
+    ItemSimilarityBuilder(db, top_n=args.top_n, max_items_per_user=args.max_items_per_user).build_to(args.output)
+
+
+if __name__ == '__main__':
+    main()
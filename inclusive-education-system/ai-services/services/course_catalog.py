@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from pymysql import MySQLError
+
+from services.module_graph import ModuleGraph
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Immutable, indexed view of the published course/module catalog"""
+
+    def __init__(
+        self,
+        courses: List[Dict],
+        modules: List[Dict],
+        version: str,
+        popularity: Optional[Dict[int, int]] = None,
+        prerequisites: Optional[Dict[int, List[int]]] = None
+    ):
+        self.courses = courses
+        self.modules = modules
+        self.popularity = popularity or {}
+        self.version = version
+        self.loaded_at = time.time()
+
+        self.courses_by_id: Dict[int, Dict] = {}
+        self.courses_by_category: Dict[str, List[Dict]] = {}
+        self.courses_by_difficulty: Dict[str, List[Dict]] = {}
+        for course in courses:
+            self.courses_by_id[course['id']] = course
+            self.courses_by_category.setdefault(course['category'], []).append(course)
+            self.courses_by_difficulty.setdefault(course['difficulty_level'], []).append(course)
+
+        self.modules_by_id: Dict[int, Dict] = {}
+        self.modules_by_course: Dict[int, List[Dict]] = {}
+        self.modules_by_category: Dict[str, List[Dict]] = {}
+        for module in modules:
+            self.modules_by_id[module['id']] = module
+            self.modules_by_course.setdefault(module['course_id'], []).append(module)
+            self.modules_by_category.setdefault(module['category'], []).append(module)
+
+        self.graph = ModuleGraph(modules, prerequisites)
+
+
+class CourseCatalog:
+    """
+    Process-local cache of the published course catalog
+
+    The snapshot is rebuilt when it is older than `ttl` seconds, when a cheap
+    fingerprint query (row counts and MAX(updated_at)) shows that courses or
+    modules changed, or after an explicit `invalidate()`. Readers always get a
+    complete snapshot; while one thread refreshes, others keep using the
+    previous one.
+    """
+
+    COURSES_QUERY = """
+        SELECT id, title, description, category, difficulty_level, estimated_hours
+        FROM courses
+        WHERE is_published = TRUE
+        ORDER BY id
+    """
+
+    MODULES_QUERY = """
+        SELECT m.id, m.course_id, m.title, m.module_order, m.duration_minutes,
+               c.title as course_title, c.category
+        FROM modules m
+        JOIN courses c ON m.course_id = c.id
+        WHERE c.is_published = TRUE
+        ORDER BY c.category, m.module_order ASC, m.course_id, m.id
+    """
+
+    POPULARITY_QUERY = """
+        SELECT course_id, COUNT(*) as enrollment_count
+        FROM course_enrollments
+        GROUP BY course_id
+    """
+
+    PREREQUISITES_QUERY = """
+        SELECT module_id, prerequisite_module_id
+        FROM module_prerequisites
+    """
+
+    FINGERPRINT_QUERY = """
+        SELECT
+            (SELECT COUNT(*) FROM courses) as course_count,
+            (SELECT MAX(updated_at) FROM courses) as courses_updated,
+            (SELECT COUNT(*) FROM modules) as module_count,
+            (SELECT MAX(updated_at) FROM modules) as modules_updated
+    """
+
+    def __init__(self, db_connector, ttl: Optional[float] = None, check_interval: Optional[float] = None):
+        self.db = db_connector
+        self.ttl = ttl if ttl is not None else float(os.getenv('CATALOG_TTL_SECONDS', 300))
+        self.check_interval = (
+            check_interval if check_interval is not None
+            else float(os.getenv('CATALOG_CHECK_INTERVAL', 30))
+        )
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_fingerprint(self):
+        rows = self.db.execute_query(self.FINGERPRINT_QUERY, name='catalog_fingerprint')
+        row = rows[0] if rows else {}
+        return tuple(str(row.get(k)) for k in ('course_count', 'courses_updated', 'module_count', 'modules_updated'))
+
+    def _needs_refresh(self, now: float) -> bool:
+        if self._stale or self._snapshot is None:
+            return True
+        if now - self._snapshot.loaded_at >= self.ttl:
+            return True
+        return False
+
+    def _refresh(self, fingerprint=None) -> CatalogSnapshot:
+        if fingerprint is None:
+            fingerprint = self._get_fingerprint()
+        courses = list(self.db.execute_query(self.COURSES_QUERY, name='catalog_courses'))
+        modules = list(self.db.execute_query(self.MODULES_QUERY, name='catalog_modules'))
+        popularity = {
+            row['course_id']: int(row['enrollment_count'])
+            for row in self.db.execute_query(self.POPULARITY_QUERY, name='catalog_popularity')
+        }
+        version = hashlib.sha1('|'.join(fingerprint).encode('utf-8')).hexdigest()[:12]
+        snapshot = CatalogSnapshot(courses, modules, version, popularity, self._load_prerequisites())
+        self._snapshot = snapshot
+        self._fingerprint = fingerprint
+        self._checked_at = time.time()
+        self._stale = False
+        logger.info(f"Course catalog loaded: {len(courses)} courses, {len(modules)} modules (v{version})")
+        return snapshot
+
+    def _load_prerequisites(self) -> Dict[int, List[int]]:
+        """Prerequisite edges; optional, so a missing table just means none"""
+        try:
+            rows = self.db.execute_query(self.PREREQUISITES_QUERY, name='catalog_prerequisites')
+        except MySQLError as e:
+            logger.warning(f"Module prerequisites unavailable: {e}")
+            return {}
+        prerequisites: Dict[int, List[int]] = {}
+        for row in rows:
+            prerequisites.setdefault(row['module_id'], []).append(row['prerequisite_module_id'])
+        return prerequisites
+
+    def get(self) -> CatalogSnapshot:
+        """Return the current catalog snapshot, refreshing it if needed"""
+        previous = self._snapshot
+        snapshot = self._get()
+        # A lookup that had to (re)load the catalog is a miss
+        with self._stats_lock:
+            if snapshot is previous:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return snapshot
+
+    def _get(self) -> CatalogSnapshot:
+        now = time.time()
+        snapshot = self._snapshot
+        needs_refresh = self._needs_refresh(now)
+        needs_check = not needs_refresh and now - self._checked_at >= self.check_interval
+        if not needs_refresh and not needs_check:
+            return snapshot
+
+        # Only one thread refreshes; the rest keep serving the previous snapshot
+        blocking = snapshot is None
+        if not self._lock.acquire(blocking=blocking):
+            return snapshot
+        try:
+            now = time.time()
+            if self._needs_refresh(now):
+                return self._refresh()
+            if now - self._checked_at >= self.check_interval:
+                fingerprint = self._get_fingerprint()
+                self._checked_at = now
+                if fingerprint != self._fingerprint:
+                    return self._refresh(fingerprint)
+            return self._snapshot
+        except Exception as e:
+            if self._snapshot is None:
+                raise
+            logger.error(f"Catalog refresh failed, serving previous snapshot: {e}")
+            self._checked_at = now
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def get_stats(self) -> Dict:
+        snapshot = self._snapshot
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                'version': snapshot.version if snapshot else None,
+                'courses': len(snapshot.courses) if snapshot else 0,
+                'modules': len(snapshot.modules) if snapshot else 0,
+                'age_seconds': round(time.time() - snapshot.loaded_at, 1) if snapshot else None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+    @property
+    def version(self) -> str:
+        return self.get().version
+
+    def invalidate(self):
+        """Force a reload on the next access"""
+        self._stale = True
+        logger.info("Course catalog invalidated")
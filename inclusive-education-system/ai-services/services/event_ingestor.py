@@ -0,0 +1,182 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from database.batch_writer import BatchWriter
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+class EventIngestError(Exception):
+    """Raised when a batch of events is rejected as a whole"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class EventIngestor:
+    """
+    Buffered ingestion of clickstream into `behavior_events`
+
+    A request body (a JSON array, an object with an `events` array, or
+    NDJSON) is parsed and validated in one pass; invalid events are reported
+    back and valid ones are appended to a bounded in-memory buffer as one
+    unit. A BatchWriter drains the buffer with multi-row INSERT IGNORE
+    statements, so events of since-deleted users are skipped instead of
+    failing a whole batch. When the buffer is full the batch is refused
+    (the route answers 503) rather than growing memory or blocking on MySQL.
+    """
+
+    TABLE = 'behavior_events'
+    COLUMNS = ('user_id', 'event_type', 'metadata', 'occurred_at')
+
+    MAX_EVENT_TYPE_LENGTH = 100  # VARCHAR(100)
+
+    # MySQL TIMESTAMP range: 1970-01-01 00:00:01 to 2038-01-19 03:14:07 UTC
+    MIN_TIMESTAMP = 1
+    MAX_TIMESTAMP = 2147483647
+
+    def __init__(
+        self,
+        db_connector,
+        max_batch: Optional[int] = None,
+        max_metadata_bytes: Optional[int] = None,
+        max_future_seconds: Optional[float] = None,
+        max_buffer: Optional[int] = None
+    ):
+        self.db = db_connector
+        self.max_batch = max_batch or int(os.getenv('EVENTS_MAX_BATCH', 10000))
+        self.max_metadata_bytes = max_metadata_bytes or int(os.getenv('EVENTS_MAX_METADATA_BYTES', 4096))
+        self.max_future_seconds = (
+            max_future_seconds if max_future_seconds is not None
+            else float(os.getenv('EVENTS_MAX_FUTURE_SECONDS', 300))
+        )
+        self.writer = BatchWriter(
+            db_connector,
+            None,
+            name=self.TABLE,
+            max_queue=max_buffer or int(os.getenv('EVENTS_MAX_BUFFER', 100000)),
+            flush_rows=int(os.getenv('EVENTS_FLUSH_ROWS', 2000)),
+            flush_interval_ms=int(os.getenv('EVENTS_FLUSH_INTERVAL_MS', 200)),
+            write=self._write
+        )
+
+    def _parse_body(self, body: bytes, content_type: str) -> List:
+        """Decode the request body into a list of (not yet validated) events"""
+        if not body:
+            raise EventIngestError('Request body is empty')
+        try:
+            if content_type.split(';', 1)[0].strip().lower() in NDJSON_TYPES:
+                events = []
+                for line in body.splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        events.append(None)  # reported as an invalid event
+                    if len(events) > self.max_batch:
+                        break
+            else:
+                events = json.loads(body)
+                if isinstance(events, dict):
+                    events = events.get('events')
+                if not isinstance(events, list):
+                    raise EventIngestError('Expected a JSON array of events or an object with an "events" array')
+        except (ValueError, UnicodeDecodeError):
+            raise EventIngestError('Request body is not valid JSON')
+        if not events:
+            raise EventIngestError('No events provided')
+        if len(events) > self.max_batch:
+            raise EventIngestError(f'At most {self.max_batch} events per request', status=413)
+        return events
+
+    def _occurred_at(self, value, now: float) -> Optional[datetime]:
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            raise ValueError('occurred_at must be an ISO 8601 string or epoch seconds')
+        if isinstance(value, (int, float)):
+            timestamp = value / 1000.0 if value > 1e11 else float(value)  # epoch milliseconds
+        elif isinstance(value, str):
+            moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            timestamp = moment.timestamp()
+        else:
+            raise ValueError('occurred_at must be an ISO 8601 string or epoch seconds')
+        # Checked before fromtimestamp(), which raises OSError or OverflowError far out of range
+        if not self.MIN_TIMESTAMP <= timestamp <= self.MAX_TIMESTAMP:
+            raise ValueError('occurred_at is outside the TIMESTAMP range (1970-01-01 to 2038-01-19 UTC)')
+        if timestamp > now + self.max_future_seconds:
+            raise ValueError('occurred_at is in the future')
+        # DatabaseConnector sessions run with time_zone '+00:00', so TIMESTAMP values are UTC wall-clock
+        return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+    def _validate(self, event, now: float) -> Tuple:
+        if not isinstance(event, dict):
+            raise ValueError('event must be a JSON object')
+        user_id = event.get('user_id')
+        if isinstance(user_id, str) and user_id.isdigit():
+            user_id = int(user_id)
+        if not isinstance(user_id, int) or isinstance(user_id, bool) or user_id <= 0:
+            raise ValueError('user_id must be a positive integer')
+        event_type = event.get('event_type')
+        if not isinstance(event_type, str) or not event_type.strip():
+            raise ValueError('event_type is required')
+        event_type = event_type.strip()
+        if len(event_type) > self.MAX_EVENT_TYPE_LENGTH:
+            raise ValueError(f'event_type is longer than {self.MAX_EVENT_TYPE_LENGTH} characters')
+        metadata = event.get('metadata')
+        if metadata is not None:
+            metadata = json.dumps(metadata, separators=(',', ':'))
+            if len(metadata) > self.max_metadata_bytes:
+                raise ValueError(f'metadata is larger than {self.max_metadata_bytes} bytes')
+        return user_id, event_type, metadata, self._occurred_at(event.get('occurred_at'), now)
+
+    def ingest(self, body: bytes, content_type: str = 'application/json') -> Dict:
+        """
+        Validate a batch of events and queue the valid ones for writing
+
+        Args:
+            body: Raw request body
+            content_type: Request content type (NDJSON or JSON)
+
+        Returns:
+            Dict with accepted/rejected counts and the first validation errors
+        """
+        events = self._parse_body(body, content_type)
+        now = time.time()
+        rows = []
+        errors = []
+        for index, event in enumerate(events):
+            try:
+                rows.append(self._validate(event, now))
+            except (ValueError, TypeError, OverflowError, OSError) as e:
+                if len(errors) < 20:
+                    errors.append({'index': index, 'error': str(e)})
+        rejected = len(events) - len(rows)
+        if not rows:
+            raise EventIngestError(f'All {rejected} events are invalid: {errors[0]["error"]}')
+        if not self.writer.submit_many(rows):
+            raise EventIngestError('Event buffer is full, retry later', status=503)
+        return {'accepted': len(rows), 'rejected': rejected, 'errors': errors}
+
+    def _write(self, rows: List[Tuple]):
+        # Events without a timestamp take the column default (insert time)
+        stamped = [row for row in rows if row[3] is not None]
+        unstamped = [row[:3] for row in rows if row[3] is None]
+        if stamped:
+            self.db.bulk_insert(self.TABLE, self.COLUMNS, stamped, ignore=True, name='insert_behavior_events')
+        if unstamped:
+            self.db.bulk_insert(self.TABLE, self.COLUMNS[:3], unstamped, ignore=True, name='insert_behavior_events')
+
+    def get_stats(self) -> Dict:
+        return self.writer.get_stats()
+
+    def close(self):
+        """Flush buffered events and stop the writer"""
+        self.writer.close()
@@ -0,0 +1,93 @@
+import json
+import logging
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class IntentMatch(NamedTuple):
+    name: str
+    priority: int
+
+
+def tokenize(message: str) -> List[str]:
+    """Lower-case word tokens of a message"""
+    return _WORD_RE.findall(message.lower())
+
+
+class IntentMatcher:
+    """
+    Single-pass, word-boundary intent matcher
+
+    Patterns are compiled once into a phrase table keyed by word tuples.
+    A pattern ending in `*` matches any word starting with that stem
+    (e.g. `recommend*` matches "recommendation"). Matching walks the message
+    once and, at every word, looks up phrases up to the longest pattern
+    length, so the cost per message depends on the message length and not
+    on how many patterns are loaded.
+    """
+
+    def __init__(self, intents: Dict[str, Dict]):
+        self.priorities: Dict[str, int] = {}
+        self._exact: Dict[Tuple[str, ...], List[str]] = {}
+        self._prefix: Dict[Tuple[str, ...], List[str]] = {}
+        self._max_words = 1
+        self._max_stem = 1
+
+        for name, intent in intents.items():
+            self.priorities[name] = int(intent.get('priority', 0))
+            for pattern in intent.get('patterns', []):
+                self._add_pattern(name, pattern)
+
+    def _add_pattern(self, name: str, pattern: str):
+        is_prefix = pattern.rstrip().endswith('*')
+        words = tuple(tokenize(pattern))
+        if not words:
+            return
+        table = self._prefix if is_prefix else self._exact
+        table.setdefault(words, [])
+        if name not in table[words]:
+            table[words].append(name)
+        self._max_words = max(self._max_words, len(words))
+        if is_prefix:
+            self._max_stem = max(self._max_stem, len(words[-1]))
+
+    def match(self, message: str) -> List[IntentMatch]:
+        """Return every intent matched by the message, highest priority first"""
+        words = tokenize(message)
+        found = set()
+        n = len(words)
+        for i in range(n):
+            for length in range(1, min(self._max_words, n - i) + 1):
+                phrase = tuple(words[i:i + length])
+                names = self._exact.get(phrase)
+                if names:
+                    found.update(names)
+                if self._prefix:
+                    last = phrase[-1]
+                    head = phrase[:-1]
+                    for stem_len in range(1, min(len(last), self._max_stem) + 1):
+                        names = self._prefix.get(head + (last[:stem_len],))
+                        if names:
+                            found.update(names)
+        return sorted(
+            (IntentMatch(name, self.priorities[name]) for name in found),
+            key=lambda m: (-m.priority, m.name)
+        )
+
+    def best(self, message: str):
+        """Return the highest-priority intent matched, or None"""
+        matches = self.match(message)
+        return matches[0] if matches else None
+
+    @classmethod
+    def from_file(cls, path: str) -> Tuple['IntentMatcher', Dict[str, Dict]]:
+        """Load an intent table from JSON and compile it"""
+        with open(path, encoding='utf-8') as f:
+            intents = json.load(f)['intents']
+        matcher = cls(intents)
+        logger.info(f"Loaded {len(intents)} chatbot intents from {path}")
+        return matcher, intents
@@ -0,0 +1,364 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+class InterestProfiles:
+    """
+    Persisted, time-decayed interest aggregates per user and category
+
+    `user_interest_profiles` keeps, for every (user, category), an activity
+    weight that halves every `half_life_days`, stored as of `weighted_at`,
+    plus plain activity and non-zero score sums/counts and the newest
+    performance row folded in. Reads merge the stored rows with the user's
+    performance rows newer than that (the "tail", normally empty or a few
+    rows) in one indexed query, so request cost is O(categories + tail)
+    however long the history is, and always up to date.
+
+    `update()` folds new performance rows into the profiles incrementally
+    (everything after the highest folded row ID); `rebuild()` recomputes
+    them from the full history for backfills or a changed half-life. Both
+    run under a MySQL named lock so only one worker writes at a time.
+
+    Auto-increment IDs are handed out at insert, not commit, so a slow
+    transaction can commit a row below IDs that are already visible. Only
+    rows below every row inserted in the last `settle` seconds are folded;
+    everything above that stays in the read-time tail, which covers any ID
+    past the user's folded one. A row is thus never folded over, as long
+    as transactions commit within `settle` seconds.
+    """
+
+    LOCK_NAME = 'ai_interest_profiles'
+
+    # Stored aggregates plus the unfolded tail, as rows of the same shape
+    INTERESTS_QUERY = """
+        SELECT category, weight, weighted_at, activity_count, score_sum, score_count
+        FROM user_interest_profiles
+        WHERE user_id = %s
+        UNION ALL
+        SELECT COALESCE(c.category, 'General'), 1, UNIX_TIMESTAMP(p.timestamp), 1,
+               CASE WHEN p.score > 0 THEN p.score ELSE 0 END,
+               CASE WHEN p.score > 0 THEN 1 ELSE 0 END
+        FROM performance p
+        JOIN modules m ON p.module_id = m.id
+        JOIN courses c ON m.course_id = c.id
+        WHERE p.user_id = %s AND p.id > (
+            SELECT COALESCE(MAX(last_performance_id), 0) FROM user_interest_profiles WHERE user_id = %s
+        )
+    """
+
+    BATCH_INTERESTS_QUERY = """
+        SELECT user_id, category, weight, weighted_at, activity_count, score_sum, score_count
+        FROM user_interest_profiles
+        WHERE user_id IN ({placeholders})
+        UNION ALL
+        SELECT p.user_id, COALESCE(c.category, 'General'), 1, UNIX_TIMESTAMP(p.timestamp), 1,
+               CASE WHEN p.score > 0 THEN p.score ELSE 0 END,
+               CASE WHEN p.score > 0 THEN 1 ELSE 0 END
+        FROM performance p
+        JOIN modules m ON p.module_id = m.id
+        JOIN courses c ON m.course_id = c.id
+        LEFT JOIN (
+            SELECT user_id, MAX(last_performance_id) as last_id
+            FROM user_interest_profiles
+            WHERE user_id IN ({placeholders})
+            GROUP BY user_id
+        ) folded ON folded.user_id = p.user_id
+        WHERE p.user_id IN ({placeholders}) AND p.id > COALESCE(folded.last_id, 0)
+    """
+
+    WATERMARK_QUERY = "SELECT COALESCE(MAX(last_performance_id), 0) as watermark FROM user_interest_profiles"
+
+    # Highest ID below every row inserted in the last `settle` seconds (a short idx_timestamp range)
+    SETTLED_ID_QUERY = """
+        SELECT COALESCE(MIN(id) - 1, (SELECT MAX(id) FROM performance), 0) as settled_id
+        FROM performance
+        WHERE timestamp > NOW() - INTERVAL %s SECOND
+    """
+
+    USER_RANGE_QUERY = "SELECT MIN(user_id) as min_id, MAX(user_id) as max_id FROM performance"
+
+    # Settled rows to fold, by performance ID range (update) or user range (rebuild)
+    PERFORMANCE_ROWS_QUERY = """
+        SELECT p.id, p.user_id, COALESCE(c.category, 'General'), p.score, UNIX_TIMESTAMP(p.timestamp)
+        FROM performance p
+        JOIN modules m ON p.module_id = m.id
+        JOIN courses c ON m.course_id = c.id
+        WHERE p.{column} BETWEEN %s AND %s AND p.id <= %s
+    """
+
+    PROFILES_QUERY = """
+        SELECT user_id, category, weight, weighted_at, activity_count, score_sum, score_count, last_performance_id
+        FROM user_interest_profiles
+        WHERE user_id IN ({placeholders})
+    """
+
+    UPSERT_QUERY = """
+        INSERT INTO user_interest_profiles
+        (user_id, category, weight, weighted_at, activity_count, score_sum, score_count, last_performance_id)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE weight = VALUES(weight), weighted_at = VALUES(weighted_at),
+            activity_count = VALUES(activity_count), score_sum = VALUES(score_sum),
+            score_count = VALUES(score_count), last_performance_id = VALUES(last_performance_id)
+    """
+
+    DELETE_RANGE_QUERY = "DELETE FROM user_interest_profiles WHERE user_id BETWEEN %s AND %s"
+
+    def __init__(self, db_connector, half_life_days: Optional[float] = None,
+                 batch_size: Optional[int] = None, user_chunk: Optional[int] = None,
+                 settle: Optional[int] = None):
+        self.db = db_connector
+        self.half_life = (
+            half_life_days if half_life_days is not None
+            else float(os.getenv('INTEREST_HALF_LIFE_DAYS', 30))
+        ) * 86400
+        self.batch_size = batch_size or int(os.getenv('INTEREST_UPDATE_BATCH', 20000))
+        self.user_chunk = user_chunk or int(os.getenv('INTEREST_REBUILD_USER_CHUNK', 2000))
+        self.settle = settle if settle is not None else int(os.getenv('INTEREST_SETTLE_SECONDS', 120))
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_run: Dict = {}
+
+    def _decay(self, weight: float, since: float, until: float) -> float:
+        """Decay a weight stored as of `since` to time `until`"""
+        return weight * 2.0 ** (min(0.0, since - until) / self.half_life)
+
+    def _rank(self, rows: Iterable[Tuple]) -> Dict:
+        """Interests from (category, weight, weighted_at, activity, score_sum, score_count) rows"""
+        now = time.time()
+        weights: Dict[str, float] = {}
+        latest: Dict[str, float] = {}
+        score_sum = 0.0
+        score_count = 0
+        for category, weight, weighted_at, _, row_score_sum, row_score_count in rows:
+            weighted_at = float(weighted_at or 0)
+            weights[category] = weights.get(category, 0.0) + self._decay(float(weight), weighted_at, now)
+            latest[category] = max(latest.get(category, 0.0), weighted_at)
+            score_sum += float(row_score_sum or 0)
+            score_count += int(row_score_count or 0)
+        ranked = sorted(weights, key=lambda category: (weights[category], latest[category]), reverse=True)
+        return {
+            'categories': ranked[:3],
+            'avg_score': score_sum / score_count if score_count > 0 else 0
+        }
+
+    @staticmethod
+    def _columns(row: Dict) -> Tuple:
+        return (row['category'], row['weight'], row['weighted_at'], row['activity_count'],
+                row['score_sum'], row['score_count'])
+
+    def interests(self, user_id: int) -> Dict:
+        """
+        Top categories (by decayed activity) and average non-zero score
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Dict with `categories` (at most 3) and `avg_score`
+        """
+        rows = self.db.execute_query(self.INTERESTS_QUERY, (user_id, user_id, user_id), name='user_interests')
+        return self._rank(self._columns(row) for row in rows)
+
+    async def interests_async(self, async_db, user_id: int) -> Dict:
+        """`interests()` through an AsyncDatabaseConnector"""
+        rows = await async_db.execute_query(self.INTERESTS_QUERY, (user_id, user_id, user_id), name='user_interests')
+        return self._rank(self._columns(row) for row in rows)
+
+    def interests_many(self, user_ids: List[int], chunk_size: int = 500) -> Dict[int, Dict]:
+        """`interests()` for many users, one query per chunk of users"""
+        grouped: Dict[int, List[Tuple]] = {user_id: [] for user_id in user_ids}
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            placeholders = ','.join(['%s'] * len(chunk))
+            rows = self.db.execute_query(
+                self.BATCH_INTERESTS_QUERY.format(placeholders=placeholders),
+                tuple(chunk) * 3,
+                name='batch_user_interests'
+            )
+            for row in rows:
+                grouped[row['user_id']].append(self._columns(row))
+        return {user_id: self._rank(rows) for user_id, rows in grouped.items()}
+
+    def _fold(self, profiles: Dict[Tuple[int, str], List], events: Iterable[Tuple]) -> Set[Tuple[int, str]]:
+        """
+        Fold (id, user_id, category, score, ts) rows into profile entries
+
+        Entries are [weight, weighted_at, activity, score_sum, score_count,
+        last_id]; rows at or below the user's highest folded ID are skipped,
+        so re-running an interrupted range never counts a row twice.
+
+        Returns:
+            Keys of the entries that changed
+        """
+        changed = set()
+        folded_upto: Dict[int, int] = {}
+        for (user_id, _), entry in profiles.items():
+            folded_upto[user_id] = max(folded_upto.get(user_id, 0), entry[5])
+        for performance_id, user_id, category, score, ts in events:
+            if performance_id <= folded_upto.get(user_id, 0):
+                continue
+            ts = float(ts or 0)
+            entry = profiles.get((user_id, category))
+            if entry is None:
+                entry = profiles[(user_id, category)] = [0.0, ts, 0, 0.0, 0, 0]
+            if ts > entry[1]:
+                entry[0] = self._decay(entry[0], entry[1], ts) + 1.0
+                entry[1] = ts
+            else:
+                entry[0] += self._decay(1.0, ts, entry[1])
+            entry[2] += 1
+            if score and float(score) > 0:
+                entry[3] += float(score)
+                entry[4] += 1
+            entry[5] = max(entry[5], performance_id)
+            changed.add((user_id, category))
+        return changed
+
+    def _load_profiles(self, user_ids: List[int]) -> Dict[Tuple[int, str], List]:
+        profiles = {}
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            rows = self.db.execute_query(
+                self.PROFILES_QUERY.format(placeholders=','.join(['%s'] * len(chunk))),
+                tuple(chunk),
+                name='interest_profiles'
+            )
+            for row in rows:
+                profiles[(row['user_id'], row['category'])] = [
+                    float(row['weight']), float(row['weighted_at']), int(row['activity_count']),
+                    float(row['score_sum']), int(row['score_count']), int(row['last_performance_id'])
+                ]
+        return profiles
+
+    def _save(self, profiles: Dict[Tuple[int, str], List], keys: Iterable[Tuple[int, str]]) -> int:
+        rows = []
+        for user_id, category in sorted(keys):
+            weight, weighted_at, activity, score_sum, score_count, last_id = profiles[(user_id, category)]
+            rows.append((user_id, category, weight, int(weighted_at), activity, score_sum, score_count, last_id))
+        self.db.execute_many(self.UPSERT_QUERY, rows, name='upsert_interest_profiles')
+        return len(rows)
+
+    def _settled_id(self) -> int:
+        rows = self.db.execute_query(self.SETTLED_ID_QUERY, (self.settle,), name='interest_settled_id')
+        return int(rows[0]['settled_id']) if rows else 0
+
+    def _update(self) -> Dict:
+        watermark = int(self.db.execute_query(self.WATERMARK_QUERY)[0]['watermark'])
+        max_id = self._settled_id()
+        rows = 0
+        profiles_written = 0
+        for low in range(watermark + 1, max_id + 1, self.batch_size):
+            if self._stop.is_set():
+                raise InterruptedError('Interest profile update stopped')
+            events = list(self.db.iter_query(
+                self.PERFORMANCE_ROWS_QUERY.format(column='id'),
+                (low, low + self.batch_size - 1, max_id),
+                name='interest_profile_rows',
+                as_tuples=True
+            ))
+            if not events:
+                continue
+            events.sort()  # fold in ID order
+            profiles = self._load_profiles(sorted({event[1] for event in events}))
+            changed = self._fold(profiles, events)
+            profiles_written += self._save(profiles, changed)
+            rows += len(events)
+        return {'rebuild': False, 'rows': rows, 'profiles': profiles_written, 'watermark': max_id}
+
+    def _rebuild(self) -> Dict:
+        bounds = self.db.execute_query(self.USER_RANGE_QUERY)
+        settled_id = self._settled_id()
+        rows = 0
+        profiles_written = 0
+        if bounds and bounds[0]['min_id'] is not None:
+            min_id, max_id = int(bounds[0]['min_id']), int(bounds[0]['max_id'])
+            for low in range(min_id, max_id + 1, self.user_chunk):
+                if self._stop.is_set():
+                    raise InterruptedError('Interest profile rebuild stopped')
+                high = low + self.user_chunk - 1
+                profiles: Dict[Tuple[int, str], List] = {}
+                events = sorted(self.db.iter_query(
+                    self.PERFORMANCE_ROWS_QUERY.format(column='user_id'),
+                    (low, high, settled_id),
+                    name='interest_profile_rows',
+                    as_tuples=True
+                ))
+                changed = self._fold(profiles, events)
+                # Readers fall back to the full history while the range is empty
+                self.db.execute_update(self.DELETE_RANGE_QUERY, (low, high), name='delete_interest_profiles')
+                if changed:
+                    profiles_written += self._save(profiles, changed)
+                rows += len(events)
+        return {'rebuild': True, 'rows': rows, 'profiles': profiles_written}
+
+    def run_once(self, rebuild: bool = False) -> Dict:
+        """
+        Fold new performance rows into the profiles, or rebuild them all
+
+        Returns:
+            Summary of the run; `skipped` is set when another run holds the lock
+        """
+        started = time.perf_counter()
+        # Pin one pooled connection for the whole run: GET_LOCK is per session
+        with self.db.pool.connection():
+            acquired = self.db.execute_query("SELECT GET_LOCK(%s, 0) AS acquired", (self.LOCK_NAME,))
+            if not acquired or not acquired[0]['acquired']:
+                return {'skipped': True}
+            try:
+                result = self._rebuild() if rebuild else self._update()
+            finally:
+                self.db.execute_query("SELECT RELEASE_LOCK(%s) AS released", (self.LOCK_NAME,))
+
+        elapsed = time.perf_counter() - started
+        result.update({'elapsed_ms': round(elapsed * 1000, 2), 'finished_at': time.time()})
+        self.last_run = result
+        logger.info(
+            f"Interest profiles {'rebuilt' if rebuild else 'updated'}: {result['rows']} rows, "
+            f"{result['profiles']} profiles in {elapsed:.2f}s"
+        )
+        return result
+
+    def start(self, interval: float):
+        """Fold new performance rows every `interval` seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.run_once()
+                except InterruptedError:
+                    return
+                except Exception as e:
+                    logger.error(f"Interest profile update error: {e}")
+
+        self._thread = threading.Thread(target=loop, name='interest-profiles', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    """Update (or rebuild) interest profiles from the command line (e.g. from cron)"""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Maintain user_interest_profiles')
+    parser.add_argument('--rebuild', action='store_true', help='recompute every profile from the full history')
+    args = parser.parse_args()
+
+    from database.db_connector import DatabaseConnector
+
+    print(InterestProfiles(DatabaseConnector()).run_once(rebuild=args.rebuild))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+class ModuleGraph:
+    """
+    Precomputed module ordering used to build learning paths
+
+    Built once per catalog snapshot. Holds the per-category module lists in
+    catalog order (module order first, so the first module of every course
+    comes before any second module), each course's modules in sequence, and
+    optional prerequisite edges. `walk()` visits modules lazily and stops as
+    soon as it has enough items, so the cost of a path depends on its length
+    and the learner's completed modules, not on the size of the catalog.
+    """
+
+    def __init__(self, modules: List[Dict], prerequisites: Optional[Dict[int, Iterable[int]]] = None):
+        self.order: Tuple[Dict, ...] = tuple(modules)
+        by_category: Dict[str, List[Dict]] = {}
+        by_course: Dict[int, List[Dict]] = {}
+        for module in modules:
+            by_category.setdefault(module['category'], []).append(module)
+            by_course.setdefault(module['course_id'], []).append(module)
+
+        self.by_category: Dict[str, Tuple[Dict, ...]] = {c: tuple(m) for c, m in by_category.items()}
+        self.course_sequence: Dict[int, Tuple[int, ...]] = {
+            course_id: tuple(m['id'] for m in sorted(mods, key=lambda m: (m['module_order'], m['id'])))
+            for course_id, mods in by_course.items()
+        }
+        known = {module['id'] for module in modules}
+        # Edges to modules outside the published catalog can never be satisfied; drop them
+        self.prerequisites: Dict[int, FrozenSet[int]] = {
+            module_id: frozenset(p for p in required if p in known)
+            for module_id, required in (prerequisites or {}).items()
+            if module_id in known
+        }
+
+    def _candidates(self, categories: Iterable[str]):
+        for category in categories:
+            yield from self.by_category.get(category, ())
+
+    def walk(self, categories: Iterable[str], completed: Set[int], limit: int) -> List[Dict]:
+        """
+        Next modules to study, in path order
+
+        Args:
+            categories: Categories to draw from, in priority order
+            completed: IDs of modules the learner already completed
+            limit: Number of modules wanted
+
+        Returns:
+            Up to `limit` uncompleted modules whose prerequisites are completed
+            or appear earlier in the path
+        """
+        plan: List[Dict] = []
+        planned: Set[int] = set()
+        for module in self._candidates(categories):
+            module_id = module['id']
+            if module_id in completed:
+                continue
+            required = self.prerequisites.get(module_id)
+            if required and not all(p in completed or p in planned for p in required):
+                continue
+            plan.append(module)
+            planned.add(module_id)
+            if len(plan) >= limit:
+                break
+        return plan
+
+    def first(self, limit: int) -> List[Dict]:
+        """First modules of the catalog regardless of category"""
+        return list(self.order[:limit])
@@ -0,0 +1,198 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class PdfExtractionError(Exception):
+    """Raised when a PDF cannot be extracted within the configured limits"""
+
+    def __init__(self, message: str, status: int = 422):
+        super().__init__(message)
+        self.status = status
+
+
+def _init_worker(memory_limit_bytes: int):
+    """Cap the address space of extraction workers where supported"""
+    if resource is not None and memory_limit_bytes > 0:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        except (ValueError, OSError):
+            pass
+
+
+def _count_pages(path: str) -> int:
+    import PyPDF2
+    return len(PyPDF2.PdfReader(path).pages)
+
+
+def _extract_pages(path: str, start: int, end: int) -> List[str]:
+    import PyPDF2
+    reader = PyPDF2.PdfReader(path)
+    pages = []
+    for page in reader.pages[start:end]:
+        try:
+            pages.append(page.extract_text() or '')
+        except Exception:
+            pages.append('')
+    return pages
+
+
+class PdfExtractor:
+    """
+    PDF text extraction in a bounded process pool
+
+    Uploads are spooled to a temporary file with a byte cap instead of being
+    read into memory. Page ranges are extracted in parallel chunks by worker
+    processes that run under an address-space limit, and every job has an
+    overall deadline, so a heavy document never blocks a web worker thread
+    for longer than `timeout` seconds. A running chunk cannot be cancelled,
+    so a job that misses its deadline terminates the pool's processes and
+    the next job starts a fresh pool; jobs sharing that pool fail with it.
+    """
+
+    SPOOL_CHUNK = 64 * 1024
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        pages_per_chunk: Optional[int] = None
+    ):
+        self.max_workers = max_workers or int(os.getenv('PDF_WORKERS', 2))
+        self.max_pages = max_pages or int(os.getenv('PDF_MAX_PAGES', 100))
+        self.max_bytes = max_bytes or int(os.getenv('PDF_MAX_BYTES', 20 * 1024 * 1024))
+        self.timeout = timeout or float(os.getenv('PDF_TIMEOUT_SECONDS', 30))
+        self.memory_limit_mb = memory_limit_mb or int(os.getenv('PDF_MEMORY_LIMIT_MB', 512))
+        self.pages_per_chunk = pages_per_chunk or int(os.getenv('PDF_PAGES_PER_CHUNK', 10))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking a threaded web worker is not safe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                        initargs=(self.memory_limit_mb * 1024 * 1024,)
+                    )
+        return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor, reason: str = 'broken'):
+        """Replace a broken or overrun pool, terminating its workers, so later jobs still run"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        logger.error(f"PDF worker pool {reason}; it will be recreated on next use")
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def spool(self, stream, suffix: str = '.pdf', hasher=None) -> str:
+        """Copy an upload stream to a temp file, enforcing the byte cap
+
+        When a hashlib object is given it is updated with every chunk, so
+        the upload is hashed without being read a second time.
+        """
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix='upload-')
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(self.SPOOL_CHUNK)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > self.max_bytes:
+                        raise PdfExtractionError(
+                            f'File exceeds the {self.max_bytes // (1024 * 1024)}MB upload limit', status=413
+                        )
+                    out.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+            return path
+        except Exception:
+            os.unlink(path)
+            raise
+
+    def extract(self, path: str, progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """
+        Extract text from the first `max_pages` pages of a spooled PDF
+
+        Args:
+            path: Path of the spooled PDF
+            progress: Optional callback(pages_done, total_pages)
+
+        Returns:
+            Extracted text with pages joined by newlines
+        """
+        executor = self._get_executor()
+        deadline = time.monotonic() + self.timeout
+
+        def remaining():
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise FutureTimeoutError()
+            return left
+
+        try:
+            total = min(executor.submit(_count_pages, path).result(timeout=remaining()), self.max_pages)
+        except FutureTimeoutError:
+            self._reset(executor, 'timed out')
+            raise PdfExtractionError('PDF extraction timed out', status=504)
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise PdfExtractionError('PDF worker crashed (memory limit exceeded?)')
+        except Exception as e:
+            raise PdfExtractionError(f'Could not read PDF: {e}')
+
+        futures = [
+            executor.submit(_extract_pages, path, start, min(start + self.pages_per_chunk, total))
+            for start in range(0, total, self.pages_per_chunk)
+        ]
+        pages: List[str] = []
+        try:
+            for future in futures:
+                chunk = future.result(timeout=remaining())
+                pages.extend(chunk)
+                if progress is not None:
+                    progress(len(pages), total)
+        except FutureTimeoutError:
+            self._reset(executor, 'timed out')
+            raise PdfExtractionError('PDF extraction timed out', status=504)
+        except PdfExtractionError:
+            raise
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise PdfExtractionError('PDF worker crashed (memory limit exceeded?)')
+        except Exception as e:
+            raise PdfExtractionError(f'Could not extract PDF text: {e}')
+        finally:
+            for future in futures:
+                future.cancel()
+        return '\n'.join(pages)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,132 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressAggregateCache:
+    """
+    Per-user progress aggregates keyed by the user's performance version
+
+    One aggregate query over `performance` produces everything the chatbot
+    progress reply and the performance analysis need. Performance rows are
+    only ever inserted, so the user's row count and highest id identify the
+    data an aggregate was computed from. Every lookup reads that version
+    with a small indexed query and only reruns the aggregate when it moved,
+    so a write seen by any worker (or made directly in MySQL) is reflected
+    on the next request without invalidation calls. At most `max_entries`
+    users are cached (least recently used are evicted first).
+    """
+
+    VERSION_QUERY = """
+        SELECT COUNT(*) as performance_count, MAX(id) as last_performance_id
+        FROM performance
+        WHERE user_id = %s
+    """
+
+    AGGREGATE_QUERY = """
+        SELECT
+            COUNT(*) as total_modules,
+            SUM(CASE WHEN completion_status = 'completed' THEN 1 ELSE 0 END) as completed,
+            AVG(score) as avg_score,
+            SUM(score) as score_sum,
+            COUNT(NULLIF(score, 0)) as scored_count,
+            MAX(score) as highest_score,
+            MIN(NULLIF(score, 0)) as lowest_score
+        FROM performance
+        WHERE user_id = %s
+    """
+
+    def __init__(self, db_connector, max_entries: Optional[int] = None):
+        self.db = db_connector
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('PROGRESS_CACHE_MAX_ENTRIES', 10000))
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _to_aggregates(row: Optional[Dict]) -> Dict:
+        row = row or {}
+        scored_count = int(row.get('scored_count') or 0)
+        score_sum = float(row.get('score_sum') or 0)
+        return {
+            'total_modules': int(row.get('total_modules') or 0),
+            'completed': int(row.get('completed') or 0),
+            # AVG over every recorded score, zeros included
+            'avg_score': float(row['avg_score']) if row.get('avg_score') is not None else 0,
+            # Average over non-zero scores only
+            'scored_average': score_sum / scored_count if scored_count else 0,
+            'scored_count': scored_count,
+            'highest_score': float(row.get('highest_score') or 0),
+            'lowest_score': float(row.get('lowest_score') or 0),
+        }
+
+    @staticmethod
+    def _version(rows) -> Tuple:
+        row = rows[0] if rows else {}
+        return (int(row.get('performance_count') or 0), row.get('last_performance_id'))
+
+    def _lookup(self, user_id: int, version: Tuple) -> Optional[Dict]:
+        """Return the cached aggregates if they were computed for `version`"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def _store(self, user_id: int, version: Tuple, rows) -> Dict:
+        # Rows inserted after the version was read may be included; the next
+        # lookup then sees a newer version and recomputes, never the reverse
+        aggregates = self._to_aggregates(rows[0] if rows else None)
+        with self._lock:
+            self._entries[user_id] = (version, aggregates)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return aggregates
+
+    def get(self, user_id: int) -> Dict:
+        """Return the user's progress aggregates, rerunning the aggregate only when their performance changed"""
+        version = self._version(self.db.execute_query(self.VERSION_QUERY, (user_id,), name='progress_version'))
+        aggregates = self._lookup(user_id, version)
+        if aggregates is not None:
+            return aggregates
+        rows = self.db.execute_query(self.AGGREGATE_QUERY, (user_id,), name='progress_aggregate')
+        return self._store(user_id, version, rows)
+
+    async def get_async(self, async_db, user_id: int) -> Dict:
+        """`get()` for the async serving mode, querying through an AsyncDatabaseConnector"""
+        version = self._version(
+            await async_db.execute_query(self.VERSION_QUERY, (user_id,), name='progress_version')
+        )
+        aggregates = self._lookup(user_id, version)
+        if aggregates is not None:
+            return aggregates
+        rows = await async_db.execute_query(self.AGGREGATE_QUERY, (user_id,), name='progress_aggregate')
+        return self._store(user_id, version, rows)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user's aggregates, or everything when no user is given"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,211 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterator, List
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationMaterializer:
+    """
+    Background writer of each user's top-N recommendations
+
+    Each run recomputes only users whose `performance` or
+    `course_enrollments` rows changed since the stored watermark, plus users
+    whose materialized set is close to its freshness bound. A catalog version
+    change (or the first run) recomputes every student. Users are processed
+    in batches through `RecommendationService.get_batch_recommendations`;
+    per batch the previous set is deactivated and the new one inserted in
+    one transaction, so older rows stay available as `was_accepted` history
+    and readers never see a user without an active set. A MySQL named lock
+    keeps concurrent runs (other gunicorn workers, cron) from overlapping.
+    """
+
+    STATE_NAME = 'recommendations'
+    LOCK_NAME = 'ai_recommendation_materializer'
+
+    STATE_QUERY = "SELECT watermark, catalog_version FROM ai_materializer_state WHERE name = %s"
+
+    SAVE_STATE_QUERY = """
+        INSERT INTO ai_materializer_state (name, watermark, catalog_version)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE watermark = VALUES(watermark), catalog_version = VALUES(catalog_version)
+    """
+
+    CHANGED_USERS_QUERY = """
+        SELECT user_id FROM performance
+        WHERE timestamp > %s - INTERVAL %s SECOND AND timestamp <= %s
+        UNION
+        SELECT user_id FROM course_enrollments
+        WHERE enrolled_at > %s - INTERVAL %s SECOND AND enrolled_at <= %s
+    """
+
+    AGING_USERS_QUERY = """
+        SELECT DISTINCT user_id FROM ai_recommendations
+        WHERE is_active = TRUE AND created_at < %s - INTERVAL %s SECOND
+    """
+
+    STUDENTS_QUERY = """
+        SELECT id FROM users
+        WHERE role = 'student' AND id > %s
+        ORDER BY id
+        LIMIT %s
+    """
+
+    DEACTIVATE_QUERY = """
+        UPDATE ai_recommendations SET is_active = FALSE
+        WHERE is_active = TRUE AND user_id IN ({placeholders})
+    """
+
+    INSERT_QUERY = """
+        INSERT INTO ai_recommendations
+        (user_id, recommended_course_id, recommendation_reason, confidence_score, is_active)
+        VALUES (%s, %s, %s, %s, TRUE)
+    """
+
+    def __init__(self, db_connector, recommendation_service, batch_size: int = None,
+                 top_n: int = None, max_age: float = None, overlap: int = None):
+        self.db = db_connector
+        self.recommendation_service = recommendation_service
+        self.batch_size = batch_size or int(os.getenv('RECS_MATERIALIZE_BATCH_SIZE', 500))
+        self.top_n = top_n or int(os.getenv('RECS_MATERIALIZE_TOP_N', 10))
+        self.max_age = max_age or float(os.getenv('RECS_MAX_AGE_SECONDS', 86400))
+        # Rows committed late with an older timestamp are still picked up
+        self.overlap = overlap if overlap is not None else int(os.getenv('RECS_WATERMARK_OVERLAP_SECONDS', 120))
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_run: Dict = {}
+
+    def _changed_user_ids(self, watermark, now) -> List[int]:
+        rows = self.db.execute_query(
+            self.CHANGED_USERS_QUERY,
+            (watermark, self.overlap, now, watermark, self.overlap, now)
+        )
+        user_ids = {row['user_id'] for row in rows}
+        # Refresh sets at half their max age so readers rarely hit the live fallback
+        rows = self.db.execute_query(self.AGING_USERS_QUERY, (now, int(self.max_age / 2)))
+        user_ids.update(row['user_id'] for row in rows)
+        return sorted(user_ids)
+
+    def _all_student_batches(self) -> Iterator[List[int]]:
+        last_id = 0
+        while True:
+            rows = self.db.execute_query(self.STUDENTS_QUERY, (last_id, self.batch_size))
+            if not rows:
+                return
+            batch = [row['id'] for row in rows]
+            yield batch
+            last_id = batch[-1]
+
+    def _materialize(self, user_ids: List[int]) -> int:
+        """Recompute and store one batch; returns the number of rows written"""
+        results = self.recommendation_service.get_batch_recommendations(user_ids, self.top_n)['recommendations']
+        rows = [
+            (user_id, rec['course_id'], rec['reason'], rec['confidence'])
+            for user_id, recs in results.items()
+            for rec in recs
+        ]
+        placeholders = ','.join(['%s'] * len(user_ids))
+        # One transaction, so readers never see a user without an active set
+        with self.db.transaction():
+            self.db.execute_update(
+                self.DEACTIVATE_QUERY.format(placeholders=placeholders), tuple(user_ids), name='deactivate_recommendations'
+            )
+            self.db.execute_many(self.INSERT_QUERY, rows)
+        return len(rows)
+
+    def run_once(self, full: bool = False) -> Dict:
+        """
+        Run one incremental (or full) materialization pass
+
+        Returns:
+            Summary of the run; `skipped` is set when another run holds the lock
+        """
+        started = time.perf_counter()
+        # Pin one pooled connection for the whole run: GET_LOCK is per session
+        with self.db.pool.connection():
+            acquired = self.db.execute_query("SELECT GET_LOCK(%s, 0) AS acquired", (self.LOCK_NAME,))
+            if not acquired or not acquired[0]['acquired']:
+                return {'skipped': True}
+            try:
+                now = self.db.execute_query("SELECT NOW() AS now")[0]['now']
+                catalog_version = self.recommendation_service.catalog.version
+                state = self.db.execute_query(self.STATE_QUERY, (self.STATE_NAME,))
+                state = state[0] if state else None
+
+                full = full or state is None or state['watermark'] is None \
+                    or state['catalog_version'] != catalog_version
+                if full:
+                    batches = self._all_student_batches()
+                else:
+                    changed = self._changed_user_ids(state['watermark'], now)
+                    batches = (changed[i:i + self.batch_size] for i in range(0, len(changed), self.batch_size))
+
+                users = 0
+                rows = 0
+                for batch in batches:
+                    if self._stop.is_set():
+                        # Watermark stays put, so the next run redoes the remainder
+                        raise InterruptedError('Materializer stopped')
+                    rows += self._materialize(batch)
+                    users += len(batch)
+
+                self.db.execute_update(self.SAVE_STATE_QUERY, (self.STATE_NAME, now, catalog_version))
+            finally:
+                self.db.execute_query("SELECT RELEASE_LOCK(%s) AS released", (self.LOCK_NAME,))
+
+        elapsed = time.perf_counter() - started
+        self.last_run = {
+            'full': full,
+            'users': users,
+            'rows': rows,
+            'watermark': str(now),
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'finished_at': time.time()
+        }
+        logger.info(f"Materialized recommendations for {users} users ({rows} rows, full={full}) in {elapsed:.2f}s")
+        return self.last_run
+
+    def start(self, interval: float):
+        """Run the materializer every `interval` seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.run_once()
+                except InterruptedError:
+                    return
+                except Exception as e:
+                    logger.error(f"Recommendation materializer error: {e}")
+
+        self._thread = threading.Thread(target=loop, name='recommendation-materializer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    """Run one materialization pass from the command line (e.g. from cron)"""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Materialize recommendations into ai_recommendations')
+    parser.add_argument('--full', action='store_true', help='recompute every student, ignoring the watermark')
+    args = parser.parse_args()
+
+    from database.db_connector import DatabaseConnector
+    from services.recommendation_service import RecommendationService
+
+    db = DatabaseConnector()
+    materializer = RecommendationMaterializer(db, RecommendationService(db))
+    print(materializer.run_once(full=args.full))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,170 +1,238 @@
+import hashlib
 import logging
-from typing import List, Dict
-import random
+import os
+import time
+from typing import List, Dict, Optional
+
+from services.collaborative_filtering import ItemSimilarityModel
+from services.course_catalog import CourseCatalog
+from services.interest_profiles import InterestProfiles
+from services.progress_cache import ProgressAggregateCache
+from services.scoring_engine import ScoringEngine
+from services.user_snapshot import UserSnapshot, load_snapshots
 
 logger = logging.getLogger(__name__)
 
 class RecommendationService:
     """AI-powered course recommendation service"""
     
-    def __init__(self, db_connector):
+    def __init__(
+        self,
+        db_connector,
+        catalog: Optional[CourseCatalog] = None,
+        progress_cache: Optional[ProgressAggregateCache] = None,
+        interest_profiles: Optional[InterestProfiles] = None
+    ):
         self.db = db_connector
+        self.interest_profiles = interest_profiles
+        self.catalog = catalog or CourseCatalog(db_connector)
+        self.progress_cache = progress_cache or ProgressAggregateCache(db_connector)
         self.confidence_threshold = 0.5
+        self._scoring_engine = None
+        self._scoring_catalog = None
+        self.cf_model_path = os.getenv('CF_MODEL_PATH', 'models/item_similarity')
+        self.cf_weight = float(os.getenv('CF_BLEND_WEIGHT', 0.2))
+        self.cf_model = None
+        self._cf_model_mtime = None
+        self._content_version = None
+        self.materialized_max_age = float(os.getenv('RECS_MAX_AGE_SECONDS', 86400))
+
+    def snapshot(self, user_id: int) -> UserSnapshot:
+        """Create a request-scoped data snapshot for a user"""
+        return UserSnapshot(self.db, user_id, profiles=self.interest_profiles)
     
-    def get_personalized_recommendations(self, user_id: int, limit: int = 5) -> List[Dict]:
+    def get_personalized_recommendations(
+        self,
+        user_id: int,
+        limit: int = 5,
+        snapshot: Optional[UserSnapshot] = None
+    ) -> List[Dict]:
         """
         Generate personalized course recommendations for a user
         
-        This is a placeholder implementation using rule-based logic.
+        Courses are scored with rule-based logic by the vectorized ScoringEngine.
         In production, this would use ML models (collaborative filtering, content-based, etc.)
         
         Args:
             user_id: User ID to generate recommendations for
             limit: Maximum number of recommendations
+            snapshot: Optional request-scoped snapshot to reuse
             
         Returns:
             List of recommended courses with confidence scores
         """
         try:
-            # Get user's performance history
-            user_performance = self._get_user_performance(user_id)
+            snapshot = snapshot or self.snapshot(user_id)
             
             # Get user's enrolled courses
-            enrolled_courses = self._get_enrolled_courses(user_id)
-            enrolled_ids = [c['course_id'] for c in enrolled_courses]
+            enrolled_ids = snapshot.enrolled_course_ids
             
             # Get user's interests based on completed modules
-            user_interests = self._analyze_user_interests(user_id)
-            
-            # Get all available courses
-            all_courses = self._get_available_courses()
+            user_interests = snapshot.interests
             
-            # Filter out already enrolled courses
-            available_courses = [c for c in all_courses if c['id'] not in enrolled_ids]
+            # Score all available courses, skipping already enrolled ones
+            engine = self._get_scoring_engine()
+            top = engine.top_k(user_interests, limit, enrolled_ids, self.confidence_threshold)
             
-            # Score each course
-            scored_courses = []
-            for course in available_courses:
-                score = self._calculate_recommendation_score(
-                    course, 
-                    user_performance, 
-                    user_interests
-                )
-                
-                if score >= self.confidence_threshold:
-                    scored_courses.append({
-                        'course_id': course['id'],
-                        'title': course['title'],
-                        'description': course['description'],
-                        'category': course['category'],
-                        'difficulty_level': course['difficulty_level'],
-                        'confidence': round(score, 2),
-                        'reason': self._generate_recommendation_reason(course, user_interests)
-                    })
-            
-            # Sort by confidence score and return top N
-            scored_courses.sort(key=lambda x: x['confidence'], reverse=True)
-            
-            return scored_courses[:limit]
+            return [self._format_recommendation(course, score, user_interests) for course, score in top]
             
         except Exception as e:
             logger.error(f"Recommendation generation error: {e}")
             return []
     
-    def _get_user_performance(self, user_id: int) -> List[Dict]:
-        """Get user's performance records"""
-        query = """
-            SELECT p.*, m.course_id, c.category
-            FROM performance p
-            JOIN modules m ON p.module_id = m.id
-            JOIN courses c ON m.course_id = c.id
-            WHERE p.user_id = %s
-            ORDER BY p.timestamp DESC
+    LEARNING_PATH_LENGTH = 6
+
+    MATERIALIZED_QUERY = """
+        SELECT recommended_course_id, recommendation_reason, confidence_score
+        FROM ai_recommendations
+        WHERE user_id = %s AND is_active = TRUE AND created_at >= NOW() - INTERVAL %s SECOND
+        ORDER BY confidence_score DESC, id
+        LIMIT %s
+    """
+
+    def get_materialized_recommendations(self, user_id: int, limit: int = 5) -> Optional[List[Dict]]:
         """
-        return self.db.execute_query(query, (user_id,))
-    
-    def _get_enrolled_courses(self, user_id: int) -> List[Dict]:
-        """Get user's enrolled courses"""
-        query = """
-            SELECT course_id, progress_percentage, status
-            FROM course_enrollments
-            WHERE user_id = %s
+        Read the user's materialized recommendations
+
+        Course details come from the in-memory catalog, so this is a single
+        indexed lookup on `ai_recommendations`.
+
+        Returns:
+            Recommendations, or None when there is no set newer than the freshness bound
         """
-        return self.db.execute_query(query, (user_id,))
-    
-    def _get_available_courses(self) -> List[Dict]:
-        """Get all published courses"""
-        query = """
-            SELECT id, title, description, category, difficulty_level, estimated_hours
-            FROM courses
-            WHERE is_published = TRUE
+        rows = self.db.execute_query(
+            self.MATERIALIZED_QUERY,
+            (user_id, int(self.materialized_max_age), limit),
+            name='materialized_recommendations'
+        )
+        return self._format_materialized(rows)
+
+    async def get_materialized_recommendations_async(self, async_db, user_id: int, limit: int = 5) -> Optional[List[Dict]]:
+        """`get_materialized_recommendations()` through an AsyncDatabaseConnector"""
+        rows = await async_db.execute_query(
+            self.MATERIALIZED_QUERY,
+            (user_id, int(self.materialized_max_age), limit),
+            name='materialized_recommendations'
+        )
+        return self._format_materialized(rows)
+
+    def _format_materialized(self, rows: List[Dict]) -> Optional[List[Dict]]:
+        if not rows:
+            return None
+        courses = self.catalog.get().courses_by_id
+        recommendations = []
+        for row in rows:
+            course = courses.get(row['recommended_course_id'])
+            if course is None:
+                continue  # unpublished since it was materialized
+            recommendations.append({
+                'course_id': course['id'],
+                'title': course['title'],
+                'description': course['description'],
+                'category': course['category'],
+                'difficulty_level': course['difficulty_level'],
+                'confidence': float(row['confidence_score']),
+                'reason': row['recommendation_reason']
+            })
+        return recommendations or None
+
+    def get_batch_recommendations(self, user_ids: List[int], limit: int = 5) -> Dict:
         """
-        return self.db.execute_query(query)
-    
-    def _analyze_user_interests(self, user_id: int) -> Dict:
-        """Analyze user interests based on performance"""
-        performance = self._get_user_performance(user_id)
+        Generate recommendations for many users at once
         
-        if not performance:
-            return {'categories': [], 'avg_score': 0}
+        User data is loaded with chunked set-based queries and every user is
+        scored against the same catalog snapshot.
         
-        # Count categories
-        category_counts = {}
-        total_score = 0
-        score_count = 0
-        
-        for record in performance:
-            category = record.get('category', 'General')
-            category_counts[category] = category_counts.get(category, 0) + 1
+        Args:
+            user_ids: User IDs to generate recommendations for
+            limit: Maximum number of recommendations per user
             
-            if record.get('score'):
-                total_score += float(record['score'])
-                score_count += 1
-        
-        # Get top categories
-        sorted_categories = sorted(
-            category_counts.items(), 
-            key=lambda x: x[1], 
-            reverse=True
+        Returns:
+            Dict with recommendations keyed by user ID and throughput stats
+        """
+        started = time.perf_counter()
+        snapshots = load_snapshots(self.db, user_ids, profiles=self.interest_profiles)
+        users = list(snapshots.keys())
+        interests = [snapshots[u].interests for u in users]
+        engine = self._get_scoring_engine()
+        top = engine.top_k_batch(
+            interests,
+            [snapshots[u].enrolled_course_ids for u in users],
+            limit,
+            self.confidence_threshold
         )
-        
-        avg_score = total_score / score_count if score_count > 0 else 0
-        
+        results = {
+            user_id: [self._format_recommendation(course, score, user_interests) for course, score in ranked]
+            for user_id, user_interests, ranked in zip(users, interests, top)
+        }
+        elapsed = time.perf_counter() - started
+        users_per_second = round(len(results) / elapsed, 1) if elapsed > 0 else None
+        logger.info(f"Batch recommendations for {len(results)} users in {elapsed * 1000:.1f}ms ({users_per_second} users/s)")
         return {
-            'categories': [cat for cat, _ in sorted_categories[:3]],
-            'avg_score': avg_score
+            'recommendations': results,
+            'stats': {
+                'users': len(results),
+                'elapsed_ms': round(elapsed * 1000, 2),
+                'users_per_second': users_per_second
+            }
         }
     
-    def _calculate_recommendation_score(
-        self, 
-        course: Dict, 
-        user_performance: List[Dict],
-        user_interests: Dict
-    ) -> float:
+    def _get_scoring_engine(self) -> ScoringEngine:
+        """Return the scoring engine for the current catalog snapshot"""
+        catalog = self.catalog.get()
+        if self._scoring_catalog is not catalog:
+            self._load_cf_model()
+            self._scoring_engine = ScoringEngine(
+                catalog.courses,
+                catalog.popularity,
+                cf_model=self.cf_model,
+                cf_weight=self.cf_weight
+            )
+            self._scoring_catalog = catalog
+        return self._scoring_engine
+    
+    def content_version(self) -> str:
         """
-        Calculate recommendation score for a course
-        
-        This is a simplified scoring algorithm. In production, use ML models.
+        Version of the shared inputs behind every response
+
+        Covers the catalog snapshot (including the popularity counts, which
+        its fingerprint does not track) and the collaborative filtering model
+        in use, so it changes whenever the same user data would score differently.
         """
-        score = 0.5  # Base score
-        
-        # Category match bonus
-        if course['category'] in user_interests.get('categories', []):
-            score += 0.3
-        
-        # Difficulty level matching
-        avg_score = user_interests.get('avg_score', 0)
-        if avg_score >= 80 and course['difficulty_level'] in ['intermediate', 'advanced']:
-            score += 0.15
-        elif avg_score >= 60 and course['difficulty_level'] == 'intermediate':
-            score += 0.2
-        elif avg_score < 60 and course['difficulty_level'] == 'beginner':
-            score += 0.2
-        
-        # Popularity bonus (simulated)
-        score += random.uniform(0, 0.15)
-        
-        return min(score, 1.0)  # Cap at 1.0
+        self._get_scoring_engine()  # keeps the CF model in step with the catalog
+        catalog = self._scoring_catalog
+        cached = self._content_version
+        if cached is not None and cached[0] is catalog:
+            return cached[1]
+        digest = hashlib.sha1()
+        digest.update(f"{catalog.version}|{self._cf_model_mtime}|".encode('utf-8'))
+        digest.update(repr(sorted(catalog.popularity.items())).encode('utf-8'))
+        version = digest.hexdigest()[:12]
+        self._content_version = (catalog, version)
+        return version
+
+    def _load_cf_model(self):
+        """(Re)load the collaborative filtering model if it was rebuilt"""
+        try:
+            mtime = os.path.getmtime(os.path.join(self.cf_model_path, 'indptr.npy'))
+        except OSError:
+            self.cf_model = None
+            return
+        if mtime != self._cf_model_mtime:
+            self.cf_model = ItemSimilarityModel.load(self.cf_model_path)
+            self._cf_model_mtime = mtime
+    
+    def _format_recommendation(self, course: Dict, score: float, user_interests: Dict) -> Dict:
+        """Build the API representation of a scored course"""
+        return {
+            'course_id': course['id'],
+            'title': course['title'],
+            'description': course['description'],
+            'category': course['category'],
+            'difficulty_level': course['difficulty_level'],
+            'confidence': round(score, 2),
+            'reason': self._generate_recommendation_reason(course, user_interests)
+        }
     
     def _generate_recommendation_reason(self, course: Dict, user_interests: Dict) -> str:
         """Generate human-readable recommendation reason"""
@@ -185,28 +253,29 @@ class RecommendationService:
         
         return "This course " + " and ".join(reasons) + "."
     
-    def analyze_student_performance(self, user_id: int) -> Dict:
+    def analyze_student_performance(self, user_id: int, snapshot: Optional[UserSnapshot] = None) -> Dict:
         """Analyze student performance and provide insights"""
         try:
-            performance = self._get_user_performance(user_id)
+            snapshot = snapshot or self.snapshot(user_id)
+            progress = self.progress_cache.get(user_id)
             
-            if not performance:
+            if not progress['total_modules']:
                 return {
                     'message': 'No performance data available',
                     'stats': {}
                 }
             
-            # Calculate statistics
-            scores = [float(p['score']) for p in performance if p.get('score')]
-            completed = len([p for p in performance if p['completion_status'] == 'completed'])
+            # Statistics come from the shared per-user aggregate cache
+            total = progress['total_modules']
+            completed = progress['completed']
             
             stats = {
-                'total_modules': len(performance),
+                'total_modules': total,
                 'completed_modules': completed,
-                'completion_rate': round(completed / len(performance) * 100, 2),
-                'average_score': round(sum(scores) / len(scores), 2) if scores else 0,
-                'highest_score': max(scores) if scores else 0,
-                'lowest_score': min(scores) if scores else 0
+                'completion_rate': round(completed / total * 100, 2),
+                'average_score': round(progress['scored_average'], 2),
+                'highest_score': progress['highest_score'],
+                'lowest_score': progress['lowest_score']
             }
             
             # Generate insights
@@ -222,7 +291,7 @@ class RecommendationService:
                 insights.append("Try to complete more modules to improve your learning pace.")
             
             # Compute interests for strong categories
-            user_interests = self._analyze_user_interests(user_id)
+            user_interests = snapshot.interests
             return {
                 'stats': stats,
                 'insights': insights,
@@ -233,71 +302,48 @@ class RecommendationService:
             logger.error(f"Performance analysis error: {e}")
             return {'error': str(e)}
 
-    def generate_learning_path(self, user_id: int) -> Dict:
+    def generate_learning_path(self, user_id: int, snapshot: Optional[UserSnapshot] = None) -> Dict:
         """Generate a simple dynamic learning path for the user."""
         try:
+            snapshot = snapshot or self.snapshot(user_id)
+
             # Try to compute interests and performance; fall back gracefully if paramized queries fail
             try:
-                interests = self._analyze_user_interests(user_id) or {}
+                interests = snapshot.interests or {}
             except Exception as e:
                 logger.error(f"Interests analysis error (fallback to empty): {e}")
                 interests = {}
 
             try:
-                performance = self._get_user_performance(user_id)
+                completed_module_ids = snapshot.completed_module_ids
             except Exception as e:
                 logger.error(f"Performance fetch error (fallback to empty): {e}")
-                performance = []
+                completed_module_ids = set()
 
-            completed_module_ids = {int(p['module_id']) for p in performance if p.get('completion_status') == 'completed'}
-
-            # Pick modules from top-interest categories the user hasn't completed
+            # Walk the in-memory module graph for the user's interest categories,
+            # stopping once the path is long enough
             categories = interests.get('categories', []) or ['General']
-            modules = []
-            if categories:
-                # Build a safe, quoted IN list to avoid driver param errors on some environments
-                safe_cats = []
-                for cat in categories:
-                    if cat is None:
-                        continue
-                    # Basic sanitization: keep as string and escape single quotes
-                    cat_str = str(cat).replace("'", "''")
-                    safe_cats.append(f"'{cat_str}'")
-                in_list = ','.join(safe_cats) if safe_cats else "'General'"
-                query = f"""
-                    SELECT m.id, m.title, m.module_order, m.duration_minutes, c.title as course_title, c.category
-                    FROM modules m
-                    JOIN courses c ON m.course_id = c.id
-                    WHERE c.is_published = TRUE AND c.category IN ({in_list})
-                    ORDER BY c.category, m.module_order ASC
-                """
-                modules = self.db.execute_query(query)
-            # Fallback: if modules are still empty, pull the first few published modules regardless of category
+            graph = self.catalog.get().graph
+            modules = graph.walk(
+                sorted({str(c) for c in categories if c is not None}),
+                completed_module_ids,
+                self.LEARNING_PATH_LENGTH
+            )
+            # Fallback: if nothing matched, take the first published modules regardless of category
             if not modules:
-                query_fb = """
-                    SELECT m.id, m.title, m.module_order, m.duration_minutes, c.title as course_title, c.category
-                    FROM modules m
-                    JOIN courses c ON m.course_id = c.id
-                    WHERE c.is_published = TRUE
-                    ORDER BY c.category, m.module_order ASC
-                    LIMIT 6
-                """
-                modules = self.db.execute_query(query_fb)
+                modules = [m for m in graph.first(self.LEARNING_PATH_LENGTH) if m['id'] not in completed_module_ids]
 
-            plan = []
-            for mod in modules:
-                if int(mod['id']) in completed_module_ids:
-                    continue
-                plan.append({
+            plan = [
+                {
                     'module_id': mod['id'],
                     'title': mod['title'],
                     'course': mod['course_title'],
                     'category': mod['category'],
                     'recommended_duration_min': mod.get('duration_minutes') or 45,
                     'milestone': f"Complete '{mod['title']}' in {mod.get('duration_minutes') or 45} minutes"
-                })
-                if len(plan) >= 6:
-                    break
+                }
+                for mod in modules
+            ]
 
             # Simple schedule suggestion: next 7 days
             schedule = []
@@ -321,10 +367,11 @@ class RecommendationService:
             logger.error(f"Learning path generation error: {e}")
             return {'plan': [], 'schedule': [], 'error': str(e)}
 
-    def get_full_recommendations(self, user_id: int) -> Dict:
+    def get_full_recommendations(self, user_id: int, snapshot: Optional[UserSnapshot] = None) -> Dict:
         """Return extended recommendations (lessons, readings, exercises, schedules, feedback)."""
         try:
-            base = self.get_personalized_recommendations(user_id)
+            snapshot = snapshot or self.snapshot(user_id)
+            base = self.get_personalized_recommendations(user_id, snapshot=snapshot)
             lessons = [
                 {
                     'title': f"Lesson: {r['title']}",
@@ -352,7 +399,7 @@ class RecommendationService:
                 'days_per_week': 5,
                 'note': 'Auto-adjusts based on progress.'
             }
-            perf = self.analyze_student_performance(user_id)
+            perf = self.analyze_student_performance(user_id, snapshot=snapshot)
             feedback = perf.get('insights', [
                 'Keep practicing regularly.',
                 'Review topics with lower scores.'
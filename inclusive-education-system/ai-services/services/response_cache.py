@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag
+
+    Args:
+        if_none_match: Raw header value (may list several tags, or be `*`)
+        etag: Quoted ETag of the current representation
+
+    Returns:
+        True when the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Version-keyed ETags and a per-worker cache of rendered responses
+
+    A user's dashboard responses depend only on their own performance,
+    enrollments and materialized recommendations plus the shared catalog and
+    model, so one small indexed query yields a version for them. The ETag is
+    a hash of that version and the route: a client that already has it gets
+    a 304, and a worker that already rendered it replays the cached body
+    without running the service. The performance part of the version is
+    the (row count, last id) pair ProgressAggregateCache keys its aggregates
+    by, and views read their data only after the ETag is computed, so a
+    cached body is never older than the version it is stored under. At most
+    `max_entries` bodies are kept (least recently used are evicted first);
+    an entry is simply replaced when the version moves on.
+    """
+
+    VERSION_QUERY = """
+        SELECT p.performance_count, p.last_performance_id,
+               e.enrollment_count, e.enrollments_updated, e.enrollment_progress,
+               e.completed_count, e.dropped_count, r.recommendations_updated
+        FROM
+            (SELECT COUNT(*) as performance_count, MAX(id) as last_performance_id
+             FROM performance WHERE user_id = %s) p,
+            (SELECT COUNT(*) as enrollment_count, MAX(enrolled_at) as enrollments_updated,
+                    SUM(progress_percentage) as enrollment_progress,
+                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed_count,
+                    SUM(CASE WHEN status = 'dropped' THEN 1 ELSE 0 END) as dropped_count
+             FROM course_enrollments WHERE user_id = %s) e,
+            (SELECT MAX(created_at) as recommendations_updated
+             FROM ai_recommendations
+             WHERE user_id = %s AND is_active = TRUE AND created_at >= NOW() - INTERVAL %s SECOND) r
+    """
+
+    VERSION_COLUMNS = (
+        'performance_count', 'last_performance_id', 'enrollment_count', 'enrollments_updated',
+        'enrollment_progress', 'completed_count', 'dropped_count', 'recommendations_updated'
+    )
+
+    # Per-user data: shared caches must not keep it, and clients revalidate every time
+    CACHE_CONTROL = 'private, no-cache'
+
+    def __init__(self, db_connector, recommendation_service, max_entries: Optional[int] = None):
+        self.db = db_connector
+        self.recommendation_service = recommendation_service
+        self.max_entries = (
+            max_entries if max_entries is not None
+            else int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 2000))
+        )
+        self.model_version = os.getenv('MODEL_VERSION', '1.0.0')
+        self._entries: "OrderedDict[Tuple[str, int], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def _version_params(self, user_id: int) -> tuple:
+        # Materialized sets older than the serving bound no longer count
+        return (user_id, user_id, user_id, int(self.recommendation_service.materialized_max_age))
+
+    def _etag(self, route: str, user_id: int, rows) -> str:
+        row = rows[0] if rows else {}
+        parts = [route, str(user_id), self.model_version, self.recommendation_service.content_version()]
+        parts.extend(str(row.get(column)) for column in self.VERSION_COLUMNS)
+        return '"' + hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:24] + '"'
+
+    def etag(self, route: str, user_id: int) -> str:
+        """
+        Compute the current ETag of a user's response
+
+        Args:
+            route: Route name the response belongs to
+            user_id: User the response is for
+
+        Returns:
+            Quoted ETag
+        """
+        rows = self.db.execute_query(self.VERSION_QUERY, self._version_params(user_id), name='response_version')
+        return self._etag(route, user_id, rows)
+
+    async def etag_async(self, async_db, route: str, user_id: int) -> str:
+        """`etag()` through an AsyncDatabaseConnector"""
+        rows = await async_db.execute_query(self.VERSION_QUERY, self._version_params(user_id), name='response_version')
+        return self._etag(route, user_id, rows)
+
+    def not_modified_for(self, if_none_match: Optional[str], etag: str) -> bool:
+        """Return True (and count it) when the client already has this version"""
+        if not etag_matches(if_none_match, etag):
+            return False
+        with self._lock:
+            self.not_modified += 1
+        return True
+
+    def get(self, route: str, user_id: int, etag: str) -> Optional[bytes]:
+        """Return the cached body rendered for this ETag, if any"""
+        key = (route, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == etag:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, route: str, user_id: int, etag: str, body: bytes):
+        """Cache a rendered 200 response body under its ETag"""
+        if self.max_entries <= 0:
+            return
+        key = (route, user_id)
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
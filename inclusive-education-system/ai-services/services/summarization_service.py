@@ -0,0 +1,162 @@
+import heapq
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import quote_plus
+
+logger = logging.getLogger(__name__)
+
+# Sentence = run of text up to terminal punctuation followed by whitespace
+# (or end of text); punctuation inside URLs and numbers does not split
+_SENTENCE_RE = re.compile(r"(?:[^.!?]|[.!?]+(?=\S))+(?:[.!?]+|$)")
+_WORD_RE = re.compile(r"[a-z][a-z0-9'-]*")
+_URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+_EXAMPLE_RE = re.compile(r"\b(?:for example|for instance|such as|consider|imagine|suppose)", re.IGNORECASE)
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either else etc even ever
+every few for from further had has have having he her here hers herself him himself his how however
+i if in into is it its itself just let like many may me might more most much must my myself no nor
+not now of off often on once one only or other others our ours ourselves out over own per rather
+same she should since so some still such than that the their theirs them themselves then there
+these they this those though through thus to too two under until up upon us use used uses using
+very via was we well were what when where whether which while who whom whose why will with within
+without would yet you your yours yourself yourselves
+""".split())
+
+
+class SummarizationService:
+    """
+    Extractive TF-IDF summarizer
+
+    The text is scanned once into sentence spans, and each sentence is
+    tokenized once into a sparse term-count vector. Terms are weighted by
+    inverse sentence frequency, sentences are scored by their similarity to
+    the document's TF-IDF centroid, and the top-k sentences are returned in
+    document order. Every step is linear in the number of tokens (plus
+    O(n log k) for selection), and input beyond `max_chars` is ignored so
+    very large documents stay within a fixed latency budget.
+    """
+
+    VERSION = 'tfidf-1'
+    KEYWORD_LINK = 'https://www.khanacademy.org/search?page_search_query={query}'
+
+    def __init__(
+        self,
+        max_chars: Optional[int] = None,
+        summary_sentences: Optional[int] = None,
+        max_keywords: Optional[int] = None,
+        max_examples: Optional[int] = None
+    ):
+        self.max_chars = max_chars or int(os.getenv('SUMMARY_MAX_CHARS', 2_000_000))
+        self.summary_sentences = summary_sentences or int(os.getenv('SUMMARY_SENTENCES', 5))
+        self.max_keywords = max_keywords or int(os.getenv('SUMMARY_KEYWORDS', 8))
+        self.max_examples = max_examples or int(os.getenv('SUMMARY_EXAMPLES', 3))
+
+    @property
+    def cache_version(self) -> str:
+        """Identifies the algorithm and every setting that changes its output"""
+        return (f'{self.VERSION}:{self.max_chars}:{self.summary_sentences}:'
+                f'{self.max_keywords}:{self.max_examples}')
+
+    @staticmethod
+    def _split(text: str) -> List[str]:
+        """Sentence strings with whitespace collapsed, skipping fragments"""
+        sentences = []
+        for match in _SENTENCE_RE.finditer(text):
+            sentence = ' '.join(match.group().split())
+            if sentence.count(' ') >= 2:
+                sentences.append(sentence)
+        return sentences
+
+    def summarize(self, text: str) -> Dict:
+        """
+        Build a summary, keywords, examples and references for a document
+
+        Args:
+            text: Raw document text
+
+        Returns:
+            Dictionary with summary, keywords, examples and references
+        """
+        if len(text) > self.max_chars:
+            logger.info(f"Summarizing the first {self.max_chars} of {len(text)} characters")
+            text = text[:self.max_chars]
+
+        sentences = self._split(text)
+        if not sentences:
+            return {'summary': '', 'keywords': [], 'examples': [], 'references': []}
+
+        # One tokenization pass: sparse term counts per sentence + sentence frequency
+        vectors: List[Counter] = []
+        sentence_freq: Counter = Counter()
+        term_freq: Counter = Counter()
+        for sentence in sentences:
+            counts = Counter(w for w in _WORD_RE.findall(sentence.lower())
+                             if w not in STOPWORDS and len(w) > 2)
+            vectors.append(counts)
+            sentence_freq.update(counts.keys())
+            term_freq.update(counts)
+
+        n = len(sentences)
+        idf = {term: math.log((1 + n) / (1 + df)) + 1.0 for term, df in sentence_freq.items()}
+        # Document centroid in TF-IDF space
+        centroid = {term: tf * idf[term] for term, tf in term_freq.items()}
+
+        scores = []
+        for counts in vectors:
+            if not counts:
+                scores.append(0.0)
+                continue
+            dot = 0.0
+            norm = 0.0
+            for term, tf in counts.items():
+                weight = tf * idf[term]
+                dot += weight * centroid[term]
+                norm += weight * weight
+            scores.append(dot / math.sqrt(norm))
+
+        k = min(self.summary_sentences, n)
+        chosen = sorted(heapq.nlargest(k, range(n), key=scores.__getitem__))
+        summary = ' '.join(self._terminate(sentences[i]) for i in chosen)
+
+        keywords = [term for term, _ in heapq.nlargest(
+            self.max_keywords, centroid.items(), key=lambda item: (item[1], item[0])
+        )]
+
+        return {
+            'summary': summary,
+            'keywords': keywords,
+            'examples': self._examples(sentences, scores, set(chosen)),
+            'references': self._references(text, keywords),
+        }
+
+    @staticmethod
+    def _terminate(sentence: str) -> str:
+        return sentence if sentence[-1] in '.!?' else sentence + '.'
+
+    def _examples(self, sentences: List[str], scores: List[float], exclude: set) -> List[str]:
+        """Best-scoring sentences that introduce an example, outside the summary"""
+        candidates = [i for i, sentence in enumerate(sentences)
+                      if i not in exclude and _EXAMPLE_RE.search(sentence)]
+        best = heapq.nlargest(self.max_examples, candidates, key=scores.__getitem__)
+        return [self._terminate(sentences[i]) for i in sorted(best)]
+
+    def _references(self, text: str, keywords: List[str]) -> List[str]:
+        """Links cited in the text, then study links for the top keywords"""
+        references = []
+        seen = set()
+        for match in _URL_RE.finditer(text):
+            url = match.group().rstrip('.,;:')
+            if url not in seen:
+                seen.add(url)
+                references.append(url)
+                if len(references) >= 5:
+                    return references
+        for keyword in keywords[:max(0, 3 - len(references))]:
+            references.append(f"{self.KEYWORD_LINK.format(query=quote_plus(keyword))} (Khan Academy: {keyword})")
+        return references
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """
+    Content-addressed cache of summarization results
+
+    Entries are keyed by the SHA-256 of the uploaded bytes (or text) plus a
+    version string covering the summarizer and extraction settings, so a
+    change to either never serves stale output. Lookups go to a per-process
+    LRU first and then to an on-disk tier that every gunicorn worker shares.
+    Both tiers are bounded by size: the memory tier by serialized bytes, the
+    disk tier by total file size, evicting least recently used entries.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_bytes: Optional[int] = None,
+        disk_bytes: Optional[int] = None
+    ):
+        self.directory = directory or os.getenv(
+            'SUMMARY_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai-summary-cache')
+        )
+        self.memory_bytes = memory_bytes if memory_bytes is not None else int(os.getenv('SUMMARY_CACHE_MEMORY_BYTES', 32 * 1024 * 1024))
+        self.disk_bytes = disk_bytes if disk_bytes is not None else int(os.getenv('SUMMARY_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (result, size)
+        self._memory_size = 0
+        self._disk_size = None  # estimated; recalculated by a directory scan when over budget
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+        }
+        if self.disk_bytes > 0:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(digest: str, version: str) -> str:
+        """Combine a content digest with the version of whatever produced the result"""
+        return hashlib.sha256(f'{digest}:{version}'.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def digest_text(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8', errors='ignore')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def _remember(self, key: str, result: Dict, size: int):
+        """Insert into the memory tier; caller holds the lock"""
+        if size > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= previous[1]
+        self._memory[key] = (result, size)
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_size -= evicted_size
+            self._stats['memory_evictions'] += 1
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached result, or None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return entry[0]
+
+        if self.disk_bytes > 0:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    payload = f.read()
+                result = json.loads(payload)
+                # Touch so disk eviction sees the entry as recently used
+                os.utime(path, None)
+            except (OSError, ValueError):
+                result = None
+            if result is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._remember(key, result, len(payload))
+                return result
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, key: str, result: Dict):
+        """Store a result in both tiers"""
+        payload = json.dumps(result, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._remember(key, result, len(payload))
+            self._stats['writes'] += 1
+
+        if self.disk_bytes <= 0 or len(payload) > self.disk_bytes:
+            return
+        try:
+            # Recreated if something (e.g. a tmp cleaner) removed it
+            os.makedirs(self.directory, exist_ok=True)
+            # Atomic publish: other workers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.error(f"Summary cache write failed: {e}")
+            return
+
+        with self._lock:
+            if self._disk_size is not None:
+                self._disk_size += len(payload)
+            over_budget = self._disk_size is None or self._disk_size > self.disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier fits its budget"""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError as e:
+            logger.error(f"Summary cache scan failed: {e}")
+            return
+
+        evicted = 0
+        if total > self.disk_bytes:
+            # Trim to 90% so eviction does not run on every write
+            target = int(self.disk_bytes * 0.9)
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass  # removed by another worker
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+
+        with self._lock:
+            self._disk_size = total
+            self._stats['disk_evictions'] += evicted
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_size
+            stats['disk_bytes'] = self._disk_size
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
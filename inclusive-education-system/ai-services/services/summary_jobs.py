@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from services.pdf_extractor import PdfExtractionError
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """
+    File-backed store of summarization job state with expiry
+
+    Each job is one small JSON file, replaced atomically on every update, so
+    any gunicorn worker can answer a status request for a job that another
+    worker is running. Jobs older than `ttl` seconds are swept on creation.
+    """
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = None):
+        self.directory = directory or os.getenv(
+            'SUMMARY_JOBS_DIR', os.path.join(tempfile.gettempdir(), 'ai-summary-jobs')
+        )
+        self.ttl = ttl if ttl is not None else float(os.getenv('SUMMARY_JOB_TTL_SECONDS', 3600))
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def _write(self, job: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(job, f, separators=(',', ':'))
+            os.replace(tmp_path, self._path(job['job_id']))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def create(self, **fields) -> Dict:
+        """Create a new job record and return it"""
+        self._maybe_sweep()
+        now = time.time()
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'status': 'queued',
+            'pages_done': 0,
+            'pages_total': None,
+            'created_at': now,
+            'updated_at': now,
+            'result': None,
+            'error': None,
+        }
+        job.update(fields)
+        self._write(job)
+        return job
+
+    def update(self, job: Dict, **fields) -> Dict:
+        """Apply changes to a job owned by this process and persist it"""
+        job.update(fields)
+        job['updated_at'] = time.time()
+        try:
+            self._write(job)
+        except OSError as e:
+            logger.error(f"Could not persist summary job {job['job_id']}: {e}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Load a job by id, or None if it is unknown or expired"""
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(job_id), encoding='utf-8') as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        if now - job['created_at'] > self.ttl:
+            return None
+        # The owning worker died (or hung) without finishing the job
+        if job['status'] in ('queued', 'running') and job.get('deadline') and now > job['deadline']:
+            job['status'] = 'failed'
+            job['error'] = 'Job did not finish in time'
+        return job
+
+    def _maybe_sweep(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < self.SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    try:
+                        if now - entry.stat().st_mtime > self.ttl:
+                            os.unlink(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.error(f"Summary job sweep failed: {e}")
+
+
+class SummaryJobRunner:
+    """
+    Runs summarization jobs on a local thread pool
+
+    Jobs use their own PDF extractor (and so their own process pool, page
+    cap and deadline), so long documents never queue in front of the
+    synchronous /summarize path. Progress is reported per extracted chunk.
+    """
+
+    def __init__(self, pdf_extractor, summarization_service, summary_cache,
+                 store: Optional[JobStore] = None, max_workers: Optional[int] = None):
+        self.pdf_extractor = pdf_extractor
+        self.summarization_service = summarization_service
+        self.summary_cache = summary_cache
+        self.store = store or JobStore()
+        self.max_workers = max_workers or int(os.getenv('SUMMARY_JOB_WORKERS', 2))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='summary-job')
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    def submit(self, key: Optional[str], text: Optional[str] = None,
+               pdf_path: Optional[str] = None, owner=None) -> Dict:
+        """
+        Start a job for either text or a spooled PDF (the runner takes ownership of the file)
+
+        Returns:
+            The job record; already completed when the result was cached
+        """
+        if key is not None:
+            cached = self.summary_cache.get(key)
+            if cached is not None:
+                self._discard(pdf_path)
+                return self.store.create(status='completed', result=cached, owner=owner, cached=True)
+
+        with self._lock:
+            self._queued += 1
+            ahead = self._queued // self.max_workers
+        # Queue wait is bounded too: a job still queued after this is reported as failed
+        deadline = time.time() + self.pdf_extractor.timeout * (ahead + 1) + 60
+        try:
+            job = self.store.create(owner=owner, deadline=deadline)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._discard(pdf_path)
+            raise
+        snapshot = dict(job)
+        self._executor.submit(self._run, job, key, text, pdf_path)
+        return snapshot
+
+    def _run(self, job: Dict, key: Optional[str], text: Optional[str], pdf_path: Optional[str]):
+        with self._lock:
+            self._queued -= 1
+        try:
+            self.store.update(job, status='running',
+                              deadline=time.time() + self.pdf_extractor.timeout + 60)
+            if pdf_path is not None:
+                text = self.pdf_extractor.extract(
+                    pdf_path,
+                    progress=lambda done, total: self.store.update(job, pages_done=done, pages_total=total)
+                )
+            if not text:
+                raise PdfExtractionError('No text could be extracted')
+            result = self.summarization_service.summarize(text)
+            if key is not None:
+                self.summary_cache.put(key, result)
+            self.store.update(job, status='completed', result=result)
+        except PdfExtractionError as e:
+            logger.error(f"Summary job {job['job_id']} failed: {e}")
+            self.store.update(job, status='failed', error=str(e))
+        except Exception as e:
+            logger.error(f"Summary job {job['job_id']} error: {e}")
+            self.store.update(job, status='failed', error='Failed to summarize')
+        finally:
+            self._discard(pdf_path)
+
+    @staticmethod
+    def _discard(path: Optional[str]):
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.pdf_extractor.shutdown()
@@ -0,0 +1,331 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_interests(performance: List[Dict]) -> Dict:
+    """
+    Derive top categories and average score from performance rows
+
+    Rows are expected newest first, so categories with equal counts are
+    ranked by most recent activity.
+    """
+    return _interests_from_pairs((record.get('category', 'General'), record.get('score')) for record in performance)
+
+
+def _interests_from_pairs(pairs: Iterable[Tuple]) -> Dict:
+    """`analyze_interests` over (category, score) pairs, consumed in one pass"""
+    category_counts = {}
+    total_score = 0
+    score_count = 0
+
+    for category, score in pairs:
+        category_counts[category] = category_counts.get(category, 0) + 1
+
+        if score:
+            total_score += float(score)
+            score_count += 1
+
+    if not category_counts:
+        return {'categories': [], 'avg_score': 0}
+
+    sorted_categories = sorted(
+        category_counts.items(),
+        key=lambda x: x[1],
+        reverse=True
+    )
+
+    avg_score = total_score / score_count if score_count > 0 else 0
+
+    return {
+        'categories': [cat for cat, _ in sorted_categories[:3]],
+        'avg_score': avg_score
+    }
+
+
+def interests_from_category_stats(stats: List[Dict]) -> Dict:
+    """
+    Derive interests from per-category aggregates of a user's performance
+
+    Produces the same result as `analyze_interests` over the raw rows: each
+    stat carries the category's activity count, the sum and count of
+    non-zero scores, and the most recent activity used to break ties.
+    """
+    if not stats:
+        return {'categories': [], 'avg_score': 0}
+
+    ordered = sorted(
+        stats,
+        key=lambda s: (s['activity_count'], str(s['last_activity'] or '')),
+        reverse=True
+    )
+    total_score = sum(float(s['score_sum'] or 0) for s in stats)
+    score_count = sum(int(s['score_count'] or 0) for s in stats)
+
+    return {
+        'categories': [s['category'] for s in ordered[:3]],
+        'avg_score': total_score / score_count if score_count > 0 else 0
+    }
+
+
+class UserSnapshot:
+    """
+    Request-scoped, memoized view of one user's learning data
+
+    Each dataset is loaded from the database at most once, the first time it
+    is accessed, so every service method handling the same request can share
+    the snapshot without issuing duplicate queries. Data that was already
+    fetched elsewhere (e.g. by a batch loader) can be passed in directly.
+    With `profiles` (an InterestProfiles), interests are read from the
+    persisted, time-decayed aggregates instead of the performance history.
+    """
+
+    # Explicit columns (no `notes` TEXT) so idx_user_timestamp covers the performance side
+    PERFORMANCE_QUERY = """
+        SELECT p.id, p.user_id, p.module_id, p.score, p.completion_status, p.time_spent_minutes, p.timestamp,
+               m.course_id, c.category
+        FROM performance p
+        JOIN modules m ON p.module_id = m.id
+        JOIN courses c ON m.course_id = c.id
+        WHERE p.user_id = %s
+        ORDER BY p.timestamp DESC
+    """
+
+    ENROLLMENTS_QUERY = """
+        SELECT course_id, progress_percentage, status
+        FROM course_enrollments
+        WHERE user_id = %s
+    """
+
+    # Just the columns interests and completed modules need, streamed in one pass
+    PERFORMANCE_SUMMARY_QUERY = """
+        SELECT c.category, p.score, p.completion_status, p.module_id
+        FROM performance p
+        JOIN modules m ON p.module_id = m.id
+        JOIN courses c ON m.course_id = c.id
+        WHERE p.user_id = %s
+        ORDER BY p.timestamp DESC
+    """
+
+    COMPLETED_MODULES_QUERY = """
+        SELECT module_id
+        FROM performance
+        WHERE user_id = %s AND completion_status = 'completed'
+    """
+
+    def __init__(
+        self,
+        db_connector,
+        user_id: int,
+        performance: Optional[List[Dict]] = None,
+        enrollments: Optional[List[Dict]] = None,
+        interests: Optional[Dict] = None,
+        profiles=None,
+        completed_module_ids: Optional[Set[int]] = None
+    ):
+        self.db = db_connector
+        self.user_id = user_id
+        self.profiles = profiles
+        self._performance = performance
+        self._enrollments = enrollments
+        self._interests = interests
+        self._completed_module_ids = completed_module_ids
+
+    @property
+    def performance(self) -> List[Dict]:
+        """User's performance records, newest first"""
+        if self._performance is None:
+            self._performance = list(self.db.execute_query(self.PERFORMANCE_QUERY, (self.user_id,), name='user_performance'))
+        return self._performance
+
+    @property
+    def enrollments(self) -> List[Dict]:
+        """User's course enrollments"""
+        if self._enrollments is None:
+            self._enrollments = list(self.db.execute_query(self.ENROLLMENTS_QUERY, (self.user_id,), name='user_enrollments'))
+        return self._enrollments
+
+    @property
+    def interests(self) -> Dict:
+        """Top categories and average score derived from performance"""
+        if self._interests is None:
+            if self.profiles is not None:
+                self._interests = self.profiles.interests(self.user_id)
+            elif self._performance is not None:
+                self._interests = analyze_interests(self._performance)
+            else:
+                self._stream_performance()
+        return self._interests
+
+    def _stream_performance(self):
+        """
+        Derive interests and completed modules without loading the rows
+
+        Power users can have very long histories; streaming narrow tuples
+        keeps memory flat instead of holding every row as a dict.
+        """
+        completed: Set[int] = set()
+
+        def pairs():
+            for chunk in self.db.iter_query(
+                self.PERFORMANCE_SUMMARY_QUERY, (self.user_id,), name='user_performance_summary',
+                chunk_size=self.db.stream_chunk_rows, as_tuples=True
+            ):
+                for category, score, completion_status, module_id in chunk:
+                    if completion_status == 'completed':
+                        completed.add(int(module_id))
+                    yield category, score
+
+        self._interests = _interests_from_pairs(pairs())
+        if self._completed_module_ids is None:
+            self._completed_module_ids = completed
+
+    @property
+    def enrolled_course_ids(self) -> Set[int]:
+        return {c['course_id'] for c in self.enrollments}
+
+    @property
+    def completed_module_ids(self) -> Set[int]:
+        if self._completed_module_ids is None:
+            if self._performance is not None:
+                self._completed_module_ids = {
+                    int(p['module_id']) for p in self._performance
+                    if p.get('completion_status') == 'completed'
+                }
+            else:
+                # Only the IDs are needed; skip the full performance join
+                rows = self.db.execute_query(self.COMPLETED_MODULES_QUERY, (self.user_id,), name='user_completed_modules')
+                self._completed_module_ids = {int(row['module_id']) for row in rows}
+        return self._completed_module_ids
+
+
+def _chunks(items: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+BATCH_CATEGORY_STATS_QUERY = """
+    SELECT p.user_id, c.category,
+           COUNT(*) as activity_count,
+           SUM(CASE WHEN p.score > 0 THEN p.score ELSE 0 END) as score_sum,
+           SUM(CASE WHEN p.score > 0 THEN 1 ELSE 0 END) as score_count,
+           MAX(p.timestamp) as last_activity
+    FROM performance p
+    JOIN modules m ON p.module_id = m.id
+    JOIN courses c ON m.course_id = c.id
+    WHERE p.user_id IN ({placeholders})
+    GROUP BY p.user_id, c.category
+"""
+
+BATCH_ENROLLMENTS_QUERY = """
+    SELECT user_id, course_id, progress_percentage, status
+    FROM course_enrollments
+    WHERE user_id IN ({placeholders})
+"""
+
+
+def load_snapshots(
+    db_connector,
+    user_ids: List[int],
+    chunk_size: int = 500,
+    profiles=None
+) -> Dict[int, UserSnapshot]:
+    """
+    Build snapshots for many users with set-based queries
+
+    Interests and enrollments are fetched with two `IN (...)` queries per
+    chunk of users instead of several queries per user. Raw performance rows
+    are not preloaded; they are still fetched lazily if a caller needs them.
+    With `profiles`, interests come from the persisted interest profiles.
+    """
+    unique_ids = list(dict.fromkeys(int(u) for u in user_ids))
+    category_stats: Dict[int, List[Dict]] = {u: [] for u in unique_ids}
+    enrollments: Dict[int, List[Dict]] = {u: [] for u in unique_ids}
+    interests = profiles.interests_many(unique_ids, chunk_size) if profiles is not None else None
+
+    for chunk in _chunks(unique_ids, chunk_size):
+        placeholders = ','.join(['%s'] * len(chunk))
+        params = tuple(chunk)
+
+        if interests is None:
+            for row in db_connector.execute_query(
+                BATCH_CATEGORY_STATS_QUERY.format(placeholders=placeholders), params, name='batch_category_stats'
+            ):
+                category_stats[row['user_id']].append(row)
+
+        for row in db_connector.execute_query(
+            BATCH_ENROLLMENTS_QUERY.format(placeholders=placeholders), params, name='batch_enrollments'
+        ):
+            enrollments[row['user_id']].append(row)
+
+    return {
+        user_id: UserSnapshot(
+            db_connector,
+            user_id,
+            enrollments=enrollments[user_id],
+            interests=(
+                interests[user_id] if interests is not None
+                else interests_from_category_stats(category_stats[user_id])
+            ),
+            profiles=profiles
+        )
+        for user_id in unique_ids
+    }
+
+
+async def load_snapshot_async(
+    async_db,
+    db_connector,
+    user_id: int,
+    performance: bool = True,
+    enrollments: bool = True,
+    profiles=None
+) -> UserSnapshot:
+    """
+    Build a snapshot whose datasets are fetched concurrently
+
+    Used by the async serving mode: the requested datasets are queried at
+    the same time through an `AsyncDatabaseConnector`, each on its own
+    connection. Anything not prefetched still loads lazily through
+    `db_connector`.
+
+    Args:
+        async_db: AsyncDatabaseConnector to prefetch with
+        db_connector: Synchronous connector for lazy loads
+        user_id: User ID
+        performance: Prefetch performance rows (interests, completed modules)
+        enrollments: Prefetch enrollments
+        profiles: InterestProfiles; prefetch interests from the profiles and
+            completed module IDs instead of the performance rows
+
+    Returns:
+        UserSnapshot with the requested datasets loaded
+    """
+    queries = {}
+    if performance and profiles is not None:
+        queries['interests'] = profiles.interests_async(async_db, user_id)
+        queries['completed'] = async_db.execute_query(
+            UserSnapshot.COMPLETED_MODULES_QUERY, (user_id,), name='user_completed_modules'
+        )
+    elif performance:
+        queries['performance'] = async_db.execute_query(
+            UserSnapshot.PERFORMANCE_QUERY, (user_id,), name='user_performance'
+        )
+    if enrollments:
+        queries['enrollments'] = async_db.execute_query(
+            UserSnapshot.ENROLLMENTS_QUERY, (user_id,), name='user_enrollments'
+        )
+    results = dict(zip(queries, await asyncio.gather(*queries.values())))
+    return UserSnapshot(
+        db_connector,
+        user_id,
+        performance=list(results['performance']) if 'performance' in results else None,
+        enrollments=list(results['enrollments']) if enrollments else None,
+        interests=results.get('interests'),
+        profiles=profiles,
+        completed_module_ids=(
+            {int(row['module_id']) for row in results['completed']} if 'completed' in results else None
+        )
+    )
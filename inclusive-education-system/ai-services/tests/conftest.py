@@ -0,0 +1,67 @@
+"""
+Shared fixtures: a small SQLite stand-in database and the Flask app wired to it
+
+The app's services are module-level singletons, so it is imported once per
+test session (through the benchmarks' `load_app`) and shut down at the end.
+No MySQL server is needed. Run from ai-services/ with `python -m pytest`.
+"""
+import logging
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_endpoints import load_app  # noqa: E402
+from benchmarks.sqlite_db import build_database  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def bench_db(tmp_path_factory):
+    """Path of a small database shaped like database/schema.sql"""
+    path = str(tmp_path_factory.mktemp('db') / 'bench.sqlite')
+    build_database(path, users=50, courses=20, performance=2000, seed=7)
+    return path
+
+
+class QueryRecorder:
+    """Query listener that records statement names issued by the calling thread"""
+
+    def __init__(self):
+        self.names = []
+        self._thread = None
+
+    def __call__(self, name, query, duration, rows, error, params):
+        # Background writers (chat log, events) run on their own threads
+        if threading.get_ident() == self._thread:
+            self.names.append(name)
+
+    def record(self, request):
+        """Run `request()` and return the names of the queries it issued"""
+        self.names = []
+        self._thread = threading.get_ident()
+        try:
+            request()
+        finally:
+            self._thread = None
+        return self.names
+
+
+@pytest.fixture(scope='session')
+def service(bench_db, tmp_path_factory):
+    """The `app` module, connected to `bench_db`"""
+    service = load_app(bench_db, 2, str(tmp_path_factory.mktemp('work')))
+    logging.disable(logging.WARNING)
+    service.recorder = QueryRecorder()
+    service.db.add_listener(service.recorder)
+    # Load the shared catalog up front so per-request counts only cover user data
+    service.course_catalog.get()
+    yield service
+    logging.disable(logging.NOTSET)
+    service.summary_jobs.shutdown()
+    service.pdf_extractor.shutdown()
+    service.chat_log_writer.close()
+    service.event_ingestor.close()
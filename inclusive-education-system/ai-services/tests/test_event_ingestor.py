@@ -0,0 +1,118 @@
+"""
+Event validation and buffered writes of POST /events
+"""
+import json
+import time
+from datetime import datetime
+
+import pymysql
+import pytest
+
+from database.batch_writer import BatchWriter
+from services.event_ingestor import EventIngestor
+
+
+@pytest.fixture
+def ingestor(service):
+    ingestor = EventIngestor(service.db)
+    yield ingestor
+    ingestor.close()
+
+
+def stored(service, event_type):
+    return service.db.execute_query(
+        "SELECT user_id, occurred_at FROM behavior_events WHERE event_type = %s ORDER BY id", (event_type,)
+    )
+
+
+@pytest.mark.parametrize('occurred_at', [
+    1e20,                          # fromtimestamp() raises OSError
+    -1,
+    0,                             # 1970-01-01 00:00:00, below TIMESTAMP's range
+    '1900-01-01T00:00:00Z',
+    '1970-01-01T00:00:00Z',
+    '2999-01-01T00:00:00Z',
+    'yesterday',
+    True,
+    [2024],
+])
+def test_invalid_occurred_at_is_rejected(ingestor, occurred_at):
+    with pytest.raises(ValueError):
+        ingestor._validate({'user_id': 1, 'event_type': 'view', 'occurred_at': occurred_at}, time.time())
+
+
+@pytest.mark.parametrize('occurred_at, expected', [
+    (1, datetime(1970, 1, 1, 0, 0, 1)),
+    ('1970-01-01T00:00:01Z', datetime(1970, 1, 1, 0, 0, 1)),
+    (1700000000, datetime(2023, 11, 14, 22, 13, 20)),
+    (1700000000000, datetime(2023, 11, 14, 22, 13, 20)),            # epoch milliseconds
+    ('2023-11-14T23:13:20+01:00', datetime(2023, 11, 14, 22, 13, 20)),
+    ('2023-11-14T22:13:20', datetime(2023, 11, 14, 22, 13, 20)),    # naive means UTC
+    (None, None),
+])
+def test_occurred_at_is_stored_as_utc(ingestor, occurred_at, expected):
+    event = {'user_id': 1, 'event_type': 'view', 'occurred_at': occurred_at}
+    assert ingestor._validate(event, time.time())[3] == expected
+
+
+def test_future_occurred_at_within_skew_is_accepted(ingestor):
+    now = time.time()
+    ingestor._validate({'user_id': 1, 'event_type': 'view', 'occurred_at': now + 60}, now)
+    with pytest.raises(ValueError):
+        ingestor._validate({'user_id': 1, 'event_type': 'view', 'occurred_at': now + 3600}, now)
+
+
+def test_mixed_batch_keeps_the_valid_events(service, ingestor):
+    events = [
+        {'user_id': 1, 'event_type': 'test_mixed', 'occurred_at': 1700000000},
+        {'user_id': 2, 'event_type': 'test_mixed', 'occurred_at': 1e20},
+        {'user_id': 3, 'event_type': 'test_mixed', 'occurred_at': '1900-01-01T00:00:00Z'},
+        {'user_id': 4, 'event_type': 'test_mixed'},
+        {'user_id': 'x', 'event_type': 'test_mixed'},
+        {'user_id': 5, 'event_type': 'test_mixed', 'occurred_at': 0},
+    ]
+    result = ingestor.ingest(json.dumps(events).encode())
+    assert (result['accepted'], result['rejected']) == (2, 4)
+    assert [error['index'] for error in result['errors']] == [1, 2, 4, 5]
+    ingestor.close()
+    assert [row['user_id'] for row in stored(service, 'test_mixed')] == [1, 4]
+
+
+def test_route_rejects_out_of_range_events_individually(service):
+    body = [
+        {'user_id': 1, 'event_type': 'test_route', 'occurred_at': 1e20},
+        {'user_id': 1, 'event_type': 'test_route'},
+    ]
+    response = service.app.test_client().post('/events', json=body)
+    assert response.status_code == 202
+    assert response.get_json()['accepted'] == 1
+
+    response = service.app.test_client().post('/events', json=body[:1])
+    assert response.status_code == 400
+
+
+def test_failed_chunk_is_retried_row_by_row(service):
+    written = []
+
+    def write(rows):
+        if any(row == 'bad' for row in rows):
+            raise pymysql.err.OperationalError(1292, 'Incorrect datetime value')
+        written.extend(rows)
+
+    writer = BatchWriter(service.db, None, flush_rows=10, write=write)
+    writer._flush(['a', 'bad', 'b', 'c'])
+    assert written == ['a', 'b', 'c']
+    assert (writer.get_stats()['flushed'], writer.get_stats()['failed']) == (3, 1)
+
+
+def test_connection_failure_is_not_retried_per_row(service):
+    calls = []
+
+    def write(rows):
+        calls.append(len(rows))
+        raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server")
+
+    writer = BatchWriter(service.db, None, flush_rows=10, write=write)
+    writer._flush(list(range(25)))
+    assert calls == [10, 10, 5]
+    assert writer.get_stats()['failed'] == 25
@@ -0,0 +1,140 @@
+"""
+Incremental interest profiles against a full recompute
+
+Folding performance rows batch by batch, across runs and around the settle
+window must leave the same profiles as rebuilding them from the whole
+history, and reads (profiles plus the unfolded tail) must always match.
+"""
+import sqlite3
+
+import pytest
+
+from benchmarks.sqlite_db import SQLiteConnector
+from services.interest_profiles import InterestProfiles
+
+USERS = (1, 2, 3, 7, 11)
+
+PROFILE_ROWS_QUERY = """
+    SELECT user_id, category, weight, weighted_at, activity_count, score_sum, score_count, last_performance_id
+    FROM user_interest_profiles
+    ORDER BY user_id, category
+"""
+
+INSERT_QUERY = """
+    INSERT INTO performance (id, user_id, module_id, score, completion_status, time_spent_minutes)
+    VALUES (%s, %s, %s, %s, 'completed', 5)
+"""
+
+
+@pytest.fixture
+def db(bench_db, tmp_path):
+    path = str(tmp_path / 'interests.sqlite')
+    # The backup API includes writes still in the session database's WAL
+    with sqlite3.connect(bench_db) as source, sqlite3.connect(path) as target:
+        source.backup(target)
+    db = SQLiteConnector(path, 2)
+    db.execute_update('DELETE FROM user_interest_profiles')
+    return db
+
+
+def profile_rows(db):
+    return db.execute_query(PROFILE_ROWS_QUERY)
+
+
+def recomputed(db):
+    """Profiles folded in memory from the whole history, in the table's row shape"""
+    events = sorted(db.iter_query(
+        InterestProfiles.PERFORMANCE_ROWS_QUERY.format(column='id'), (0, max_id(db), max_id(db)), as_tuples=True
+    ))
+    entries = {}
+    InterestProfiles(db)._fold(entries, events)
+    columns = ('weight', 'weighted_at', 'activity_count', 'score_sum', 'score_count', 'last_performance_id')
+    return [
+        {'user_id': user_id, 'category': category, **{
+            column: pytest.approx(value, rel=1e-9) if column in ('weight', 'score_sum') else int(value)
+            for column, value in zip(columns, entries[(user_id, category)])
+        }}
+        for user_id, category in sorted(entries)
+    ]
+
+
+def max_id(db):
+    return db.execute_query('SELECT MAX(id) as max_id FROM performance')[0]['max_id']
+
+
+def add_rows(db, rows):
+    for performance_id, user_id, module_id, score in rows:
+        db.execute_update(INSERT_QUERY, (performance_id, user_id, module_id, score))
+
+
+def folded_counts(db):
+    rows = db.execute_query(
+        'SELECT user_id, SUM(activity_count) as folded FROM user_interest_profiles GROUP BY user_id'
+    )
+    return {row['user_id']: row['folded'] for row in rows}
+
+
+def test_batched_update_matches_full_recompute(db):
+    profiles = InterestProfiles(db, batch_size=97, settle=0)
+    result = profiles.run_once()
+    assert result['rows'] == db.execute_query('SELECT COUNT(*) as count FROM performance')[0]['count']
+    assert profile_rows(db) == recomputed(db)
+    profiles.run_once(rebuild=True)
+    assert profile_rows(db) == recomputed(db)
+
+
+def test_incremental_runs_match_full_recompute_and_are_idempotent(db):
+    profiles = InterestProfiles(db, batch_size=500, settle=0)
+    profiles.run_once()
+    start = max_id(db) + 1
+    add_rows(db, [(start + i, USERS[i % len(USERS)], 1 + (i * 7) % 100, (i * 13) % 101) for i in range(40)])
+
+    assert profiles.run_once()['rows'] == 40
+    assert profiles.run_once()['rows'] == 0
+    assert profile_rows(db) == recomputed(db)
+
+
+def test_reads_include_the_unfolded_tail(db):
+    profiles = InterestProfiles(db, settle=0)
+    profiles.run_once()
+    start = max_id(db) + 1
+    add_rows(db, [(start + i, 3, 1 + i * 11, 90) for i in range(5)])
+
+    before = {user_id: profiles.interests(user_id) for user_id in USERS}
+    assert profiles.interests_many(list(USERS)) == before
+    profiles.run_once()
+    after = {user_id: profiles.interests(user_id) for user_id in USERS}
+    assert after[3]['categories'] == before[3]['categories']
+    assert after[3]['avg_score'] == pytest.approx(before[3]['avg_score'])
+
+
+def test_rows_committed_late_with_lower_ids_are_folded(db):
+    profiles = InterestProfiles(db, settle=120)
+    profiles.run_once()
+    user_id = 7
+    start = max_id(db) + 1
+    total = db.execute_query('SELECT COUNT(*) as count FROM performance WHERE user_id = %s', (user_id,))[0]['count']
+
+    # ID start + 1 becomes visible first; start commits afterwards
+    add_rows(db, [(start + 1, user_id, 5, 80)])
+    assert profiles.run_once()['rows'] == 0  # inside the settle window: served from the tail
+    add_rows(db, [(start, user_id, 6, 60)])
+    assert profiles.run_once()['rows'] == 0
+    tail = db.execute_query(InterestProfiles.INTERESTS_QUERY, (user_id, user_id, user_id))
+    assert sum(row['activity_count'] for row in tail) == total + 2
+
+    profiles.settle = 0  # both rows have settled
+    assert profiles.run_once()['rows'] == 2
+    assert folded_counts(db)[user_id] == total + 2
+    assert profile_rows(db) == recomputed(db)
+
+
+def test_fold_skips_rows_already_folded(db):
+    profiles = InterestProfiles(db)
+    entries = {}
+    events = [(1, 9, 'Math', 80, 1000), (2, 9, 'Math', 0, 2000), (3, 9, 'Art', 50, 3000)]
+    assert profiles._fold(entries, events) == {(9, 'Math'), (9, 'Art')}
+    snapshot = {key: list(entry) for key, entry in entries.items()}
+    assert profiles._fold(entries, events) == set()
+    assert entries == snapshot
+    assert entries[(9, 'Math')][2:] == [2, 80.0, 1, 2]
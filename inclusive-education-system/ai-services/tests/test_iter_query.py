@@ -0,0 +1,54 @@
+"""
+Streaming reads through DatabaseConnector.iter_query
+"""
+import pytest
+
+from benchmarks.sqlite_db import SQLiteConnector
+
+QUERY = "SELECT id, user_id, score FROM performance WHERE user_id <= %s ORDER BY id"
+
+
+@pytest.fixture
+def db(bench_db):
+    return SQLiteConnector(bench_db, 2)
+
+
+def test_streams_the_same_rows_as_execute_query(db):
+    expected = db.execute_query(QUERY, (10,))
+    assert expected
+    assert list(db.iter_query(QUERY, (10,))) == expected
+    assert list(db.iter_query(QUERY, (10,), as_tuples=True)) == [tuple(row.values()) for row in expected]
+
+
+def test_chunks(db):
+    expected = db.execute_query(QUERY, (10,))
+    chunks = list(db.iter_query(QUERY, (10,), chunk_size=7))
+    assert all(0 < len(chunk) <= 7 for chunk in chunks)
+    assert [len(chunk) for chunk in chunks[:-1]] == [7] * (len(chunks) - 1)
+    assert [row for chunk in chunks for row in chunk] == expected
+
+
+def test_listener_sees_the_statement_once_with_all_rows(db):
+    seen = []
+    db.add_listener(lambda name, query, duration, rows, error, params: seen.append((name, rows, error)))
+    total = sum(1 for _ in db.iter_query(QUERY, (10,), name='stream_test'))
+    assert seen == [('stream_test', total, None)]
+
+
+def test_abandoned_stream_releases_its_connection(db):
+    stream = db.iter_query(QUERY, (10,), chunk_size=1)
+    next(stream)
+    assert db.pool.get_stats()['in_use'] == 1
+    stream.close()
+    assert db.pool.get_stats()['in_use'] == 0
+    # The pool still serves queries afterwards
+    assert db.execute_query("SELECT COUNT(*) as count FROM performance")[0]['count'] > 0
+
+
+def test_other_statements_run_while_streaming(db):
+    streamed = 0
+    for row in db.iter_query(QUERY, (3,)):
+        rows = db.execute_query("SELECT user_id FROM performance WHERE id = %s", (row['id'],))
+        assert rows[0]['user_id'] == row['user_id']
+        streamed += 1
+    assert streamed
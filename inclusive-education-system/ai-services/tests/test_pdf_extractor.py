@@ -0,0 +1,77 @@
+"""
+Deadlines of PdfExtractor jobs
+
+A job that misses its deadline answers 504 and must not leave its work
+running in the pool: the pool's workers are terminated and the next job
+gets a fresh pool.
+"""
+import time
+
+import PyPDF2
+import pytest
+
+from services.pdf_extractor import PdfExtractionError, PdfExtractor
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    writer = PyPDF2.PdfWriter()
+    for _ in range(4):
+        writer.add_blank_page(width=612, height=792)
+    path = tmp_path / 'blank.pdf'
+    with open(path, 'wb') as out:
+        writer.write(out)
+    return str(path)
+
+
+@pytest.fixture
+def extractor():
+    extractor = PdfExtractor(max_workers=1, timeout=20, pages_per_chunk=1)
+    yield extractor
+    extractor.shutdown()
+
+
+def workers(executor):
+    return list(executor._processes.values())
+
+
+def test_extract_blank_pages(extractor, pdf_path):
+    assert extractor.extract(pdf_path) == '\n\n\n'
+
+
+def test_busy_worker_is_terminated_on_page_count_timeout(extractor, pdf_path):
+    executor = extractor._get_executor()
+    executor.submit(time.sleep, 60)  # a job that would hold the only worker for a minute
+    processes = workers(executor)
+    extractor.timeout = 1
+    started = time.monotonic()
+    with pytest.raises(PdfExtractionError) as raised:
+        extractor.extract(pdf_path)
+    assert raised.value.status == 504
+    assert time.monotonic() - started < 10
+
+    for process in processes:
+        process.join(5)
+    assert processes and not any(process.is_alive() for process in processes)
+
+    extractor.timeout = 20
+    assert extractor._get_executor() is not executor
+    assert extractor.extract(pdf_path) == '\n\n\n'
+
+
+def test_chunk_timeout_replaces_the_pool(extractor, pdf_path):
+    executor = extractor._get_executor()
+    extractor.timeout = 5
+    processes = []
+
+    def slow_progress(done, total):
+        processes.extend(workers(executor))
+        time.sleep(extractor.timeout)
+
+    with pytest.raises(PdfExtractionError) as raised:
+        extractor.extract(pdf_path, progress=slow_progress)
+    assert raised.value.status == 504
+    for process in processes:
+        process.join(5)
+    assert processes and not any(process.is_alive() for process in processes)
+    assert extractor._get_executor() is not executor
@@ -0,0 +1,56 @@
+"""
+Index use of the hot per-user and per-course queries
+
+Runs benchmarks/explain_check.py's checks under pytest: against the SQLite
+stand-in built from database/schema.sql, and against MySQL (DB_* settings)
+when a server with production-like volume is reachable.
+"""
+import shutil
+
+import pytest
+from dotenv import load_dotenv
+
+from benchmarks.explain_check import CHECKS, plan_problems, sample_values
+from benchmarks.sqlite_db import SQLiteConnector
+# Imported before the app fixture swaps in the SQLite stand-in
+from database.db_connector import DatabaseConnector
+
+# Below this the optimizer may rightly prefer a full scan
+MYSQL_MIN_PERFORMANCE_ROWS = 10000
+
+
+@pytest.fixture(scope='module')
+def sqlite_db(bench_db):
+    return SQLiteConnector(bench_db, 1)
+
+
+@pytest.fixture(scope='module')
+def mysql_db():
+    load_dotenv()
+    try:
+        db = DatabaseConnector()
+        rows = db.execute_query('SELECT COUNT(*) as count FROM performance')
+    except Exception as e:
+        pytest.skip(f'MySQL unavailable: {e}')
+    if not rows or rows[0]['count'] < MYSQL_MIN_PERFORMANCE_ROWS:
+        pytest.skip('MySQL has too little performance data for representative plans')
+    return db
+
+
+@pytest.mark.parametrize('check', CHECKS, ids=[check[0] for check in CHECKS])
+def test_sqlite_plan(sqlite_db, check):
+    assert plan_problems(sqlite_db, True, check, sample_values(sqlite_db)) == []
+
+
+@pytest.mark.parametrize('check', CHECKS, ids=[check[0] for check in CHECKS])
+def test_mysql_plan(mysql_db, check):
+    assert plan_problems(mysql_db, False, check, sample_values(mysql_db)) == []
+
+
+def test_dropped_index_fails(bench_db, tmp_path):
+    path = str(tmp_path / 'no_index.sqlite')
+    shutil.copy(bench_db, path)
+    db = SQLiteConnector(path, 1)
+    db.execute_update('DROP INDEX performance_idx_user_timestamp')
+    check = next(check for check in CHECKS if check[0] == 'user_performance')
+    assert plan_problems(db, True, check, sample_values(db))
@@ -0,0 +1,93 @@
+"""
+ETags and replayed bodies of the per-user GET views (_conditional / ResponseCache)
+"""
+import pytest
+
+from services.response_cache import ResponseCache, etag_matches
+
+# Users no other test module writes for
+USER = 40
+OTHER_USER = 41
+
+
+@pytest.fixture
+def client(service):
+    return service.app.test_client()
+
+
+def add_performance(service, user_id):
+    service.db.execute_update(
+        "INSERT INTO performance (user_id, module_id, score, completion_status, time_spent_minutes) "
+        "VALUES (%s, 1, 75, 'completed', 10)",
+        (user_id,)
+    )
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, False),
+    ('', False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('*', True),
+    ('"abcd"', False),
+    ('abc', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_conditional_get_answers_304(service, client):
+    path = f'/recommendations/{USER}'
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == ResponseCache.CACHE_CONTROL
+
+    not_modified = client.get(path, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == etag
+    assert not_modified.get_data() == b''
+
+    # Another route of the same user has its own ETag
+    assert client.get(f'/learning-path/{USER}').headers['ETag'] != etag
+
+
+def test_cached_body_is_replayed_without_running_the_view(service, client):
+    path = f'/full-recommendations/{USER}'
+    first = client.get(path)
+    replayed = []
+    queries = service.recorder.record(lambda: replayed.append(client.get(path)))
+    assert queries == ['response_version']
+    assert replayed[0].get_data() == first.get_data()
+    assert replayed[0].headers['ETag'] == first.headers['ETag']
+
+
+def test_new_performance_invalidates_etag_and_body(service, client):
+    path = f'/full-recommendations/{OTHER_USER}'
+    first = client.get(path)
+    total = service.progress_cache.get(OTHER_USER)['total_modules']
+
+    add_performance(service, OTHER_USER)
+
+    responses = []
+    queries = service.recorder.record(
+        lambda: responses.append(client.get(path, headers={'If-None-Match': first.headers['ETag']}))
+    )
+    second = responses[0]
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    # The view ran again and its feedback was built from fresh aggregates
+    assert 'progress_aggregate' in queries
+    assert service.progress_cache.get(OTHER_USER)['total_modules'] == total + 1
+    assert client.get(path, headers={'If-None-Match': second.headers['ETag']}).status_code == 304
+
+
+def test_enrollment_change_invalidates_etag(service, client):
+    path = f'/recommendations/{USER}'
+    etag = client.get(path).headers['ETag']
+    service.db.execute_update(
+        "UPDATE course_enrollments SET progress_percentage = progress_percentage + 1 WHERE user_id = %s",
+        (USER,)
+    )
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,51 @@
+"""
+Database round trips per request
+
+A request loads each piece of a user's data at most once (UserSnapshot and
+the progress aggregate cache), and a repeat request for unchanged data only
+checks its version.
+"""
+import pytest
+
+
+@pytest.fixture
+def client(service):
+    return service.app.test_client()
+
+
+def queries(service, request):
+    return sorted(service.recorder.record(request))
+
+
+def test_full_recommendations_round_trips(service, client):
+    path = '/full-recommendations/3'
+    assert queries(service, lambda: client.get(path)) == sorted([
+        'response_version', 'user_enrollments', 'user_interests', 'progress_version', 'progress_aggregate'
+    ])
+    # Unchanged data: the cached body is replayed
+    assert queries(service, lambda: client.get(path)) == ['response_version']
+
+
+def test_learning_path_round_trips(service, client):
+    path = '/learning-path/4'
+    assert queries(service, lambda: client.get(path)) == sorted([
+        'response_version', 'user_interests', 'user_completed_modules'
+    ])
+    assert queries(service, lambda: client.get(path)) == ['response_version']
+
+
+def test_chatbot_progress_round_trips(service, client):
+    def ask():
+        response = client.post('/chatbot', json={'user_id': 5, 'message': 'how is my progress'})
+        assert response.status_code == 200
+
+    assert queries(service, ask) == ['progress_aggregate', 'progress_version']
+    assert queries(service, ask) == ['progress_version']
+
+
+def test_chatbot_small_talk_skips_the_database(service, client):
+    def ask():
+        response = client.post('/chatbot', json={'user_id': 6, 'message': 'hello'})
+        assert response.status_code == 200
+
+    assert queries(service, ask) == []
@@ -59,7 +59,8 @@ async function runMigration() {
           is_published BOOLEAN DEFAULT TRUE,
           FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL,
           INDEX idx_category (category),
-          INDEX idx_difficulty (difficulty_level)
+          INDEX idx_difficulty (difficulty_level),
+          INDEX idx_published_category (is_published, category)
         ) ENGINE=InnoDB;
       `);
 
@@ -78,7 +79,8 @@ async function runMigration() {
           updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
           FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
           INDEX idx_course_id (course_id),
-          INDEX idx_module_order (module_order)
+          INDEX idx_module_order (module_order),
+          INDEX idx_course_order (course_id, module_order)
         ) ENGINE=InnoDB;
       `);
 
@@ -128,6 +130,84 @@ async function runMigration() {
         ) ENGINE=InnoDB;
       `);
 
+      // Optional prerequisite edges used by the AI service learning path graph
+      await connection.query(`
+        CREATE TABLE IF NOT EXISTS module_prerequisites (
+          module_id INT NOT NULL,
+          prerequisite_module_id INT NOT NULL,
+          PRIMARY KEY (module_id, prerequisite_module_id),
+          FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE,
+          FOREIGN KEY (prerequisite_module_id) REFERENCES modules(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB;
+      `);
+
+      // MySQL has no ADD COLUMN/INDEX IF NOT EXISTS, so check information_schema first
+      const columnExists = async (table, column) => {
+        const [rows] = await connection.query(
+          'SELECT 1 FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND COLUMN_NAME = ?',
+          [table, column]
+        );
+        return rows.length > 0;
+      };
+      const indexExists = async (table, index) => {
+        const [rows] = await connection.query(
+          'SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND INDEX_NAME = ?',
+          [table, index]
+        );
+        return rows.length > 0;
+      };
+
+      // Composite indexes for the hot per-user and per-course access paths:
+      // a user's performance newest first (covering the columns the AI service reads),
+      // a course's modules in order, and published courses by category
+      if (!(await indexExists('performance', 'idx_user_timestamp'))) {
+        await connection.query(
+          'ALTER TABLE performance ADD INDEX idx_user_timestamp (user_id, timestamp, module_id, completion_status, score, time_spent_minutes)'
+        );
+      }
+      if (!(await indexExists('modules', 'idx_course_order'))) {
+        await connection.query('ALTER TABLE modules ADD INDEX idx_course_order (course_id, module_order)');
+      }
+      if (!(await indexExists('courses', 'idx_published_category'))) {
+        await connection.query('ALTER TABLE courses ADD INDEX idx_published_category (is_published, category)');
+      }
+
+      // Materialized recommendations (AI service background materializer)
+      if (!(await columnExists('ai_recommendations', 'is_active'))) {
+        await connection.query('ALTER TABLE ai_recommendations ADD COLUMN is_active BOOLEAN DEFAULT FALSE');
+      }
+      if (!(await indexExists('ai_recommendations', 'idx_user_active'))) {
+        await connection.query('ALTER TABLE ai_recommendations ADD INDEX idx_user_active (user_id, is_active, created_at)');
+      }
+      if (!(await indexExists('ai_recommendations', 'idx_active_created'))) {
+        await connection.query('ALTER TABLE ai_recommendations ADD INDEX idx_active_created (is_active, created_at)');
+      }
+      await connection.query(`
+        CREATE TABLE IF NOT EXISTS ai_materializer_state (
+          name VARCHAR(64) PRIMARY KEY,
+          watermark TIMESTAMP NULL,
+          catalog_version VARCHAR(64),
+          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB;
+      `);
+
+      await connection.query(`
+        CREATE TABLE IF NOT EXISTS user_interest_profiles (
+          user_id INT NOT NULL,
+          category VARCHAR(100) NOT NULL,
+          weight DOUBLE NOT NULL DEFAULT 0,
+          weighted_at BIGINT NOT NULL DEFAULT 0,
+          activity_count INT NOT NULL DEFAULT 0,
+          score_sum DOUBLE NOT NULL DEFAULT 0,
+          score_count INT NOT NULL DEFAULT 0,
+          last_performance_id INT NOT NULL DEFAULT 0,
+          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+          PRIMARY KEY (user_id, category),
+          FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+          INDEX idx_last_performance (last_performance_id)
+        ) ENGINE=InnoDB;
+      `);
+
       console.log('✅ Incremental migrations applied successfully');
     } else {
       // Fallback: No DB_NAME provided, run full schema (creates DB and all tables)
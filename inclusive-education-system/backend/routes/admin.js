@@ -1,6 +1,7 @@
 const express = require('express');
 const router = express.Router();
 const bcrypt = require('bcryptjs');
+const axios = require('axios');
 const { promisePool } = require('../database/db');
 const { authenticateToken, authorizeRoles } = require('../middleware/auth');
 
@@ -8,6 +9,13 @@ const { authenticateToken, authorizeRoles } = require('../middleware/auth');
 router.use(authenticateToken);
 router.use(authorizeRoles('admin'));
 
+// Ask the AI service to reload its cached course catalog (best effort)
+const invalidateAiCatalog = () => {
+  if (!process.env.AI_SERVICE_URL) return;
+  axios.post(`${process.env.AI_SERVICE_URL}/catalog/invalidate`, {}, { timeout: 2000 })
+    .catch(error => console.error('AI catalog invalidation failed:', error.message));
+};
+
 // Get all users
 router.get('/users', async (req, res) => {
   try {
@@ -224,6 +232,8 @@ router.post('/courses', async (req, res) => {
       [title, description, category, difficultyLevel, estimatedHours, thumbnailUrl, req.user.id]
     );
 
+    invalidateAiCatalog();
+
     res.status(201).json({
       message: 'Course created successfully',
       courseId: result.insertId
@@ -288,6 +298,8 @@ router.put('/courses/:id', async (req, res) => {
       return res.status(404).json({ error: 'Course not found' });
     }
 
+    invalidateAiCatalog();
+
     res.json({ message: 'Course updated successfully' });
 
   } catch (error) {
@@ -308,6 +320,8 @@ router.delete('/courses/:id', async (req, res) => {
       return res.status(404).json({ error: 'Course not found' });
     }
 
+    invalidateAiCatalog();
+
     res.json({ message: 'Course deleted successfully' });
 
   } catch (error) {
@@ -5,7 +5,32 @@ const FormData = require('form-data');
 const multer = require('multer');
 const upload = multer();
 const { promisePool } = require('../database/db');
-const { authenticateToken } = require('../middleware/auth');
+const { authenticateToken, authorizeRoles } = require('../middleware/auth');
+
+// GET a per-user AI resource, forwarding the client's If-None-Match so an
+// unchanged dashboard is answered with a 304 instead of a rebuilt payload
+function conditionalGet(url, req) {
+  const headers = {};
+  if (req.headers['if-none-match']) {
+    headers['If-None-Match'] = req.headers['if-none-match'];
+  }
+  return axios.get(url, {
+    headers,
+    timeout: 10000,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304
+  });
+}
+
+// Relay the AI service's validators; Express keeps an ETag that is already set
+function sendConditional(res, aiResponse) {
+  ['etag', 'cache-control'].forEach((header) => {
+    if (aiResponse.headers[header]) res.set(header, aiResponse.headers[header]);
+  });
+  if (aiResponse.status === 304) {
+    return res.status(304).end();
+  }
+  res.json(aiResponse.data);
+}
 
 // Get AI recommendations
 router.get('/recommendations/:userId', authenticateToken, async (req, res) => {
@@ -18,12 +43,12 @@ router.get('/recommendations/:userId', authenticateToken, async (req, res) => {
     }
 
     // Forward request to Python AI service
-    const aiResponse = await axios.get(
+    const aiResponse = await conditionalGet(
       `${process.env.AI_SERVICE_URL}/recommendations/${userId}`,
-      { timeout: 10000 }
+      req
     );
 
-    res.json(aiResponse.data);
+    sendConditional(res, aiResponse);
 
   } catch (error) {
     if (error.code === 'ECONNREFUSED' || error.code === 'ETIMEDOUT') {
@@ -63,6 +88,82 @@ router.get('/recommendations/:userId', authenticateToken, async (req, res) => {
   }
 });
 
+// Get AI recommendations for many users at once (admin reports, nightly jobs)
+router.post('/recommendations/batch', authenticateToken, authorizeRoles('admin'), async (req, res) => {
+  try {
+    const { userIds, limit } = req.body || {};
+
+    if (!Array.isArray(userIds) || userIds.length === 0) {
+      return res.status(400).json({ error: 'userIds must be a non-empty array' });
+    }
+
+    const aiResponse = await axios.post(
+      `${process.env.AI_SERVICE_URL}/recommendations/batch`,
+      { user_ids: userIds, limit },
+      { timeout: 120000 }
+    );
+
+    res.json(aiResponse.data);
+
+  } catch (error) {
+    console.error('AI batch recommendations error:', error.message);
+    const status = error.response && error.response.status === 400 ? 400 : 500;
+    res.status(status).json({ error: 'Failed to get batch recommendations' });
+  }
+});
+
+// Cohort performance report from the AI service's analytics snapshot (admin reports)
+router.post('/analytics/cohort', authenticateToken, authorizeRoles('admin'), async (req, res) => {
+  try {
+    const { userIds, category } = req.body || {};
+
+    if (userIds !== undefined && !Array.isArray(userIds)) {
+      return res.status(400).json({ error: 'userIds must be an array' });
+    }
+
+    const aiResponse = await axios.post(
+      `${process.env.AI_SERVICE_URL}/analytics/cohort`,
+      { user_ids: userIds, category },
+      { timeout: 30000 }
+    );
+
+    res.json(aiResponse.data);
+
+  } catch (error) {
+    console.error('AI cohort analytics error:', error.message);
+    const status = error.response && [400, 503].includes(error.response.status) ? error.response.status : 500;
+    res.status(status).json({ error: 'Failed to get cohort analytics' });
+  }
+});
+
+// Record a batch of behavior events (clickstream) for the authenticated user
+router.post('/events', authenticateToken, async (req, res) => {
+  try {
+    const body = req.body || {};
+    const events = Array.isArray(body) ? body : body.events;
+
+    if (!Array.isArray(events) || events.length === 0) {
+      return res.status(400).json({ error: 'events must be a non-empty array' });
+    }
+
+    // Events are always attributed to the caller
+    const payload = events.map(event => ({
+      ...(event && typeof event === 'object' ? event : {}),
+      user_id: req.user.id
+    }));
+
+    const aiResp = await axios.post(`${process.env.AI_SERVICE_URL}/events`, payload, {
+      timeout: 5000,
+      validateStatus: (status) => status < 500 || status === 503
+    });
+    if (aiResp.headers['retry-after']) res.set('Retry-After', aiResp.headers['retry-after']);
+    res.status(aiResp.status).json(aiResp.data);
+  } catch (error) {
+    console.error('AI events proxy error:', error.message);
+    res.status(500).json({ error: 'Failed to record events' });
+  }
+});
+
 // Archive current chat history for the authenticated user
 router.post('/chatbot/archive', authenticateToken, async (req, res) => {
   try {
@@ -150,15 +251,61 @@ router.post('/summarize', authenticateToken, upload.single('file'), async (req,
   }
 });
 
+// Start an asynchronous summarization job; poll GET /summarize/jobs/:jobId for the result
+router.post('/summarize/jobs', authenticateToken, upload.single('file'), async (req, res) => {
+  try {
+    const form = new FormData();
+    if (req.file) {
+      form.append('file', req.file.buffer, {
+        filename: req.file.originalname,
+        contentType: req.file.mimetype
+      });
+    } else if (req.body && req.body.text) {
+      form.append('text', req.body.text);
+    } else {
+      return res.status(400).json({ error: 'text or file is required' });
+    }
+    form.append('user_id', String(req.user.id));
+
+    const aiResp = await axios.post(`${process.env.AI_SERVICE_URL}/summarize/jobs`, form, {
+      headers: form.getHeaders(),
+      timeout: 20000,
+      validateStatus: (status) => status < 500
+    });
+    res.status(aiResp.status).json(aiResp.data);
+  } catch (error) {
+    console.error('Summarize job proxy error:', error.message);
+    res.status(500).json({ error: 'Failed to start summarization job' });
+  }
+});
+
+// Get status, progress and result of a summarization job
+router.get('/summarize/jobs/:jobId', authenticateToken, async (req, res) => {
+  try {
+    const aiResp = await axios.get(
+      `${process.env.AI_SERVICE_URL}/summarize/jobs/${encodeURIComponent(req.params.jobId)}`,
+      {
+        params: { user_id: req.user.id },
+        timeout: 5000,
+        validateStatus: (status) => status < 500
+      }
+    );
+    res.status(aiResp.status).json(aiResp.data);
+  } catch (error) {
+    console.error('Summarize job status proxy error:', error.message);
+    res.status(500).json({ error: 'Failed to get summarization job' });
+  }
+});
+
 // Get learning path
 router.get('/learning-path', authenticateToken, async (req, res) => {
   try {
     const userId = req.user.id;
-    const aiResponse = await axios.get(
+    const aiResponse = await conditionalGet(
       `${process.env.AI_SERVICE_URL}/learning-path/${userId}`,
-      { timeout: 10000 }
+      req
     );
-    res.json(aiResponse.data);
+    sendConditional(res, aiResponse);
   } catch (error) {
     console.error('AI learning path error:', error.message);
     res.status(500).json({ error: 'Failed to get learning path' });
@@ -169,11 +316,11 @@ router.get('/learning-path', authenticateToken, async (req, res) => {
 router.get('/full-recommendations', authenticateToken, async (req, res) => {
   try {
     const userId = req.user.id;
-    const aiResponse = await axios.get(
+    const aiResponse = await conditionalGet(
       `${process.env.AI_SERVICE_URL}/full-recommendations/${userId}`,
-      { timeout: 10000 }
+      req
     );
-    res.json(aiResponse.data);
+    sendConditional(res, aiResponse);
   } catch (error) {
     console.error('AI full recommendations error:', error.message);
     res.status(500).json({ error: 'Failed to get full recommendations' });
@@ -202,12 +349,14 @@ router.post('/chatbot', authenticateToken, async (req, res) => {
         { timeout: 15000 }
       );
 
-      // Log conversation
-      await promisePool.query(
-        `INSERT INTO chatbot_conversations (user_id, message, response, context_data)
-         VALUES (?, ?, ?, ?)`,
-        [userId, message, aiResponse.data.response, JSON.stringify(context || {})]
-      );
+      // Log conversation unless the AI service already queued it
+      if (!aiResponse.data.logged) {
+        await promisePool.query(
+          `INSERT INTO chatbot_conversations (user_id, message, response, context_data)
+           VALUES (?, ?, ?, ?)`,
+          [userId, message, aiResponse.data.response, JSON.stringify(context || {})]
+        );
+      }
 
       res.json(aiResponse.data);
 
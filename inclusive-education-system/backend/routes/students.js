@@ -155,8 +155,8 @@ router.get('/recommendations', authenticateToken, authorizeRoles('student'), asy
         { timeout: 5000 }
       );
 
-      // Log recommendation
-      if (aiResponse.data.recommendations) {
+      // Log recommendation (materialized sets are already stored by the AI service)
+      if (aiResponse.data.recommendations && !aiResponse.data.materialized) {
         for (const rec of aiResponse.data.recommendations) {
           await promisePool.query(`
             INSERT INTO ai_recommendations 
@@ -302,6 +302,16 @@ router.post('/enroll', authenticateToken, authorizeRoles('student'), async (req,
       [userId, courseId]
     );
 
+    // Feedback for the recommender: the current recommendation was followed
+    try {
+      await promisePool.query(
+        'UPDATE ai_recommendations SET was_accepted = TRUE WHERE user_id = ? AND recommended_course_id = ? AND is_active = TRUE',
+        [userId, courseId]
+      );
+    } catch (e) {
+      console.error('Recommendation feedback error:', e.message);
+    }
+
     res.status(201).json({
       message: 'Enrolled successfully',
       enrollmentId: result.insertId
@@ -75,7 +75,8 @@ CREATE TABLE courses (
     is_published BOOLEAN DEFAULT TRUE,
     FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL,
     INDEX idx_category (category),
-    INDEX idx_difficulty (difficulty_level)
+    INDEX idx_difficulty (difficulty_level),
+    INDEX idx_published_category (is_published, category)
 ) ENGINE=InnoDB;
 
 -- Modules table
@@ -92,7 +93,17 @@ CREATE TABLE modules (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
     INDEX idx_course_id (course_id),
-    INDEX idx_module_order (module_order)
+    INDEX idx_module_order (module_order),
+    INDEX idx_course_order (course_id, module_order)
+) ENGINE=InnoDB;
+
+-- Optional prerequisite edges between modules (learning path ordering)
+CREATE TABLE module_prerequisites (
+    module_id INT NOT NULL,
+    prerequisite_module_id INT NOT NULL,
+    PRIMARY KEY (module_id, prerequisite_module_id),
+    FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE,
+    FOREIGN KEY (prerequisite_module_id) REFERENCES modules(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
 -- Messages table (Peer collaboration)
@@ -124,7 +135,9 @@ CREATE TABLE performance (
     FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE,
     INDEX idx_user_id (user_id),
     INDEX idx_module_id (module_id),
-    INDEX idx_timestamp (timestamp)
+    INDEX idx_timestamp (timestamp),
+    -- A user's rows newest first; covers every column the AI service reads
+    INDEX idx_user_timestamp (user_id, timestamp, module_id, completion_status, score, time_spent_minutes)
 ) ENGINE=InnoDB;
 
 -- Study Groups table
@@ -197,11 +210,41 @@ CREATE TABLE ai_recommendations (
     confidence_score DECIMAL(3,2),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     was_accepted BOOLEAN DEFAULT FALSE,
+    -- TRUE for the user's current materialized set; older sets are kept for was_accepted history
+    is_active BOOLEAN DEFAULT FALSE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (recommended_course_id) REFERENCES courses(id) ON DELETE SET NULL,
     FOREIGN KEY (recommended_module_id) REFERENCES modules(id) ON DELETE SET NULL,
     INDEX idx_user_id (user_id),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    INDEX idx_user_active (user_id, is_active, created_at),
+    INDEX idx_active_created (is_active, created_at)
+) ENGINE=InnoDB;
+
+-- Watermarks of background materializers (AI service)
+CREATE TABLE ai_materializer_state (
+    name VARCHAR(64) PRIMARY KEY,
+    watermark TIMESTAMP NULL,
+    catalog_version VARCHAR(64),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+-- Time-decayed interest aggregates per user and category (AI service)
+CREATE TABLE user_interest_profiles (
+    user_id INT NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    -- Activity count decayed by INTEREST_HALF_LIFE_DAYS, as of weighted_at (epoch seconds)
+    weight DOUBLE NOT NULL DEFAULT 0,
+    weighted_at BIGINT NOT NULL DEFAULT 0,
+    activity_count INT NOT NULL DEFAULT 0,
+    score_sum DOUBLE NOT NULL DEFAULT 0,
+    score_count INT NOT NULL DEFAULT 0,
+    -- Newest performance row folded in; later rows are merged at read time
+    last_performance_id INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, category),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_last_performance (last_performance_id)
 ) ENGINE=InnoDB;
 
 -- Chatbot Conversations table
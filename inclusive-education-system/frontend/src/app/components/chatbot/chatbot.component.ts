@@ -126,9 +126,13 @@ export class ChatbotComponent implements OnInit {
     const file = input.files && input.files[0];
     if (!file) return;
     this.messages.push({ role: 'user', text: `Uploaded file: ${file.name}. Please summarize.` });
-    this.api.summarizeFile(file).subscribe({
+    // Job mode: long documents are processed in the background and polled
+    this.api.summarizeFileAsync(file).subscribe({
       next: (res) => {
         const parts = [res?.summary || '(no summary)'];
+        if (Array.isArray(res?.keywords) && res.keywords.length) {
+          parts.push('\nKey terms: ' + res.keywords.join(', '));
+        }
         if (Array.isArray(res?.examples) && res.examples.length) {
           parts.push('\nExamples:\n- ' + res.examples.join('\n- '));
         }
@@ -1,6 +1,7 @@
 import { Injectable } from '@angular/core';
 import { HttpClient, HttpParams } from '@angular/common/http';
-import { Observable } from 'rxjs';
+import { Observable, of, throwError, timer } from 'rxjs';
+import { last, switchMap, takeWhile } from 'rxjs/operators';
 import { LearningPathResponse } from '../models/learning-path.model';
 import { environment } from '../../environments/environment';
 
@@ -130,6 +131,32 @@ export class ApiService {
     return this.http.post(`${this.apiUrl}/ai/summarize`, formData);
   }
 
+  startSummaryJob(file: File): Observable<any> {
+    const formData = new FormData();
+    formData.append('file', file, file.name);
+    return this.http.post(`${this.apiUrl}/ai/summarize/jobs`, formData);
+  }
+
+  getSummaryJob(jobId: string): Observable<any> {
+    return this.http.get(`${this.apiUrl}/ai/summarize/jobs/${jobId}`);
+  }
+
+  // Starts a summary job and polls it until it finishes; emits the summary result
+  summarizeFileAsync(file: File, pollMs = 1000): Observable<any> {
+    return this.startSummaryJob(file).pipe(
+      switchMap((job: any) => job.status === 'completed'
+        ? of(job)
+        : timer(pollMs, pollMs).pipe(
+            switchMap(() => this.getSummaryJob(job.job_id)),
+            takeWhile((status: any) => status.status === 'queued' || status.status === 'running', true),
+            last()
+          )),
+      switchMap((job: any) => job.status === 'completed'
+        ? of(job.result)
+        : throwError(() => new Error(job.error || 'Summarization failed')))
+    );
+  }
+
   // Mentor endpoints
   getMentorDashboard(): Observable<any> {
     return this.http.get(`${this.apiUrl}/mentor/dashboard`);